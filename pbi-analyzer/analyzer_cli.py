@@ -1,15 +1,32 @@
 import zipfile
 import json
-import pandas as pd
 import re
 import os
 import glob
+import fnmatch
 import sys
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import TextIOWrapper
-from typing import List, Dict, Set, Any, Tuple, Union
+from contextlib import contextmanager
+from typing import List, Dict, Set, Any, Tuple, Union, Iterable, Iterator, Generator
 from pathlib import Path
 from datetime import datetime
 from collections import OrderedDict
+from bisect import bisect_right
+
+from analyzer_logging import get_logger, clear_log_buffer
+from analyzer_profiler import AnalysisProfiler, profiler_scope, record_counters, record_file_read, record_json_parse, record_regex_evals
+from usage_records import UsageRecord
+from tmdl_reader import iter_tmdl_measures, load_tmdl_model
+from pbit_model_reader import load_pbit_model
+from bim_reader import load_bim_model
+from model_text import sniff_encoding
+from pbix_archive import PbixArchive, open_pbix_archive
+
+logger = get_logger("analyzer_cli")
 
 
 # 🚫 TABLES EXCLUDED FROM ANALYSIS AND COMMENTING OUT
@@ -30,17 +47,63 @@ FIELDS_TO_EXCLUDE_FROM_MARTS_ANALYSIS = [
 ]
 
 _commenting_error_log = []
+_commenting_error_lock = threading.Lock()
+
+# One lock per DBT file, so tables that map to the same SQL file are never rewritten concurrently.
+_dbt_file_locks = {}
+_dbt_file_locks_guard = threading.Lock()
+
+# Upper bound for the commenting thread pool (the work is dominated by file I/O).
+COMMENTING_MAX_WORKERS = 8
+
+# A single PBIX is scanned on a process pool once its layout bytes × model fields reach this
+# (roughly two seconds of serial scanning); smaller reports are not worth the pool start-up.
+PARALLEL_SCAN_MIN_WORK = 500_000_000
+# Uncompressed layout bytes inflated per shared-memory block handed to the scan workers.
+PARALLEL_SCAN_BATCH_BYTES = 64 * 1024 * 1024
 
 # NOTE: The following configuration will be generated dynamically.
 TABLES_AND_FIELDS = []
 
-def log_and_print(message: str):
-    global _analysis_log_details
-    if '_analysis_log_details' not in globals():
-        _analysis_log_details = []
-    
-    print(message)
-    _analysis_log_details.append(message)
+def _load_json_file(file_path: str, encoding: str = 'utf-8-sig'):
+    """Reads and parses a JSON file, feeding the stage profiler's file/byte/parse counters."""
+    with open(file_path, 'r', encoding=encoding) as f:
+        content = f.read()
+    record_file_read(len(content))
+    record_json_parse()
+    return json.loads(content)
+
+# ===========================
+# ⏹️ CANCELLATION
+# ===========================
+
+class AnalysisCancelled(BaseException):
+    """
+    Raised at a cancellation checkpoint once the run's cancel event is set.
+
+    Derives from BaseException (like KeyboardInterrupt) so the many per-file
+    `except Exception: continue` handlers do not swallow it; `with` blocks still
+    close their files and archives on the way out.
+    """
+
+# Per thread, so concurrent jobs (UI job scheduler) each honour only their own cancel event
+_cancellation_state = threading.local()
+
+@contextmanager
+def cancellation_scope(cancel_event: threading.Event = None):
+    """Makes check_cancelled() in the current thread honour `cancel_event` for the duration of the block."""
+    previous = getattr(_cancellation_state, "event", None)
+    _cancellation_state.event = cancel_event
+    try:
+        yield
+    finally:
+        _cancellation_state.event = previous
+
+def check_cancelled():
+    """Cancellation checkpoint for long loops; a no-op when no cancel event is active."""
+    cancel_event = getattr(_cancellation_state, "event", None)
+    if cancel_event is not None and cancel_event.is_set():
+        raise AnalysisCancelled()
 
 
 
@@ -235,98 +298,371 @@ def find_fields_in_json_structure(json_data: Any, tables_and_fields: List[Dict])
     
     return found_fields
 
+# ===========================
+# 🎯 FIELD ROLES (PROJECTIONS AND FILTERS)
+# ===========================
+
+def layout_filter_scope(file_name: str) -> str:
+    """Level a filter in this layout member applies to: 'Visual', 'Page' or 'Report' (from the member path)."""
+    path = file_name.replace('\\', '/').lower()
+    if '/visualcontainers/' in path or '/visuals/' in path:
+        return 'Visual'
+    if '/sections/' in path or '/pages/' in path:
+        return 'Page'
+    return 'Report'
+
+
+def iter_field_references(element: Any, alias_mapping: Dict[str, str]) -> Iterator[str]:
+    """'Table.Field' of every Column/Measure reference ({Expression: {SourceRef}, Property}) below element, in document order."""
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            source_ref = node.get('Expression', {}).get('SourceRef') if 'Property' in node and isinstance(node.get('Expression'), dict) else None
+            if isinstance(source_ref, dict) and isinstance(node['Property'], str):
+                table_name = source_ref.get('Entity') or alias_mapping.get(source_ref.get('Source', ''))
+                if table_name:
+                    yield f"{table_name}.{node['Property']}"
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def _query_ref_field(query_ref: str) -> str:
+    """'Table.Field' from a queryRef such as 'Sum(Table.Field)'."""
+    if query_ref.endswith(')') and '(' in query_ref:
+        query_ref = query_ref[query_ref.index('(') + 1:-1]
+    return query_ref
+
+
+def _decode_filters(filters: Any) -> List:
+    # The legacy layout stores filter containers as JSON strings
+    if isinstance(filters, str):
+        try:
+            filters = json.loads(filters)
+        except ValueError:
+            return []
+    return filters if isinstance(filters, list) else []
+
+
+def extract_field_roles(json_data: Any, file_name: str) -> Dict[str, List[str]]:
+    """
+    {'Table.Field': [role, ...]} for one layout member, computed once per document:
+        - projection roles of the visual (Category, Y, Legend, Tooltips, Values, Rows ...), from the
+          legacy singleVisual.projections queryRefs or the PBIR queryState projections
+        - '<Visual|Page|Report> Filter' for fields in filter containers (filters.json members,
+          'filters' / 'filterConfig' entries) and in the visual query's Where clause
+    Roles are listed in the order they are first met; fields with no role are absent.
+    """
+    roles: Dict[str, List[str]] = {}
+
+    def add(field: str, role: str):
+        field_roles = roles.setdefault(field, [])
+        if role not in field_roles:
+            field_roles.append(role)
+
+    filter_role = f"{layout_filter_scope(file_name)} Filter"
+    if isinstance(json_data, list):
+        # A filters.json member is the bare list of filter containers
+        for filter_item in json_data:
+            for field in iter_field_references(filter_item, parse_alias_mapping(filter_item.get('filter', {}) if isinstance(filter_item, dict) else {})):
+                add(field, filter_role)
+        return roles
+    if not isinstance(json_data, dict):
+        return roles
+
+    alias_mapping = parse_alias_mapping(json_data)
+    single_visual = json_data.get('singleVisual')
+    if isinstance(single_visual, dict):
+        query = single_visual.get('prototypeQuery', {})
+        query = query if isinstance(query, dict) else {}
+        fields_by_query_ref = {}
+        for select_item in query.get('Select', []) if isinstance(query.get('Select'), list) else []:
+            if isinstance(select_item, dict) and select_item.get('Name'):
+                field = next(iter_field_references(select_item, alias_mapping), None)
+                if field:
+                    fields_by_query_ref[select_item['Name']] = field
+        projections = single_visual.get('projections', {})
+        for role, items in (projections.items() if isinstance(projections, dict) else []):
+            for item in items if isinstance(items, list) else []:
+                query_ref = item.get('queryRef') if isinstance(item, dict) else None
+                if isinstance(query_ref, str):
+                    add(fields_by_query_ref.get(query_ref) or _query_ref_field(query_ref), role)
+        for field in iter_field_references(query.get('Where', []), alias_mapping):
+            add(field, 'Visual Filter')
+
+    # PBIR visual.json: visual.query.queryState.<role>.projections[].field
+    visual = json_data.get('visual')
+    query_state = visual.get('query', {}).get('queryState', {}) if isinstance(visual, dict) and isinstance(visual.get('query'), dict) else {}
+    for role, state in (query_state.items() if isinstance(query_state, dict) else []):
+        for projection in state.get('projections', []) if isinstance(state, dict) else []:
+            if isinstance(projection, dict):
+                for field in iter_field_references(projection.get('field', {}), alias_mapping):
+                    add(field, role)
+
+    filters = json_data.get('filters')
+    filter_config = json_data.get('filterConfig')
+    if isinstance(filter_config, dict):
+        filters = filter_config.get('filters', filters)
+    for filter_item in _decode_filters(filters):
+        if isinstance(filter_item, dict):
+            filter_aliases = parse_alias_mapping(filter_item.get('filter', {}))
+            for field in iter_field_references(filter_item, filter_aliases):
+                add(field, filter_role)
+    return roles
+
+
+def describe_field_roles(roles: Dict[str, List[str]], field_key: str) -> str:
+    """usage_context shown for a field: its roles joined, or 'Unknown'."""
+    return ', '.join(roles.get(field_key, [])) or 'Unknown'
+
+# ===========================
+# 📁 MODEL FOLDER INDEX
+# ===========================
+
+class ModelDirectoryIndex:
+    """
+    Every folder and file under the model root, listed once with os.scandir.
+
+    perform_analysis builds one per run and every stage asks it instead of globbing or
+    stat-ing the tree again (the model often lives on a network share). Lookups by folder
+    name, child name or file extension are dict lookups; order follows glob's recursive
+    order and hidden entries are skipped the way glob skips them.
+    """
+
+    def __init__(self, root: str):
+        self.model_path = root
+        self.root = os.path.normpath(root) if root else ""
+        self._model_snapshot = None
+        self._model_snapshot_loaded = False
+        self._dirs: Dict[str, List[str]] = {}                 # folder -> child folders (scandir order, hidden included)
+        self._files: Dict[str, List[str]] = {}                # folder -> files (scandir order, hidden excluded)
+        self._child_by_name: Dict[Tuple[str, str], str] = {}  # (folder, lowercase child name) -> first such child folder
+        self._dirs_by_name: Dict[str, List[str]] = {}         # lowercase folder name -> folders, in walk order
+        self._files_by_extension: Dict[str, List[str]] = {}   # lowercase extension -> files, in walk order
+        self._dir_order: List[str] = []
+        self._first_dir_containing: Dict[str, str] = {}
+        if self.root and os.path.isdir(self.root):
+            self._scan(self.root)
+
+    def _scan(self, folder: str):
+        self._dir_order.append(folder)
+        dirs, files = [], []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    if is_dir:
+                        dirs.append(entry.path)
+                        self._child_by_name.setdefault((folder, entry.name.lower()), entry.path)
+                    elif not entry.name.startswith('.'):
+                        files.append(entry.path)
+        except OSError as e:
+            logger.warning(f"   ⚠️ Cannot list folder '{folder}': {e}")
+        self._dirs[folder], self._files[folder] = dirs, files
+
+        for path in files:
+            self._files_by_extension.setdefault(os.path.splitext(path)[1].lower(), []).append(path)
+        for path in dirs:
+            name = os.path.basename(path)
+            if not name.startswith('.'):
+                self._dirs_by_name.setdefault(name.lower(), []).append(path)
+                self._scan(path)
+
+    def model_snapshot(self) -> Dict:
+        """load_model_snapshot() of the model path, resolved once per index."""
+        if not self._model_snapshot_loaded:
+            self._model_snapshot = load_model_snapshot(self.model_path)
+            self._model_snapshot_loaded = True
+        return self._model_snapshot
+
+    def contains(self, path: str) -> bool:
+        return bool(path) and os.path.normpath(path) in self._dirs
+
+    def child_dir(self, folder: str, name: str) -> str:
+        """The child folder of `folder` called `name` (case-insensitive), or ""."""
+        return self._child_by_name.get((os.path.normpath(folder), name.lower()), "")
+
+    def subdirs(self, folder: str) -> List[str]:
+        return list(self._dirs.get(os.path.normpath(folder), []))
+
+    def has_file(self, path: str) -> bool:
+        folder = os.path.dirname(os.path.normpath(path))
+        return os.path.normpath(path) in self._files.get(folder, ())
+
+    def files_in(self, folder: str, extension: str = None) -> List[str]:
+        files = self._files.get(os.path.normpath(folder), [])
+        if extension:
+            return [path for path in files if path.lower().endswith(extension.lower())]
+        return list(files)
+
+    def files_with_extension(self, extension: str) -> List[str]:
+        """Same files, in the same order, as glob(root/**/*<extension>, recursive=True)."""
+        return list(self._files_by_extension.get(extension.lower(), []))
+
+    def files_under(self, folder: str) -> List[str]:
+        """Every non-hidden file below `folder`, sorted by path (like list_measure_files)."""
+        folder = os.path.normpath(folder)
+        prefix = folder + os.sep
+        files = []
+        for path in self._dir_order:
+            if path == folder or path.startswith(prefix):
+                files.extend(self._files[path])
+        return sorted(files)
+
+    def first_dir_containing(self, text: str) -> str:
+        """
+        The first non-hidden folder whose name contains `text` (case-insensitive), in the order
+        glob(root/**/*, recursive=True) would list it.
+        """
+        text = text.lower()
+        if text not in self._first_dir_containing:
+            found = ""
+            for folder in self._dir_order:
+                for path in self._dirs[folder]:
+                    name = os.path.basename(path)
+                    if not name.startswith('.') and text in name.lower():
+                        found = path
+                        break
+                if found:
+                    break
+            self._first_dir_containing[text] = found
+        return self._first_dir_containing[text]
+
+
 # ===========================
 # 🚀 DYNAMIC CONFIGURATION LOADING FUNCTION
 # ===========================
 
-def dynamically_generate_field_config(model_path: str, tables_to_exclude: list, exclusion_patterns: list, measures_folder_name: str) -> List[Dict]:
+def dynamically_generate_field_config(model_path: str, tables_to_exclude: list, exclusion_patterns: list, measures_folder_name: str,
+                                      model_index: ModelDirectoryIndex = None) -> List[Dict]:
     """
     Dynamically generates the configuration of tables and fields from the model directory.
     Now accepts configuration as parameters instead of using globals.
+    Reads the Tabular Editor folder layout (tables/<T>/<T>.json), TMDL (definition/tables/*.tmdl),
+    the DataModelSchema of a .pbit file and a model.bim.
     """
     final_config = []
-    log_and_print(f"   Trying to find the main folder with tables...")
-    
-    folder_tables = ""
-    for folder in os.listdir(model_path):
-        if folder.lower() == "tables":
-            folder_tables = os.path.join(model_path, folder)
-            break
-            
-    if not folder_tables:
-        log_and_print(f"   ❌ ERROR: 'tables' folder not found in the model directory: {model_path}")
-        return []
-    
-    log_and_print(f"   📂 Found folder with tables: {folder_tables}")
 
-    table_folders = [f.name for f in os.scandir(folder_tables) if f.is_dir()]
-    log_and_print(f"   🔍 Found {len(table_folders)} potential folders with tables.")
+    model_snapshot = model_index.model_snapshot() if model_index is not None else load_model_snapshot(model_path)
+    if model_snapshot is not None:
+        logger.info(f"   📂 {model_snapshot['format'].upper()} model found: {model_snapshot['source_path']}")
+        table_names = list(model_snapshot["tables"])
+    else:
+        logger.info(f"   Trying to find the main folder with tables...")
 
-    for table_name in table_folders:
+        model_index = model_index or ModelDirectoryIndex(model_path)
+        folder_tables = model_index.child_dir(model_path, "tables")
+
+        if not folder_tables:
+            logger.error(f"   ❌ ERROR: 'tables' folder not found in the model directory: {model_path}")
+            return []
+
+        logger.info(f"   📂 Found folder with tables: {folder_tables}")
+        table_names = [os.path.basename(path) for path in model_index.subdirs(folder_tables)]
+
+    logger.info(f"   🔍 Found {len(table_names)} potential folders with tables.")
+
+    for table_name in table_names:
+        check_cancelled()
         is_excluded, reason = is_table_excluded(table_name, tables_to_exclude, exclusion_patterns)
         if is_excluded:
-            log_and_print(f"   ⤴ Skipping excluded table: '{table_name}' (reason: {reason})")
+            logger.info(f"   ⤴ Skipping excluded table: '{table_name}' (reason: {reason})")
             continue
 
         if measures_folder_name in table_name.lower().strip('#'):
-            log_and_print(f"   ⤴ Skipping measures folder: '{table_name}'")
+            logger.info(f"   ⤴ Skipping measures folder: '{table_name}'")
             continue
 
         if 'calculat' in table_name.lower() or 'calc' in table_name.lower():
-            log_and_print(f"   ⤴ Skipping calculated table: '{table_name}'")
+            logger.info(f"   ⤴ Skipping calculated table: '{table_name}'")
             continue
 
-        table_file_path = os.path.join(folder_tables, table_name, f"{table_name}.json")
-        
-        if not os.path.exists(table_file_path):
-            log_and_print(f"      ⚠️ WARNING: Definition file '{os.path.basename(table_file_path)}' not found. Skipping folder.")
-            continue
-        
+        if model_snapshot is not None:
+            table_data = model_snapshot["tables"][table_name]
+            table_file_path = f"{table_name} ({model_snapshot['format']})"
+        else:
+            table_file_path = os.path.join(folder_tables, table_name, f"{table_name}.json")
+            if not model_index.has_file(table_file_path):
+                logger.warning(f"      ⚠️ WARNING: Definition file '{os.path.basename(table_file_path)}' not found. Skipping folder.")
+                continue
+
         try:
-            with open(table_file_path, 'r', encoding='utf-8-sig') as f:
-                table_data = json.load(f)
-            
-            json_column_list = table_data.get("columns", [])
-            
-            if json_column_list:
-                calculated_columns = sum(1 for col in json_column_list if col.get("type") == "calculatedTableColumn")
-                if calculated_columns > 0:
-                    continue
-            
-            columns = []
-            measures_in_table = []
-            fields_in_hierarchies = set()
-            
-            for column in json_column_list:
-                if "name" in column:
-                    if column.get("type") == "calculated":
-                        measures_in_table.append(column["name"])
-                    else:
-                        columns.append(column["name"])
-            
-            for hierarchy in table_data.get("hierarchies", []):
-                for level in hierarchy.get("levels", []):
-                    field_in_hierarchy = level.get("column")
-                    if field_in_hierarchy:
-                        fields_in_hierarchies.add(field_in_hierarchy)
-            
-            if columns:
-                final_config.append({
-                    "table": table_name,
-                    "fields": columns,
-                    "measures_in_table": measures_in_table,
-                    "fields_in_hierarchies": list(fields_in_hierarchies)
-                })
+            if model_snapshot is None:
+                table_data = _load_json_file(table_file_path)
+
+            table_config = _field_config_for_table(table_name, table_data)
+            if table_config:
+                final_config.append(table_config)
         except (json.JSONDecodeError, KeyError, Exception) as e:
-            log_and_print(f"      ❌ ERROR: Cannot process file '{table_file_path}': {e}")
-    
+            logger.error(f"      ❌ ERROR: Cannot process file '{table_file_path}': {e}")
+
     return final_config
 
+
+def _field_config_for_table(table_name: str, table_data: Dict) -> Dict:
+    """TABLES_AND_FIELDS entry for one table definition; None for calculated tables and tables without columns."""
+    json_column_list = table_data.get("columns", [])
+
+    if json_column_list:
+        calculated_columns = sum(1 for col in json_column_list if col.get("type") == "calculatedTableColumn")
+        if calculated_columns > 0:
+            return None
+
+    columns = []
+    measures_in_table = []
+    fields_in_hierarchies = set()
+
+    for column in json_column_list:
+        if "name" in column:
+            if column.get("type") == "calculated":
+                measures_in_table.append(column["name"])
+            else:
+                columns.append(column["name"])
+
+    for hierarchy in table_data.get("hierarchies", []):
+        for level in hierarchy.get("levels", []):
+            field_in_hierarchy = level.get("column")
+            if field_in_hierarchy:
+                fields_in_hierarchies.add(field_in_hierarchy)
+
+    if not columns:
+        return None
+    return {
+        "table": table_name,
+        "fields": columns,
+        "measures_in_table": measures_in_table,
+        "fields_in_hierarchies": list(fields_in_hierarchies)
+    }
+
+
+def load_model_snapshot(model_path: str) -> Dict:
+    """
+    Table/role/relationship snapshot for models that are not a Tabular Editor folder export:
+    a TMDL definition folder (PBIP), a .pbit/.pbix with a DataModelSchema or a model.bim. None otherwise.
+    """
+    return load_tmdl_model(model_path) or load_pbit_model(model_path) or load_bim_model(model_path)
+
+
+def _load_table_definition(tabular_model_path: str, table_name: str, model_index: ModelDirectoryIndex = None) -> Dict:
+    """One table's definition from the model snapshot or tables/<T>/<T>.json; None when the model has no such table."""
+    model_snapshot = model_index.model_snapshot() if model_index is not None else load_model_snapshot(tabular_model_path)
+    if model_snapshot is not None:
+        return model_snapshot["tables"].get(table_name)
+
+    table_path = os.path.join(tabular_model_path, "tables", table_name, f"{table_name}.json")
+    if not (model_index.has_file(table_path) if model_index else os.path.exists(table_path)):
+        return None
+    return _load_json_file(table_path)
+
 # ===========================
 # 🌳 FUNCTIONS FOR HIERARCHIES
 # ===========================
 
-def find_usage_in_hierarchies(tables_and_fields: List[Dict]) -> List[Dict]:
+def find_usage_in_hierarchies(tables_and_fields: List[Dict]) -> List[UsageRecord]:
     hierarchy_results = []
     
     for tab_config in tables_and_fields:
@@ -334,14 +670,14 @@ def find_usage_in_hierarchies(tables_and_fields: List[Dict]) -> List[Dict]:
         fields_in_hierarchies = tab_config.get("fields_in_hierarchies", [])
         
         for field in fields_in_hierarchies:
-            hierarchy_results.append({
-                'field': f"{table_name}.{field}",
-                'usage_type': 'HIERARCHY',
-                'page': 'Model Structure',
-                'object_name': 'Drill-down navigation',
-                'file': f'{table_name}.json',
-                'method': 'HIERARCHY_SCAN'
-            })
+            hierarchy_results.append(UsageRecord(
+                field=f"{table_name}.{field}",
+                usage_type='HIERARCHY',
+                page='Model Structure',
+                object_name='Drill-down navigation',
+                file=f'{table_name}.json',
+                method='HIERARCHY_SCAN'
+            ))
     
     return hierarchy_results
 
@@ -349,56 +685,138 @@ def find_usage_in_hierarchies(tables_and_fields: List[Dict]) -> List[Dict]:
 # 📊 FUNCTIONS FOR TABULAR EDITOR
 # ===========================
 
-def load_measures_from_tabular_editor(folder_path: str, tables_and_fields: List[Dict], tabular_model_path: str) -> Dict[str, str]:
+_TMDL_EXTENSIONS = (".tmdl",)
+
+_DAX_MEASURE_HEADER = re.compile(r"[ \t]*MEASURE\s", re.IGNORECASE)
+_DAX_MEASURE_BLOCK = re.compile(r"MEASURE\s+(?:'[^']*'|[^\s'\[=]+(?=\[))?\s*(?:\[([^\]]*)\]|([^=\[]+?))\s*=\s*(.*)", re.IGNORECASE | re.DOTALL)
+
+
+def list_measure_files(folder_path: str) -> List[str]:
+    """Every non-hidden file under folder_path (one directory walk), sorted by path."""
+    files = []
+    for root, dirs, names in os.walk(folder_path):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        files.extend(os.path.join(root, name) for name in names if not name.startswith('.'))
+    return sorted(files)
+
+
+def iter_dax_script_measures(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
     """
-    Loads measure definitions from Tabular Editor files and model structure.
-    Accepts tabular_model_path as a parameter.
+    (name, expression) for every `MEASURE 'Table'[Name] = ...` in a DAX script.
+    A measure runs until the next line that starts with MEASURE; each block is parsed once,
+    so the cost is linear in the script size.
+    """
+    block = None
+    for line in lines:
+        if _DAX_MEASURE_HEADER.match(line):
+            if block:
+                yield from _parse_dax_measure_block("".join(block))
+            block = [line.lstrip()]
+        elif block is not None:
+            block.append(line)
+    if block:
+        yield from _parse_dax_measure_block("".join(block))
+
+
+def _parse_dax_measure_block(block: str) -> Iterator[Tuple[str, str]]:
+    match = _DAX_MEASURE_BLOCK.match(block)
+    if match:
+        name = (match.group(1) or match.group(2) or "").strip().replace('[', '').replace(']', '')
+        if name:
+            yield name, match.group(3).strip()
+
+
+def iter_measures_from_file(file_path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Measures defined in one file of the measures folder: DAX scripts (MEASURE ...), TMDL (measure ...),
+    Tabular Editor JSON ({name, expression}) or, as a last resort, the whole file as one measure named
+    after it. Binary files are recognised by their first bytes and skipped without decoding.
+    """
+    with open(file_path, 'rb') as f:
+        encoding = sniff_encoding(f.read(4096), detect_binary=True)
+    if encoding is None:
+        return
+    with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
+        content = f.read()
+    record_file_read(len(content))
+
+    found = 0
+    splitter = iter_tmdl_measures if file_path.lower().endswith(_TMDL_EXTENSIONS) else iter_dax_script_measures
+    for name, expression in splitter(content.splitlines(keepends=True)):
+        found += 1
+        yield name, expression
+
+    stripped = content.strip()
+    if stripped.startswith(('{', '[')):
+        try:
+            record_json_parse()
+            json_measures = {}
+            extract_measures_from_json_recursively(json.loads(content), json_measures)
+        except json.JSONDecodeError:
+            json_measures = {}
+        found += len(json_measures)
+        yield from json_measures.items()
+
+    if not found and len(stripped) > 10 and any(k in stripped.upper() for k in ['CALCULATE', 'SUM', 'FILTER', 'VAR', 'RETURN']):
+        yield Path(file_path).stem, stripped
+
+
+def iter_measure_definitions(folder_path: str, tables_and_fields: List[Dict], tabular_model_path: str,
+                             model_index: ModelDirectoryIndex = None) -> Iterator[Tuple[str, str]]:
+    """
+    (name, expression) pairs as each file is parsed: the measures folder first, then TMDL/PBIT/BIM table
+    measures, then calculated columns from the table definitions. Later pairs with the same name
+    override earlier ones.
     """
-    measure_definitions = {}
-    
     if folder_path and Path(folder_path).exists():
         try:
-            file_patterns = ["*.dax", "*.txt", "*.sql", "*.json", "*.xml", "*.measure", "*"]
-            all_files = [p for w in file_patterns for p in glob.glob(os.path.join(folder_path, "**", w), recursive=True) if os.path.isfile(p)]
-            all_files = sorted(list(set(all_files)))
-            
-            for file_path in all_files:
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                    file_name_stem = Path(file_path).stem
-                    measures_from_file = extract_measures_from_text(content, file_name_stem)
-                    measure_definitions.update(measures_from_file)
-                except Exception as e:
-                    pass
+            if model_index is not None and model_index.contains(folder_path):
+                measure_files = model_index.files_under(folder_path)
+            else:
+                measure_files = list_measure_files(folder_path)
         except Exception as e:
-            log_and_print(f"❌ Error loading from Tabular Editor folder: {e}")
-        
-    measures_from_tables = 0
+            logger.error(f"❌ Error loading from Tabular Editor folder: {e}")
+            measure_files = []
+
+        for file_path in measure_files:
+            check_cancelled()
+            try:
+                yield from iter_measures_from_file(file_path)
+            except (OSError, ValueError):
+                continue
+
+    model_snapshot = model_index.model_snapshot() if model_index is not None else load_model_snapshot(tabular_model_path)
+    if model_snapshot is not None:
+        # TMDL, PBIT and BIM keep measures inside their table definitions, not in a separate folder
+        for table_data in model_snapshot["tables"].values():
+            for measure in table_data.get("measures", []):
+                yield measure["name"], measure["expression"]
+
     for table_config in tables_and_fields:
         table_name = table_config["table"]
-        table_path = os.path.join(tabular_model_path, "tables", table_name, f"{table_name}.json")
-        
-        if os.path.exists(table_path):
-            try:
-                with open(table_path, 'r', encoding='utf-8-sig') as f:
-                    table_data = json.load(f)
-                
-                for item in table_data.get("columns", []):
-                    if item.get("type") == "calculated":
-                        measure_name = item["name"]
-                        expression = item.get("expression", [])
-                        
-                        if isinstance(expression, list):
-                            expression = '\n'.join(str(line) for line in expression)
-                        
-                        measure_definitions[measure_name] = expression
-                        measures_from_tables += 1
-            except Exception as e:
-                log_and_print(f"⚠️ Error loading measures from table {table_name}: {e}")
-    
-    log_and_print(f"✅ Loaded {len(measure_definitions)} measures for analysis.")
-    
+        try:
+            table_data = _load_table_definition(tabular_model_path, table_name, model_index)
+        except Exception as e:
+            logger.warning(f"⚠️ Error loading measures from table {table_name}: {e}")
+            continue
+        if not table_data:
+            continue
+
+        for item in table_data.get("columns", []):
+            if item.get("type") == "calculated":
+                expression = item.get("expression", [])
+                if isinstance(expression, list):
+                    expression = '\n'.join(str(line) for line in expression)
+                yield item["name"], expression
+
+
+def load_measures_from_tabular_editor(folder_path: str, tables_and_fields: List[Dict], tabular_model_path: str) -> Dict[str, str]:
+    """
+    Loads measure definitions from Tabular Editor files and model structure.
+    Accepts tabular_model_path as a parameter.
+    """
+    measure_definitions = dict(iter_measure_definitions(folder_path, tables_and_fields, tabular_model_path))
+    logger.info(f"✅ Loaded {len(measure_definitions)} measures for analysis.")
     return measure_definitions
 
 
@@ -408,6 +826,7 @@ def analyze_marts_audit(marts_path: str, reporting_path: str, fields_to_analyze:
     if total_fields == 0: return results
 
     for i, field_full in enumerate(fields_to_analyze):
+        check_cancelled()
         if progress_callback: progress_callback(int(((i + 1) / total_fields) * 100))
         if not isinstance(field_full, str) or '.' not in field_full: continue
         
@@ -452,15 +871,15 @@ def comment_out_fields_in_marts_audit(marts_path: str, fields_to_comment: list)
     failed_count = 0
     
     for model_name, field_aliases in fields_by_model.items():
-        print(f"\n[MARTS AUDIT WRAPPER] Processing model: {model_name}")
+        logger.debug("\n[MARTS AUDIT WRAPPER] Processing model: %s", model_name)
         sql_file_path = find_dbt_file_for_alias(model_name, marts_path)
         
         if not sql_file_path:
-            print(f"   [ERROR] SQL file not found for model '{model_name}'. Skipping {len(field_aliases)} fields.")
+            logger.error(f"   [ERROR] SQL file not found for model '{model_name}'. Skipping {len(field_aliases)} fields.")
             failed_count += len(field_aliases)
             continue
         
-        print(f"   [MARTS AUDIT WRAPPER] Delegating modification of {os.path.basename(sql_file_path)} to core engine.")
+        logger.debug("   [MARTS AUDIT WRAPPER] Delegating modification of %s to core engine.", os.path.basename(sql_file_path))
         success = _execute_commenting_safely(sql_file_path, field_aliases)
         
         if success:
@@ -478,13 +897,11 @@ def comment_out_fields_in_marts_audit(marts_path: str, fields_to_comment: list)
 
 
 def extract_measures_from_text(text: str, file_name: str) -> Dict[str, str]:
-    measures = {}
-    pattern1 = re.findall(r"MEASURE\s+(?:'[^']*')?\[?([^\]]+)\]?\s*=\s*(.+?)(?=(?:MEASURE|\Z))", text, re.IGNORECASE | re.DOTALL)
-    for name, expression in pattern1:
-        measures[name.strip().replace('[', '').replace(']', '')] = expression.strip()
+    measures = dict(iter_dax_script_measures(text.splitlines(keepends=True)))
 
     try:
         if text.strip().startswith(('{', '[')):
+            record_json_parse()
             json_data = json.loads(text)
             extract_measures_from_json_recursively(json_data, measures)
     except json.JSONDecodeError: pass
@@ -504,19 +921,44 @@ def extract_measures_from_json_recursively(obj: Any, measures: Dict[str, str]):
     elif isinstance(obj, list):
         for el in obj: extract_measures_from_json_recursively(el, measures)
 
+def compile_field_patterns(fields_to_search: List[str]) -> List[Tuple[Any, List[str]]]:
+    """One compiled reference pattern per distinct column name, with the fields ('Table.column') it stands for."""
+    fields_by_name = OrderedDict()
+    for field in fields_to_search:
+        fields_by_name.setdefault(field.split('.')[-1], []).append(field)
+    return [
+        (re.compile(r'(\'|\[|\s|\()' + re.escape(base_field_name) + r'(\'|\]|\s|\)|\,)', re.IGNORECASE), fields)
+        for base_field_name, fields in fields_by_name.items()
+    ]
+
+def measure_field_dependencies(dax_definition: str, field_patterns: List[Tuple[Any, List[str]]]) -> Set[str]:
+    """Fields referenced by one measure (by column name, like the rest of the analyzer)."""
+    dependencies = set()
+    for pattern, fields in field_patterns:
+        record_regex_evals()
+        if pattern.search(dax_definition):
+            dependencies.update(fields)
+    return dependencies
+
 def analyze_measure_dependencies(measure_definitions: Dict[str, str], fields_to_search: List[str], 
-                               detailed_logging=False) -> Dict[str, Any]:
+                               detailed_logging=False, field_dependencies: Dict[str, Set[str]] = None) -> Dict[str, Any]:
     #Analyzes measure dependencies with optional detailed logging.
+    # field_dependencies: measure -> fields already found while the measures were streamed in
 
-    basic_dependencies = {name: set() for name in measure_definitions}
+    field_dependencies = field_dependencies or {}
+    field_patterns = None
+    basic_dependencies = {}
     
     for measure_name, dax_definition in measure_definitions.items():
-        for field in fields_to_search:
-            base_field_name = field.split('.')[-1]
-            if re.search(r'(\'|\[|\s|\()' + re.escape(base_field_name) + r'(\'|\]|\s|\)|\,)', 
-                        dax_definition, re.IGNORECASE):
-                basic_dependencies[measure_name].add(field)
+        check_cancelled()
+        if measure_name in field_dependencies:
+            basic_dependencies[measure_name] = set(field_dependencies[measure_name])
+        else:
+            if field_patterns is None:
+                field_patterns = compile_field_patterns(fields_to_search)
+            basic_dependencies[measure_name] = measure_field_dependencies(dax_definition, field_patterns)
 
+    for measure_name, dax_definition in measure_definitions.items():
         for other_measure in measure_definitions:
             if other_measure != measure_name and f"[{other_measure}]" in dax_definition:
                 basic_dependencies[measure_name].add(f"MEASURE:{other_measure}")
@@ -525,7 +967,7 @@ def analyze_measure_dependencies(measure_definitions: Dict[str, str], fields_to_
         return basic_dependencies
     
     # 🆕 ENHANCED: Detailed analysis
-    log_and_print("📊 Generating detailed measure dependency analysis...")
+    logger.info("📊 Generating detailed measure dependency analysis...")
     
     detailed_dependencies = {}
     
@@ -582,9 +1024,9 @@ def analyze_measure_dependencies(measure_definitions: Dict[str, str], fields_to_
         'is_detailed': True
     }
     
-    log_and_print(f"   📈 Analyzed {len(detailed_dependencies)} measures with dependencies")
-    log_and_print(f"   📊 Found {len(global_stats['isolated_measures'])} isolated measures")
-    log_and_print(f"   📊 Average dependencies per measure: {global_stats['average_dependencies_per_measure']:.1f}")
+    logger.info(f"   📈 Analyzed {len(detailed_dependencies)} measures with dependencies")
+    logger.info(f"   📊 Found {len(global_stats['isolated_measures'])} isolated measures")
+    logger.info(f"   📊 Average dependencies per measure: {global_stats['average_dependencies_per_measure']:.1f}")
     
     return result
 
@@ -618,6 +1060,7 @@ def find_indirect_usage_by_measures(direct_results: List[Dict], measure_dependen
 
 def extract_object_name(content: str, file_name: str) -> str:
     try:
+        record_json_parse()
         data = json.loads(content)
         
         # Strategy 1: Look for visual type + name combination
@@ -724,42 +1167,433 @@ def extract_page_name(file_path: str) -> str:
     
     return 'Unknown Page'
 
-def is_valid_field_reference(content: str, variant: str, field_name: str) -> bool:
-    for line in content.split('\n'):
-        if variant in line:
-            line_lower = line.lower().strip()
-            valid_contexts = [
-                'queryref', 'datafield', 'column', 'property', 'sourceref', 'expression', 
-                'measure', 'filter', 'entity', 'name', 'table', 'select', 'from', 'where',
-                'prototypequery', 'source', 'aggregation'
-            ]
-            if any(context in line_lower for context in valid_contexts):
-                if 'comment' not in line_lower and 'description' not in line_lower:
-                    return True
+# ===========================
+# 🔎 TEXT SEARCH LINE INDEX
+# ===========================
+
+# Text-search hits are classified on their line, clipped to this many characters either side of the
+# hit: pretty-printed layouts are unaffected, minified single-line JSON no longer means whole-file copies.
+TEXT_CONTEXT_RADIUS = 256
+
+
+class LayoutText:
+    """
+    One layout document prepared for text search: line start offsets are computed once, hits are
+    mapped to their line by binary search and the lower-cased context window of each hit is
+    computed once per variant.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        starts = [0]
+        pos = content.find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = content.find('\n', pos + 1)
+        self._line_starts = starts
+        self._contexts: Dict[str, List[str]] = {}
+
+    def line_bounds(self, offset: int) -> Tuple[int, int, int]:
+        """(0-based line number, start, end without the newline) of the line containing offset."""
+        line = bisect_right(self._line_starts, offset) - 1
+        start = self._line_starts[line]
+        end = self._line_starts[line + 1] - 1 if line + 1 < len(self._line_starts) else len(self.content)
+        return line, start, end
+
+    def hit_contexts(self, variant: str) -> List[str]:
+        """Lower-cased context of every hit of variant, in document order; a line holding several hits counts once."""
+        contexts = self._contexts.get(variant)
+        if contexts is None:
+            contexts = []
+            content = self.content
+            previous = None
+            pos = content.find(variant)
+            while pos != -1:
+                _, line_start, line_end = self.line_bounds(pos)
+                window = (max(line_start, pos - TEXT_CONTEXT_RADIUS), min(line_end, pos + len(variant) + TEXT_CONTEXT_RADIUS))
+                if window != previous:
+                    contexts.append(content[window[0]:window[1]].lower())
+                    previous = window
+                pos = content.find(variant, pos + 1)
+            self._contexts[variant] = contexts
+        return contexts
+
+    def first_hit_line(self, variant: str) -> Tuple[str, str]:
+        """(1-based line number, stripped line text up to 100 characters) of the first hit, as shown in detailed logs."""
+        pos = self.content.find(variant)
+        if pos == -1:
+            return 'N/A', 'Line not found'
+        line, start, end = self.line_bounds(pos)
+        content = self.content
+        while start < end and content[start].isspace():
+            start += 1
+        while end > start and content[end - 1].isspace():
+            end -= 1
+        return str(line + 1), content[start:min(end, start + 100)]
+
+
+def is_valid_field_reference(text: LayoutText, variant: str, field_name: str) -> bool:
+    valid_contexts = [
+        'queryref', 'datafield', 'column', 'property', 'sourceref', 'expression', 
+        'measure', 'filter', 'entity', 'name', 'table', 'select', 'from', 'where',
+        'prototypequery', 'source', 'aggregation'
+    ]
+    for context in text.hit_contexts(variant):
+        if any(valid in context for valid in valid_contexts):
+            if 'comment' not in context and 'description' not in context:
+                return True
     return False
 
-def determine_usage_type(content: str, variant: str, file_name: str) -> str:
-    context = ' '.join([line.lower() for line in content.split('\n') if variant in line])
+def determine_usage_type(text: LayoutText, variant: str, file_name: str) -> str:
+    context = ' '.join(text.hit_contexts(variant))
     if any(s in context for s in ['filter', 'slicer', 'where']): return 'FILTER'
     if any(s in context for s in ['visual', 'chart', 'table', 'matrix', 'select', 'prototypequery']): return 'VISUALIZATION'
     if any(s in context for s in ['measure', 'sum(', 'count(', 'calculate(', 'aggregation']): return 'MEASURE'
     if 'filter' in file_name.lower(): return 'FILTER'
     return 'OTHER'
 
-def search_single_pbix_for_field_usage(zip_path: str, tables_and_fields: List[Dict], detailed_logging=False) -> List[Dict]:
+# ===========================
+# ♻️ LAYOUT MEMBER FINDINGS (CONTENT-ADDRESSED)
+# ===========================
+
+def layout_member_key(info: zipfile.ZipInfo) -> Tuple:
+    """
+    Content address of a PBIX layout member, taken from the zip central directory: CRC32 and size,
+    plus the parts of the member name that findings depend on (its file name, used for the
+    fallback object name, the 'filter' hint used by determine_usage_type and the filter scope used
+    for field roles). The page is not part of the key: it is re-attributed from each member's own path.
+    """
+    return (info.CRC, info.file_size, info.filename.split('/')[-1], 'filter' in info.filename.lower(),
+            layout_filter_scope(info.filename))
+
+
+class LayoutFindingsCache:
+    """Findings of scanned layout members by layout_member_key; shared by every PBIX file of one run."""
+
+    def __init__(self):
+        self._findings: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple):
+        with self._lock:
+            findings = self._findings.get(key)
+            if findings is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return findings
+
+    def put(self, key: Tuple, findings: Dict):
+        with self._lock:
+            self._findings[key] = findings
+
+
+def _text_search_details(text: LayoutText, variant: str, field_key: str, variants: List[str], field_roles: Dict[str, List[str]]) -> Dict:
+    content = text.content
+    line_num, line_content = text.first_hit_line(variant)
+    
+    variant_pos = content.find(variant)
+    start_pos = max(0, variant_pos - 50)
+    end_pos = min(len(content), variant_pos + len(variant) + 50)
+    surrounding_context = content[start_pos:end_pos].replace(variant, f">>>{variant}<<<")
+    
+    # Roles come from the member's single parse; a member that is not valid JSON has none
+    usage_context = describe_field_roles(field_roles, field_key) if field_roles is not None else 'Text Search Context'
+    
+    return {
+        'full_context': surrounding_context,
+        'line_number': line_num,
+        'exact_expression': line_content,
+        'confidence_score': 75, 
+        'detection_details': f'Text search for variant: {variant}',
+        'variant_matched': variant,
+        'field_variations_count': len(variants),
+        'usage_context': usage_context
+    }
+
+
+def scan_layout_member(content: str, file_name: str, tables_and_fields: List[Dict], field_variants: Dict[str, List[str]],
+                       detailed_logging=False) -> Dict:
+    """
+    Everything one layout member can contribute, independent of the page it sits on:
+        structural - (field, usage_type, context, details) from the JSON structure
+        text       - (field, [(usage_type, details), ...]) text-search candidates, first variant per usage type
+    attribute_layout_findings() turns them into UsageRecords for a concrete member path.
+    """
+    findings = {"object_name": None, "structural": [], "text": []}
+    field_roles = None
+
+    try:
+        record_json_parse()
+        json_data = json.loads(content)
+        if detailed_logging:
+            field_roles = extract_field_roles(json_data, file_name)
+        for full_field_name, usage_type, context in find_fields_in_json_structure(json_data, tables_and_fields):
+            details = None
+            if detailed_logging:
+                details = {
+                    'full_context': f'JSON structural reference in {context}',
+                    'line_number': 'N/A - JSON Structure',
+                    'exact_expression': f'Structural reference: {context}',
+                    'confidence_score': 90,  
+                    'detection_details': f'JSON structural analysis: {context}',
+                    'file_size': len(content),
+                    'usage_context': describe_field_roles(field_roles, full_field_name)
+                }
+            findings["structural"].append((full_field_name, usage_type, context, details))
+    except (json.JSONDecodeError, Exception):
+        if detailed_logging:
+            logger.debug("⚠️ Could not parse JSON in %s", os.path.basename(file_name))
+
+    text = LayoutText(content)
+    for field_key, variants in field_variants.items():
+        field_name = field_key.split('.')[-1]
+        candidates = []
+        seen_usage_types = set()
+        for variant in variants:
+            if variant in content:
+                if not is_valid_field_reference(text, variant, field_name):
+                    continue
+                usage_type = determine_usage_type(text, variant, file_name)
+                # A later variant with the same usage type can never be the one recorded
+                if usage_type in seen_usage_types:
+                    continue
+                seen_usage_types.add(usage_type)
+                details = _text_search_details(text, variant, field_key, variants, field_roles) if detailed_logging else None
+                candidates.append((usage_type, details))
+        if candidates:
+            findings["text"].append((field_key, candidates))
+
+    if findings["structural"] or findings["text"]:
+        findings["object_name"] = extract_object_name(content, file_name)
+    return findings
+
+
+def _scan_worker_count(infos: List[zipfile.ZipInfo], field_variants: Dict[str, List[str]], max_workers: int = None) -> int:
+    """Scan processes for one report: 1 below PARALLEL_SCAN_MIN_WORK, else up to max_workers (default: CPU count)."""
+    work = sum(info.file_size for info in infos) * len(field_variants)
+    if work < PARALLEL_SCAN_MIN_WORK:
+        return 1
+    return max(1, min(max_workers or os.cpu_count() or 1, len(infos)))
+
+
+def scan_layout_members(archive: PbixArchive, infos: List[zipfile.ZipInfo], tables_and_fields: List[Dict],
+                        field_variants: Dict[str, List[str]], detailed_logging=False, max_workers: int = None) -> Dict[Tuple, Dict]:
+    """
+    {layout_member_key: findings} for the given members. Large reports are inflated on a thread pool
+    (zlib releases the GIL) and scanned on a process pool; the findings are the same as scanning
+    serially. Members that cannot be read or decoded are left out, as in the serial scan.
+    """
+    workers = _scan_worker_count(infos, field_variants, max_workers)
+    if workers > 1:
+        try:
+            return _scan_layout_members_parallel(archive, infos, tables_and_fields, field_variants, detailed_logging, workers)
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            logger.warning(f"   ⚠️ Parallel scan unavailable ({type(e).__name__}: {e}); scanning serially.")
+
+    scanned = {}
+    for info in infos:
+        check_cancelled()
+        try:
+            content = archive.read(info).decode('utf-8')
+            record_file_read(len(content))
+            scanned[layout_member_key(info)] = scan_layout_member(content, info.filename, tables_and_fields, field_variants, detailed_logging)
+        except Exception as e:
+            if detailed_logging:
+                logger.debug("⚠️ Error processing file %s: %s", os.path.basename(info.filename), e)
+    return scanned
+
+
+# Set once per scan worker process by the pool initializer
+_scan_worker_state: Tuple = None
+
+
+def _init_scan_worker(tables_and_fields: List[Dict], field_variants: Dict[str, List[str]], detailed_logging: bool):
+    global _scan_worker_state
+    _scan_worker_state = (tables_and_fields, field_variants, detailed_logging)
+
+
+def _scan_shared_members(shm_name: str, spans: List[Tuple[int, int, str]]) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Scans members stored in a shared-memory block as (offset, length, member name) spans; None for
+    unreadable ones. Also returns the profiler counters of the scan, for the parent's profile.
+    """
+    from multiprocessing import shared_memory
+
+    tables_and_fields, field_variants, detailed_logging = _scan_worker_state
+    profiler = AnalysisProfiler("scan worker")
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        results = []
+        with profiler_scope(profiler):
+            for offset, length, file_name in spans:
+                try:
+                    content = bytes(block.buf[offset:offset + length]).decode('utf-8')
+                    results.append(scan_layout_member(content, file_name, tables_and_fields, field_variants, detailed_logging))
+                except Exception:
+                    results.append(None)
+        return results, profiler.counters()
+    finally:
+        block.close()
+
+
+def _iter_scan_batches(infos: List[zipfile.ZipInfo], batch_bytes: int) -> Iterator[List[zipfile.ZipInfo]]:
+    batch, size = [], 0
+    for info in infos:
+        if batch and size + info.file_size > batch_bytes:
+            yield batch
+            batch, size = [], 0
+        batch.append(info)
+        size += info.file_size
+    if batch:
+        yield batch
+
+
+def _scan_layout_members_parallel(archive: PbixArchive, infos: List[zipfile.ZipInfo], tables_and_fields: List[Dict],
+                                  field_variants: Dict[str, List[str]], detailed_logging: bool, workers: int) -> Dict[Tuple, Dict]:
+    """
+    Pipeline: a batch of members is inflated by threads into one shared-memory block, split into
+    per-worker tasks of similar size and scanned by the process pool while the next batch inflates.
+    Only (offset, length, name) spans cross the process boundary on the way in.
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    import multiprocessing
+    from multiprocessing import shared_memory
+
+    scanned = {}
+    in_flight = []  # (shared-memory block, [(future, infos of its spans)])
+
+    def collect(block, tasks):
+        for future, task_infos in tasks:
+            task_findings, counters = future.result()
+            record_counters(counters)
+            for info, findings in zip(task_infos, task_findings):
+                if findings is not None:
+                    scanned[layout_member_key(info)] = findings
+        block.close()
+        block.unlink()
+
+    logger.info(f"   ⚡ Scanning {len(infos)} layout members with {workers} processes...")
+    # Spawned, not forked: the scan starts from a process whose other threads (UI pool, inflaters,
+    # concurrent jobs) may hold logging/zlib/allocator locks, and a forked child would inherit them
+    # locked and hang instead of failing over to the serial scan.
+    scanners = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_scan_worker, initargs=(tables_and_fields, field_variants, detailed_logging))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as inflaters:
+            for batch in _iter_scan_batches(infos, PARALLEL_SCAN_BATCH_BYTES):
+                check_cancelled()
+                contents = list(inflaters.map(archive.read, batch))
+                total = sum(len(content) for content in contents)
+                for content in contents:
+                    record_file_read(len(content))
+
+                block = shared_memory.SharedMemory(create=True, size=max(total, 1))
+                spans, offset = [], 0
+                for info, content in zip(batch, contents):
+                    block.buf[offset:offset + len(content)] = content
+                    spans.append((offset, len(content), info.filename))
+                    offset += len(content)
+                del contents
+
+                # Several tasks per worker keep the pool balanced when member sizes vary
+                task_bytes = max(1, total // (workers * 4))
+                tasks, task_spans, task_infos, size = [], [], [], 0
+                for info, span in zip(batch, spans):
+                    task_spans.append(span)
+                    task_infos.append(info)
+                    size += span[1]
+                    if size >= task_bytes:
+                        tasks.append((scanners.submit(_scan_shared_members, block.name, task_spans), task_infos))
+                        task_spans, task_infos, size = [], [], 0
+                if task_spans:
+                    tasks.append((scanners.submit(_scan_shared_members, block.name, task_spans), task_infos))
+                in_flight.append((block, tasks))
+
+                # Release blocks whose scans are done before inflating the next batch
+                while in_flight and all(future.done() for future, _ in in_flight[0][1]):
+                    collect(*in_flight.pop(0))
+
+        while in_flight:
+            block, tasks = in_flight[0]
+            pending = [future for future, _ in tasks if not future.done()]
+            if pending:
+                check_cancelled()
+                wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                continue
+            collect(*in_flight.pop(0))
+    finally:
+        scanners.shutdown(wait=True, cancel_futures=True)
+        for block, _ in in_flight:
+            block.close()
+            block.unlink()
+    return scanned
+
+
+def attribute_layout_findings(findings: Dict, file_name: str, found_unique: Set[Tuple], results: List[UsageRecord]):
+    """Appends the member's findings as UsageRecords for member path `file_name`, skipping (field, usage_type, page) already found."""
+    if not findings["structural"] and not findings["text"]:
+        return
+    page = extract_page_name(file_name)
+    obj = findings["object_name"]
+    member_file = os.path.basename(file_name)
+
+    for full_field_name, usage_type, context, details in findings["structural"]:
+        unique_key = (full_field_name, usage_type, page)
+        if unique_key not in found_unique:
+            found_unique.add(unique_key)
+            result_data = UsageRecord(
+                field=full_field_name, 
+                usage_type=usage_type,
+                page=page, 
+                object_name=obj,
+                file=member_file,
+                method=f'JSON_STRUCTURE_{context}'
+            )
+            if details:
+                result_data.update(details)
+            results.append(result_data)
+
+    for field_key, candidates in findings["text"]:
+        for usage_type, details in candidates:
+            unique_key = (field_key, usage_type, page)
+            if unique_key not in found_unique:
+                found_unique.add(unique_key)
+                result_data = UsageRecord(
+                    field=field_key, 
+                    usage_type=usage_type,
+                    page=page, 
+                    object_name=obj,
+                    file=member_file,
+                    method='TEXT_SEARCH'
+                )
+                if details:
+                    result_data.update(details)
+                results.append(result_data)
+                break
+
+def search_single_pbix_for_field_usage(zip_path: str, tables_and_fields: List[Dict], detailed_logging=False,
+                                       member_cache: "LayoutFindingsCache" = None, scan_workers: int = None) -> List[UsageRecord]:
     
     #Searches for field usage in PBIX files.
+    #With a member_cache, layout members already scanned in this run (same bytes, see layout_member_key)
+    #are not decompressed again: their findings are re-attributed to this file's pages.
+    #scan_workers: most processes for scanning a large report (None = CPU count, 1 = serial).
     
 
     results = []
     found_unique = set() 
     
     if not Path(zip_path).exists():
-        log_and_print(f"❌ PBIX file not found: {zip_path}")
+        logger.error(f"❌ PBIX file not found: {zip_path}")
         return results
 
     if detailed_logging:
-        log_and_print("📊 Detailed logging mode: collecting enhanced context data...")
+        logger.info("📊 Detailed logging mode: collecting enhanced context data...")
 
     field_variants = {}
     for table_config in tables_and_fields:
@@ -797,150 +1631,76 @@ def search_single_pbix_for_field_usage(zip_path: str, tables_and_fields: List[Di
             
             results.append(result)
 
-    with zipfile.ZipFile(zip_path, 'r') as zipf:
-        json_files = [f for f in zipf.namelist() if f.endswith('.json') and not any(p in f.lower() for p in ['bookmark', 'resources'])]
+    with open_pbix_archive(zip_path) as archive:
+        json_files = [info for info in archive.infolist() if info.filename.endswith('.json') and not any(p in info.filename.lower() for p in ['bookmark', 'resources'])]
         
         if detailed_logging:
-            log_and_print(f"📁 Processing {len(json_files)} JSON files for detailed analysis...")
+            logger.info(f"📁 Processing {len(json_files)} JSON files for detailed analysis...")
         
-        for file_name in json_files:
-            try:
-                with zipf.open(file_name) as f:
-                    content = f.read().decode('utf-8')
-                
-                try:
-                    json_data = json.loads(content)
-                    structural_findings = find_fields_in_json_structure(json_data, tables_and_fields)
-                    
-                    for full_field_name, usage_type, context in structural_findings:
-                        page = extract_page_name(file_name)
-                        obj = extract_object_name(content, file_name)
-                        
-                        unique_key = (full_field_name, usage_type, page)
-                        if unique_key not in found_unique:
-                            found_unique.add(unique_key)
-                            
-                            result_data = {
-                                'field': full_field_name, 
-                                'usage_type': usage_type,
-                                'page': page, 
-                                'object_name': obj,
-                                'file': os.path.basename(file_name),
-                                'method': f'JSON_STRUCTURE_{context}'
-                            }
-                            
-                            if detailed_logging:
-
-                                table_name, field_name = full_field_name.split('.', 1) if '.' in full_field_name else ('', full_field_name)
-                                usage_context = extract_usage_context_simple(json_data, field_name, table_name)
-                                
-                                result_data.update({
-                                    'full_context': f'JSON structural reference in {context}',
-                                    'line_number': 'N/A - JSON Structure',
-                                    'exact_expression': f'Structural reference: {context}',
-                                    'confidence_score': 90,  
-                                    'detection_details': f'JSON structural analysis: {context}',
-                                    'file_size': len(content),
-                                    'usage_context': usage_context  
-                                })
-                            
-                            results.append(result_data)
-                            
-                except (json.JSONDecodeError, Exception):
-                    if detailed_logging:
-                        log_and_print(f"⚠️ Could not parse JSON in {os.path.basename(file_name)}")
-
-                for field_key, variants in field_variants.items():
-                    field_name = field_key.split('.')[-1]
-                    for variant in variants:
-                        if variant in content:
-                            if not is_valid_field_reference(content, variant, field_name):
-                                continue
-                            
-                            usage_type = determine_usage_type(content, variant, file_name)
-                            page = extract_page_name(file_name)
-                            obj = extract_object_name(content, file_name)
-                            
-                            unique_key = (field_key, usage_type, page)
-                            if unique_key not in found_unique:
-                                found_unique.add(unique_key)
-                                
-                                result_data = {
-                                    'field': field_key, 
-                                    'usage_type': usage_type,
-                                    'page': page, 
-                                    'object_name': obj,
-                                    'file': os.path.basename(file_name),
-                                    'method': 'TEXT_SEARCH'
-                                }
-                                
-                                if detailed_logging:
-                                    lines = content.split('\n')
-                                    line_num = 'N/A'
-                                    line_content = 'Line not found'
-                                    for i, line in enumerate(lines):
-                                        if variant in line:
-                                            line_num = str(i + 1)
-                                            line_content = line.strip()[:100]
-                                            break
-                                    
-                                    variant_pos = content.find(variant)
-                                    start_pos = max(0, variant_pos - 50)
-                                    end_pos = min(len(content), variant_pos + len(variant) + 50)
-                                    surrounding_context = content[start_pos:end_pos].replace(variant, f">>>{variant}<<<")
-                                    
-                                    table_name, field_name = field_key.split('.', 1) if '.' in field_key else ('', field_key)
-                                    try:
-                                        json_data = json.loads(content)
-                                        usage_context = extract_usage_context_simple(json_data, field_name, table_name)
-                                    except:
-                                        usage_context = 'Text Search Context'
-                                    
-                                    result_data.update({
-                                        'full_context': surrounding_context,
-                                        'line_number': line_num,
-                                        'exact_expression': line_content,
-                                        'confidence_score': 75, 
-                                        'detection_details': f'Text search for variant: {variant}',
-                                        'variant_matched': variant,
-                                        'field_variations_count': len(variants),
-                                        'usage_context': usage_context
-                                    })
-                                
-                                results.append(result_data)
-                                break
-                                
-            except Exception as e:
-                if detailed_logging:
-                    log_and_print(f"⚠️ Error processing file {os.path.basename(file_name)}: {e}")
+        # One scan per content address: members already scanned in this run, or repeated within this
+        # file, reuse the findings
+        findings_by_key = {}
+        to_scan = []
+        for info in json_files:
+            member_key = layout_member_key(info)
+            if member_key in findings_by_key:
+                continue
+            findings_by_key[member_key] = member_cache.get(member_key) if member_cache is not None else None
+            if findings_by_key[member_key] is None:
+                to_scan.append(info)
+
+        archive.prefetch(to_scan)
+        scanned = scan_layout_members(archive, to_scan, tables_and_fields, field_variants, detailed_logging, max_workers=scan_workers)
+        for member_key, findings in scanned.items():
+            findings_by_key[member_key] = findings
+            if member_cache is not None:
+                member_cache.put(member_key, findings)
+
+        # Attribution stays serial and in archive order, so the merged result matches a serial scan
+        for info in json_files:
+            findings = findings_by_key.get(layout_member_key(info))
+            if findings is not None:
+                attribute_layout_findings(findings, info.filename, found_unique, results)
 
     if detailed_logging:
-        log_and_print(f"📊 Detailed analysis completed:")
-        log_and_print(f"   Total results: {len(results)}")
+        logger.info(f"📊 Detailed analysis completed:")
+        logger.info(f"   Total results: {len(results)}")
     
     return results
 
-def search_for_field_usage(zip_paths: List[str], tables_and_fields: List[Dict], detailed_logging=False) -> List[Dict]:
+def search_for_field_usage(zip_paths: List[str], tables_and_fields: List[Dict], detailed_logging=False) -> List[UsageRecord]:
     """
     Searches for field usage across multiple PBIX files.
     Aggregates results - field is considered used if found in ANY report.
     """
+    return run_to_completion(iter_field_usage(zip_paths, tables_and_fields, detailed_logging))
+
+def iter_field_usage(zip_paths: List[str], tables_and_fields: List[Dict], detailed_logging=False,
+                     progress_range: Tuple[int, int] = (0, 100), scan_workers: int = None) -> Generator[Dict, None, List[UsageRecord]]:
+    """
+    Generator version of search_for_field_usage: yields one "pbix" event per processed file
+    (with that file's new findings and their usage flags) and returns the aggregated results.
+    """
     if not zip_paths:
-        log_and_print("❌ No PBIX files provided")
+        logger.error("❌ No PBIX files provided")
         return []
     
-    log_and_print(f"🔍 Analyzing {len(zip_paths)} PBIX file(s)...")
+    logger.info(f"🔍 Analyzing {len(zip_paths)} PBIX file(s)...")
     
     all_results = []
     found_unique = set()
     file_stats = {}
+    # Copied reports share byte-identical layout members: scan each distinct member once per run
+    member_cache = LayoutFindingsCache()
     
     for i, zip_path in enumerate(zip_paths):
         file_name = Path(zip_path).name
-        log_and_print(f"📊 Processing file {i+1}/{len(zip_paths)}: {file_name}")
+        logger.info(f"📊 Processing file {i+1}/{len(zip_paths)}: {file_name}")
+        first_new_result = len(all_results)
         
         try:
-            single_results = search_single_pbix_for_field_usage(zip_path, tables_and_fields, detailed_logging)
+            single_results = search_single_pbix_for_field_usage(zip_path, tables_and_fields, detailed_logging, member_cache=member_cache,
+                                                                scan_workers=scan_workers)
             file_stats[file_name] = len(single_results)
             
             new_findings = 0
@@ -957,28 +1717,60 @@ def search_for_field_usage(zip_paths: List[str], tables_and_fields: List[Dict],
                     all_results.append(result)
                     new_findings += 1
                     
-            log_and_print(f"   ✅ Found {len(single_results)} usages, {new_findings} new unique findings")
+            logger.info(f"   ✅ Found {len(single_results)} usages, {new_findings} new unique findings")
                     
         except Exception as e:
-            log_and_print(f"❌ Error processing {file_name}: {e}")
+            logger.error(f"❌ Error processing {file_name}: {e}")
             file_stats[file_name] = f"ERROR: {str(e)[:50]}"
-            continue
+
+        new_results = all_results[first_new_result:]
+        start, end = progress_range
+        yield {
+            "event": "pbix",
+            "file": file_name,
+            "index": i + 1,
+            "total": len(zip_paths),
+            "progress": start + int((end - start) * (i + 1) / len(zip_paths)),
+            "results": new_results,
+            "usage": usage_flags_by_field(new_results),
+        }
     
-    log_and_print(f"🎯 MULTI-PBIX ANALYSIS COMPLETE:")
-    log_and_print(f"   📁 Files processed: {len(zip_paths)}")
-    log_and_print(f"   ✅ Unique field usages: {len(all_results)}")
-    log_and_print(f"   📊 Per-file breakdown:")
+    logger.info(f"🎯 MULTI-PBIX ANALYSIS COMPLETE:")
+    logger.info(f"   📁 Files processed: {len(zip_paths)}")
+    logger.info(f"   ✅ Unique field usages: {len(all_results)}")
+    if member_cache.hits:
+        logger.info(f"   ♻️ Identical layout members reused: {member_cache.hits} (scanned: {member_cache.misses})")
+    logger.info(f"   📊 Per-file breakdown:")
     
     for file_name, count in file_stats.items():
         if isinstance(count, int):
-            log_and_print(f"      • {file_name}: {count} usages")
+            logger.info(f"      • {file_name}: {count} usages")
         else:
-            log_and_print(f"      • {file_name}: {count}")
+            logger.info(f"      • {file_name}: {count}")
     
     return all_results
 
 
-def search_for_relationships(tabular_model_path: str, all_fields: List[str]) -> Dict[str, bool]:
+def usage_flags_by_field(direct_usage: List[UsageRecord]) -> Dict[str, Dict[str, bool]]:
+    """{'Table.Column': {'visualization': ..., 'measure': ..., 'filter': ...}} for the fields found in PBIX results."""
+    flags = {}
+    for res in direct_usage:
+        usage_type = res.get('usage_type', '')
+        field_flags = flags.setdefault(res.get('field'), {"visualization": False, "measure": False, "filter": False})
+        if 'VISUALIZATION' in usage_type: field_flags["visualization"] = True
+        if 'MEASURE' in usage_type: field_flags["measure"] = True
+        if 'FILTER' in usage_type: field_flags["filter"] = True
+    return flags
+
+def run_to_completion(events: Generator):
+    """Drains an event generator and returns its return value."""
+    while True:
+        try:
+            next(events)
+        except StopIteration as stop:
+            return stop.value
+
+def search_for_relationships(tabular_model_path: str, all_fields: List[str], model_index: ModelDirectoryIndex = None) -> Dict[str, bool]:
     """
     FINAL, SIMPLIFIED AND ROBUST VERSION. This function aggressively scans ALL
     .json and .bim files within the path to find relationship definitions,
@@ -988,25 +1780,36 @@ def search_for_relationships(tabular_model_path: str, all_fields: List[str]) ->
     columns_in_relationships = set()
     
     if not tabular_model_path or not Path(tabular_model_path).exists():
-        print("[WARNING] Tabular model path not found, cannot search for relationships.")
+        logger.warning("[WARNING] Tabular model path not found, cannot search for relationships.")
         return relationships
 
-    print("   🔍 Aggressively scanning for relationships in all .json and .bim files...")
+    logger.info("   🔍 Aggressively scanning for relationships in all .json and .bim files...")
     
 
-    all_files_to_check = glob.glob(os.path.join(tabular_model_path, "**", "*.json"), recursive=True) + \
-                         glob.glob(os.path.join(tabular_model_path, "**", "*.bim"), recursive=True)
+    if model_index is not None:
+        all_files_to_check = model_index.files_with_extension(".json") + model_index.files_with_extension(".bim")
+    else:
+        all_files_to_check = glob.glob(os.path.join(tabular_model_path, "**", "*.json"), recursive=True) + \
+                             glob.glob(os.path.join(tabular_model_path, "**", "*.bim"), recursive=True)
+
+    model_snapshot = model_index.model_snapshot() if model_index is not None else load_model_snapshot(tabular_model_path)
+    all_found_relationships = list(model_snapshot["relationships"]) if model_snapshot is not None else []
 
-    if not all_files_to_check:
-        print("   ❌ CRITICAL WARNING: No .json or .bim files found in the specified path.")
+    if not all_files_to_check and model_snapshot is None:
+        logger.warning("   ❌ CRITICAL WARNING: No .json or .bim files found in the specified path.")
         return relationships
-        
-    all_found_relationships = []
     
     for file_path in all_files_to_check:
+        check_cancelled()
         try:
-            with open(file_path, 'r', encoding='utf-8-sig') as f:
-                model_data = json.load(f)
+            if file_path.lower().endswith(".bim"):
+                # Streamed, never loaded as one document; skipped when it is the model snapshot already counted above
+                bim_model = load_bim_model(file_path)
+                if bim_model is not model_snapshot:
+                    all_found_relationships.extend(bim_model["relationships"])
+                continue
+
+            model_data = _load_json_file(file_path)
 
             if os.path.basename(os.path.dirname(file_path)) == 'relationships':
                 if isinstance(model_data, dict):
@@ -1025,6 +1828,7 @@ def search_for_relationships(tabular_model_path: str, all_fields: List[str]) ->
                         if isinstance(value, list) and all(isinstance(i, str) for i in value):
                             try:
                                 json_string = "".join(value)
+                                record_json_parse()
                                 nested_rels = json.loads(json_string)
                                 if isinstance(nested_rels, list):
                                     all_found_relationships.extend(nested_rels)
@@ -1041,9 +1845,9 @@ def search_for_relationships(tabular_model_path: str, all_fields: List[str]) ->
             if isinstance(rel, dict) and all(k in rel for k in ['fromTable', 'fromColumn', 'toTable', 'toColumn']):
                 columns_in_relationships.add(f"{rel['fromTable']}.{rel['fromColumn']}")
                 columns_in_relationships.add(f"{rel['toTable']}.{rel['toColumn']}")
-        print(f"   ✅ Success. Found a total of {len(all_found_relationships)} relationships across all scanned files.")
+        logger.info(f"   ✅ Success. Found a total of {len(all_found_relationships)} relationships across all scanned files.")
     else:
-        print("   ❌ CRITICAL WARNING: No relationships found. Foreign Keys will be incorrectly marked as unused.")
+        logger.warning("   ❌ CRITICAL WARNING: No relationships found. Foreign Keys will be incorrectly marked as unused.")
     
     for field in all_fields:
         if field in columns_in_relationships:
@@ -1051,28 +1855,24 @@ def search_for_relationships(tabular_model_path: str, all_fields: List[str]) ->
             
     return relationships
 
-def find_usage_in_sort_by_column(tables_and_fields: List[Dict], tabular_model_path: str) -> Set[str]:
+def find_usage_in_sort_by_column(tables_and_fields: List[Dict], tabular_model_path: str, model_index: ModelDirectoryIndex = None) -> Set[str]:
     sorting_columns = set()
     
     if not tabular_model_path or not Path(tabular_model_path).exists():
         return sorting_columns
 
-    print("   🔍 Searching for 'Sort By Column' usage in Tabular model...")
+    logger.info("   🔍 Searching for 'Sort By Column' usage in Tabular model...")
 
     for table_config in tables_and_fields:
         table_name = table_config.get("table")
         if not table_name:
             continue
 
-        table_file_path = os.path.join(tabular_model_path, "tables", table_name, f"{table_name}.json")
-        
-        if not os.path.exists(table_file_path):
-            continue
-            
         try:
-            with open(table_file_path, 'r', encoding='utf-8-sig') as f:
-                table_data = json.load(f)
-            
+            table_data = _load_table_definition(tabular_model_path, table_name, model_index)
+            if not table_data:
+                continue
+
             json_column_list = table_data.get("columns", [])
             
             for column_definition in json_column_list:
@@ -1082,7 +1882,7 @@ def find_usage_in_sort_by_column(tables_and_fields: List[Dict], tabular_model_pa
                     full_name = f"{table_name}.{sort_by_column_name}"
                     
                     if full_name not in sorting_columns:
-                        print(f"      ✅ Found sorting usage: '{full_name}' sorts column '{column_definition['name']}'")
+                        logger.info(f"      ✅ Found sorting usage: '{full_name}' sorts column '{column_definition['name']}'")
                         sorting_columns.add(full_name)
 
         except (json.JSONDecodeError, KeyError, Exception) as e:
@@ -1090,31 +1890,47 @@ def find_usage_in_sort_by_column(tables_and_fields: List[Dict], tabular_model_pa
             
     return sorting_columns
 
-def find_usage_in_rls_filters(tabular_model_path: str) -> Set[str]:
+def _iter_role_definitions(tabular_model_path: str, model_index: ModelDirectoryIndex = None) -> Iterator[Dict]:
+    """Role definitions from the model snapshot (TMDL / PBIT / BIM) or the roles/*.json folder."""
+    model_snapshot = model_index.model_snapshot() if model_index is not None else load_model_snapshot(tabular_model_path)
+    if model_snapshot is not None:
+        yield from model_snapshot["roles"]
+        return
+
+    roles_path = os.path.join(tabular_model_path, "roles")
+    role_files = model_index.files_in(roles_path, ".json") if model_index is not None else glob.glob(os.path.join(roles_path, "*.json"))
+    for role_file in role_files:
+        try:
+            yield _load_json_file(role_file)
+        except (OSError, json.JSONDecodeError):
+            continue
+
+def find_usage_in_rls_filters(tabular_model_path: str, model_index: ModelDirectoryIndex = None) -> Set[str]:
     rls_columns = set()
     roles_path = os.path.join(tabular_model_path, "roles")
+    has_roles_folder = model_index.contains(roles_path) if model_index is not None else os.path.exists(roles_path)
 
-    if not os.path.exists(roles_path):
+    model_snapshot = model_index.model_snapshot() if model_index is not None else load_model_snapshot(tabular_model_path)
+    if not has_roles_folder and model_snapshot is None:
         return rls_columns
 
-    print("   🔒 Searching for RLS (Row-Level Security) usage...")
+    logger.info("   🔒 Searching for RLS (Row-Level Security) usage...")
 
     dax_column_pattern = re.compile(r"'([^']*)'\[([^\]]*)\]")
 
-    for role_file in glob.glob(os.path.join(roles_path, "*.json")):
+    for role_data in _iter_role_definitions(tabular_model_path, model_index):
         try:
-            with open(role_file, 'r', encoding='utf-8-sig') as f:
-                role_data = json.load(f)
 
             table_permissions = role_data.get("tablePermissions", [])
             for permission in table_permissions:
                 filter_expression = permission.get("filterExpression")
                 if filter_expression:
+                    record_regex_evals()
                     matches = dax_column_pattern.findall(filter_expression)
                     for table_name, column_name in matches:
                         full_name = f"{table_name}.{column_name}"
                         if full_name not in rls_columns:
-                            print(f"      ✅ Found RLS usage: '{full_name}' in role '{role_data.get('name')}'")
+                            logger.info(f"      ✅ Found RLS usage: '{full_name}' in role '{role_data.get('name')}'")
                             rls_columns.add(full_name)
 
         except (json.JSONDecodeError, KeyError, Exception) as e:
@@ -1307,17 +2123,13 @@ def show_field_details(field_name: str, results: List[Dict], relationships: Dict
 # 🔧 FIXED ALIAS AND DBT PARSERS
 # ===========================
 
-def find_snowflake_alias_for_table(table_name: str, tabular_model_path: str) -> str:
+def find_snowflake_alias_for_table(table_name: str, tabular_model_path: str, model_index: ModelDirectoryIndex = None) -> str:
     """Find Snowflake alias for a table - improved Power Query M parser"""
-    table_path = os.path.join(tabular_model_path, "tables", table_name, f"{table_name}.json")
-    
-    if not os.path.exists(table_path):
-        return ""
-    
     try:
-        with open(table_path, 'r', encoding='utf-8-sig') as f:
-            table_data = json.load(f)
-        
+        table_data = _load_table_definition(tabular_model_path, table_name, model_index)
+        if not table_data:
+            return ""
+
         partitions = table_data.get('partitions', [])
         for partition in partitions:
             if isinstance(partition, dict):
@@ -1337,6 +2149,7 @@ def find_snowflake_alias_for_table(table_name: str, tabular_model_path: str) ->
                         ]
                         
                         for pattern in patterns:
+                            record_regex_evals()
                             match = re.search(pattern, expression_str, re.IGNORECASE)
                             if match:
                                 alias = match.group(1)
@@ -1360,9 +2173,10 @@ def find_dbt_file_for_alias(alias: str, dbt_models_path: str) -> str:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
+            record_file_read(len(content))
             
             if f"alias='{alias}'" in content or f'alias="{alias}"' in content:
-                print(f"   [STRATEGY 1] Found file by alias in config: {os.path.basename(file_path)}")
+                logger.debug("   [STRATEGY 1] Found file by alias in config: %s", os.path.basename(file_path))
                 return file_path
         except Exception:
             continue
@@ -1372,13 +2186,13 @@ def find_dbt_file_for_alias(alias: str, dbt_models_path: str) -> str:
     # NEW - PATTERN 2.1: Search for a file in a subdirectory of the same name
     exact_path_in_subdir = os.path.join(dbt_models_path, alias, f"{alias}.sql")
     if os.path.exists(exact_path_in_subdir):
-        print(f"   [STRATEGY 2.1] Found exact path in subdirectory: {os.path.basename(exact_path_in_subdir)}")
+        logger.debug("   [STRATEGY 2.1] Found exact path in subdirectory: %s", os.path.basename(exact_path_in_subdir))
         return exact_path_in_subdir
 
     # NEW - PATTERN 2.2: Search for a file with the EXACT name anywhere (recursively)
     exact_name_files = glob.glob(os.path.join(dbt_models_path, "**", f"{alias}.sql"), recursive=True)
     if exact_name_files:
-        print(f"   [STRATEGY 2.2] Found file with exact name: {os.path.basename(exact_name_files[0])}")
+        logger.debug("   [STRATEGY 2.2] Found file with exact name: %s", os.path.basename(exact_name_files[0]))
         return exact_name_files[0]
 
     # --- STRATEGY 3: SEARCH BY GENERIC PATTERNS (FALLBACK) ---
@@ -1393,26 +2207,92 @@ def find_dbt_file_for_alias(alias: str, dbt_models_path: str) -> str:
     for pattern in name_patterns:
         files = glob.glob(os.path.join(dbt_models_path, "**", pattern), recursive=True)
         if files:
-            print(f"   [STRATEGY 3] Found file by pattern '{pattern}': {os.path.basename(files[0])}")
+            logger.debug("   [STRATEGY 3] Found file by pattern '%s': %s", pattern, os.path.basename(files[0]))
             return files[0]
     
-    print(f"   [ERROR] DBT file not found for alias '{alias}' in path {dbt_models_path}")
+    logger.warning(f"   [ERROR] DBT file not found for alias '{alias}' in path {dbt_models_path}")
     return ""
 
+class DbtProjectIndex:
+    """
+    The SQL files of one dbt models folder, read once.
+
+    file_for_alias() follows the same strategies, in the same order, as find_dbt_file_for_alias(),
+    but against the in-memory listing instead of re-globbing and re-reading the project for every
+    table. Workspace mode builds one index and shares it across all models.
+    """
+
+    def __init__(self, dbt_models_path: str):
+        self.dbt_models_path = dbt_models_path
+        self.sql_files = glob.glob(os.path.join(dbt_models_path, "**", "*.sql"), recursive=True) if os.path.exists(dbt_models_path) else []
+        self._contents = {}
+        self._file_by_alias = {}
+        for file_path in self.sql_files:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except Exception:
+                continue
+            record_file_read(len(content))
+            self._contents[file_path] = content
+
+    def content(self, file_path: str) -> str:
+        content = self._contents.get(file_path)
+        if content is None:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            record_file_read(len(content))
+        return content
+
+    def _files_matching(self, pattern: str) -> List[str]:
+        return [path for path in self.sql_files if fnmatch.fnmatch(os.path.basename(path), pattern)]
+
+    def file_for_alias(self, alias: str) -> str:
+        if not alias or not os.path.exists(self.dbt_models_path):
+            return ""
+        if alias not in self._file_by_alias:
+            self._file_by_alias[alias] = self._resolve_alias(alias)
+        return self._file_by_alias[alias]
+
+    def _resolve_alias(self, alias: str) -> str:
+        for file_path, content in self._contents.items():
+            if f"alias='{alias}'" in content or f'alias="{alias}"' in content:
+                return file_path
+
+        exact_path_in_subdir = os.path.join(self.dbt_models_path, alias, f"{alias}.sql")
+        if os.path.exists(exact_path_in_subdir):
+            return exact_path_in_subdir
+
+        exact_name_files = self._files_matching(f"{alias}.sql")
+        if exact_name_files:
+            return exact_name_files[0]
+
+        alias_clean = alias.replace('Dim', '').replace('Fact', '').replace('Bridge', '')
+        for pattern in (f"*{alias.lower()}*.sql", f"*{alias_clean.lower()}*.sql", f"marts_*{alias.lower()}*.sql", f"marts_*{alias_clean.lower()}*.sql"):
+            files = self._files_matching(pattern)
+            if files:
+                return files[0]
+
+        logger.warning(f"   [ERROR] DBT file not found for alias '{alias}' in path {self.dbt_models_path}")
+        return ""
+
 def find_source_marts_model_from_reporting_file(reporting_sql_path: str) -> str:
     if not os.path.exists(reporting_sql_path):
         return ""
     try:
         with open(reporting_sql_path, 'r', encoding='utf-8') as f:
             content = f.read()
-        
-        match = re.search(r"ref\(['\"](marts_[^'\"]+)['\"]\)", content, re.IGNORECASE)
-        if match:
-            return match.group(1)
-        return ""
+        return source_marts_model_from_content(content)
     except Exception:
         return ""
 
+def source_marts_model_from_content(content: str) -> str:
+    """The marts_* model a REPORTING model selects from (its first ref('marts_...'))."""
+    match = re.search(r"ref\(['\"](marts_[^'\"]+)['\"]\)", content, re.IGNORECASE)
+    if match:
+        return match.group(1)
+    return ""
+
 def analyze_dbt_columns_fixed(file_path: str) -> Dict[str, str]:
     if not os.path.exists(file_path):
         return {}
@@ -1420,7 +2300,15 @@ def analyze_dbt_columns_fixed(file_path: str) -> Dict[str, str]:
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
+    except Exception as e:
+        logger.error(f"   Error analyzing DBT columns in '{file_path}': {e}")
+        return {}
+
+    return analyze_dbt_columns_from_content(content, file_path)
 
+def analyze_dbt_columns_from_content(content: str, file_path: str = "") -> Dict[str, str]:
+    """Same as analyze_dbt_columns_fixed, for SQL that has already been read."""
+    try:
         content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
 
         main_select_content = _find_main_select_by_patterns(content)
@@ -1441,9 +2329,16 @@ def analyze_dbt_columns_fixed(file_path: str) -> Dict[str, str]:
         return dbt_columns
         
     except Exception as e:
-        print(f"   Error analyzing DBT columns in '{file_path}': {e}")
+        logger.error(f"   Error analyzing DBT columns in '{file_path}': {e}")
         return {}
 
+def dbt_column_positions(dbt_columns: Dict[str, str]) -> Dict[str, int]:
+    """{column alias: position in the main SELECT}; the first definition wins for repeated aliases."""
+    positions = {}
+    for alias in dbt_columns.values():
+        positions.setdefault(alias, len(positions))
+    return positions
+
 def get_all_fields_from_dbt_path(path: str) -> List[Dict]:
     """
     NEW FUNCTION: Scans an entire DBT path (e.g., marts) and collects all defined fields.
@@ -1453,13 +2348,13 @@ def get_all_fields_from_dbt_path(path: str) -> List[Dict]:
         A list of dictionaries, e.g., [{"field": "FieldName", "source_model": "model_name"}, ...]
     """
     if not os.path.exists(path):
-        print(f"⚠️ [Field Collector] Path does not exist: {path}")
+        logger.warning(f"⚠️ [Field Collector] Path does not exist: {path}")
         return []
 
     all_fields = []
     sql_files = glob.glob(os.path.join(path, "**", "*.sql"), recursive=True)
     
-    print(f"🔍 [Field Collector] Found {len(sql_files)} .sql files in '{path}' to scan.")
+    logger.info(f"🔍 [Field Collector] Found {len(sql_files)} .sql files in '{path}' to scan.")
 
     for file_path in sql_files:
         try:
@@ -1477,10 +2372,10 @@ def get_all_fields_from_dbt_path(path: str) -> List[Dict]:
                     "source_model": model_name
                 })
         except Exception as e:
-            print(f"⚠️ [Field Collector] Error while processing file {os.path.basename(file_path)}: {e}")
+            logger.warning(f"⚠️ [Field Collector] Error while processing file {os.path.basename(file_path)}: {e}")
             continue
             
-    print(f"✅ [Field Collector] Successfully collected {len(all_fields)} fields.")
+    logger.info(f"✅ [Field Collector] Successfully collected {len(all_fields)} fields.")
     return all_fields
 
 
@@ -1728,6 +2623,19 @@ def _extract_column_alias(line_for_parsing: str) -> str:
 # 🎯 FUNCTIONS FOR COMMENTING OUT COLUMNS
 # ===========================
 
+def _write_sql_file(sql_file_path: str, content: str):
+    """Replaces a SQL file in one step (temp file + rename), so a concurrent reader never sees it truncated."""
+    directory = os.path.dirname(os.path.abspath(sql_file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(sql_file_path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        shutil.copymode(sql_file_path, temp_path)
+        os.replace(temp_path, sql_file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
 def comment_out_unused_columns_in_dbt(sql_file_path: str, dbt_columns: Dict[str, str], unused_column_names: List[str]) -> bool:
     """
@@ -1746,14 +2654,14 @@ def comment_out_unused_columns_in_dbt(sql_file_path: str, dbt_columns: Dict[str,
         
         main_select_blocks = _find_all_main_select_blocks_final(lines)
         if not main_select_blocks:
-            print(f"   [WARNING] Could not identify a main SELECT block in {os.path.basename(sql_file_path)}. Skipping modification.")
+            logger.warning(f"   [WARNING] Could not identify a main SELECT block in {os.path.basename(sql_file_path)}. Skipping modification.")
             return False 
 
         safe_zone = main_select_blocks[-1]
         safe_start_line = safe_zone['start']
         safe_end_line = safe_zone['end']
         
-        print(f"   [DEBUG] Identified safe zone for modification: Lines {safe_start_line + 1} to {safe_end_line + 1}")
+        logger.debug("   [DEBUG] Identified safe zone for modification: Lines %s to %s", safe_start_line + 1, safe_end_line + 1)
 
         modified_lines = list(lines)
         unused_aliases_lower = {name.lower() for name in unused_column_names}
@@ -1785,15 +2693,12 @@ def comment_out_unused_columns_in_dbt(sql_file_path: str, dbt_columns: Dict[str,
             if ends_with_newline:
                 modified_content += '\n'
             
-            with open(sql_file_path, 'w', encoding='utf-8') as f:
-                f.write(modified_content)
+            _write_sql_file(sql_file_path, modified_content)
         
         return True
 
     except Exception as e:
-        print(f"   [CRITICAL ERROR] An exception occurred in the core commenting engine: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"   [CRITICAL ERROR] An exception occurred in the core commenting engine: {e}", exc_info=True)
         return False
         
 def _execute_commenting_safely(sql_file_path: str, unused_aliases: List[str]) -> bool:
@@ -1809,7 +2714,7 @@ def _execute_commenting_safely(sql_file_path: str, unused_aliases: List[str]) ->
         unused_aliases_lower = {name.lower() for name in unused_aliases}
 
         if _detect_main_level_union(original_content):
-            print(f"   [CORE ENGINE] UNION detected. Using symmetric strategy.")
+            logger.debug("   [CORE ENGINE] UNION detected. Using symmetric strategy.")
             select_blocks = _find_all_main_select_blocks_final(lines)
             if not select_blocks: return False
 
@@ -1827,7 +2732,7 @@ def _execute_commenting_safely(sql_file_path: str, unused_aliases: List[str]) ->
                 _fix_commas_in_select_block(modified_lines, block['start'], block['end'])
 
         else:
-            print(f"   [CORE ENGINE] Simple SELECT detected. Using last-block strategy.")
+            logger.debug("   [CORE ENGINE] Simple SELECT detected. Using last-block strategy.")
             safe_zone = _find_last_main_select_block(lines)
             if not safe_zone: return False
 
@@ -1846,15 +2751,12 @@ def _execute_commenting_safely(sql_file_path: str, unused_aliases: List[str]) ->
         if ends_with_newline:
             final_content += '\n'
         
-        with open(sql_file_path, 'w', encoding='utf-8') as f:
-            f.write(final_content)
+        _write_sql_file(sql_file_path, final_content)
 
         return True
 
     except Exception as e:
-        print(f"   [CRITICAL CORE ENGINE ERROR] Failed to modify {os.path.basename(sql_file_path)}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"   [CRITICAL CORE ENGINE ERROR] Failed to modify {os.path.basename(sql_file_path)}: {e}", exc_info=True)
         return False
 
 def _fix_commas_in_select_block(modified_lines: list, start_line: int, end_line: int):
@@ -1868,7 +2770,7 @@ def _fix_commas_in_select_block(modified_lines: list, start_line: int, end_line:
                 content_without_comma = stripped_line.lstrip(',').lstrip()
                 indentation = line[:len(line) - len(line.lstrip())]
                 modified_lines[i] = indentation + content_without_comma
-                print(f"   [COMMA FIX] Removed leading comma from line {i + 1}.")
+                logger.debug("   [COMMA FIX] Removed leading comma from line %s.", i + 1)
             
             break
 
@@ -1966,7 +2868,7 @@ def _find_last_main_select_block(lines: List[str]) -> Dict[str, int]:
                 if end_line == -1:
                     end_line = len(lines)
                 
-                print(f"   [SAFE ZONE] Determined safe zone: lines {start_line + 1} to {end_line + 1}")
+                logger.debug("   [SAFE ZONE] Determined safe zone: lines %s to %s", start_line + 1, end_line + 1)
                 return {'start': start_line, 'end': end_line}
     
     return None
@@ -1991,162 +2893,249 @@ def _detect_main_level_union(content: str) -> bool:
 
 
 
-def run_commenting_out_for_table(table_name: str, unused_columns: list, tables_and_fields: list, tabular_model_path: str, dbt_models_path: str):
-    global _commenting_error_log
-    
-    print(f"🎯 DEBUG: Starting commenting for table: {table_name}")
-    print(f"   DEBUG: Unused columns count: {len(unused_columns)}")
-    print(f"   DEBUG: Unused columns: {unused_columns[:3]}{'...' if len(unused_columns) > 3 else ''}")
-    
+def _record_commenting_error(table_name: str, error_type: str, error_message: str, columns_affected: int, **extra):
+    entry = {'table': table_name, 'error_type': error_type, 'error_message': error_message, 'columns_affected': columns_affected}
+    entry.update(extra)
+    with _commenting_error_lock:
+        _commenting_error_log.append(entry)
+
+def _same_path(path_a: str, path_b: str) -> bool:
+    return bool(path_a and path_b) and os.path.normcase(os.path.abspath(path_a)) == os.path.normcase(os.path.abspath(path_b))
+
+def _get_dbt_file_lock(sql_file_path: str) -> threading.Lock:
+    key = os.path.normcase(os.path.abspath(sql_file_path))
+    with _dbt_file_locks_guard:
+        lock = _dbt_file_locks.get(key)
+        if lock is None:
+            lock = _dbt_file_locks[key] = threading.Lock()
+        return lock
+
+def resolve_commenting_target(table_name: str, unused_columns: list, tabular_model_path: str, dbt_index: DbtProjectIndex) -> str:
+    """The DBT file a table's columns are commented out in, or "" (with the error recorded)."""
     try:
-        print(f"   DEBUG: Step 1 - Finding Snowflake alias...")
+        logger.debug("   DEBUG: Step 1 - Finding Snowflake alias for %s...", table_name)
         snowflake_alias = find_snowflake_alias_for_table(table_name, tabular_model_path)
-        print(f"   DEBUG: Snowflake alias result: '{snowflake_alias}'")
-        
+        logger.debug("   DEBUG: Snowflake alias result: '%s'", snowflake_alias)
+
         if not snowflake_alias:
             error_msg = f"Could not find Snowflake alias for {table_name}"
-            print(f"   ERROR: {error_msg}")
-            _commenting_error_log.append({ 'table': table_name, 'error_type': 'SNOWFLAKE_ALIAS_NOT_FOUND', 'error_message': error_msg, 'columns_affected': len(unused_columns) })
-            return False
-        
-        print(f"   DEBUG: Step 2 - Finding DBT file for alias '{snowflake_alias}'...")
-        dbt_file_path = find_dbt_file_for_alias(snowflake_alias, dbt_models_path)
-        print(f"   DEBUG: DBT file path: '{dbt_file_path}'")
-        print(f"   DEBUG: DBT file exists: {os.path.exists(dbt_file_path) if dbt_file_path else False}")
-        
+            logger.error(f"   ERROR: {error_msg}")
+            _record_commenting_error(table_name, 'SNOWFLAKE_ALIAS_NOT_FOUND', error_msg, len(unused_columns))
+            return ""
+
+        logger.debug("   DEBUG: Step 2 - Finding DBT file for alias '%s'...", snowflake_alias)
+        dbt_file_path = dbt_index.file_for_alias(snowflake_alias)
+        logger.debug("   DEBUG: DBT file path: '%s'", dbt_file_path)
+
         if not dbt_file_path:
             error_msg = f"Could not find DBT file for alias '{snowflake_alias}'"
-            print(f"   ERROR: {error_msg}")
-            _commenting_error_log.append({ 'table': table_name, 'error_type': 'DBT_FILE_NOT_FOUND', 'error_message': error_msg, 'columns_affected': len(unused_columns) })
-            return False
-         
-        print(f"   DEBUG: Step 3 - Parsing DBT columns...")
-        dbt_columns = analyze_dbt_columns_fixed(dbt_file_path)
-        print(f"   DEBUG: DBT columns parsed: {len(dbt_columns)}")
-        print(f"   DEBUG: First 3 DBT columns: {list(dbt_columns.items())[:3]}")
-        
-        if not dbt_columns:
-            error_msg = f"Could not parse DBT columns for {table_name}"
-            print(f"   ERROR: {error_msg}")
-            _commenting_error_log.append({ 'table': table_name, 'error_type': 'DBT_PARSING_FAILED', 'error_message': error_msg, 'columns_affected': len(unused_columns) })
+            logger.error(f"   ERROR: {error_msg}")
+            _record_commenting_error(table_name, 'DBT_FILE_NOT_FOUND', error_msg, len(unused_columns), snowflake_alias=snowflake_alias)
+            return ""
+        return dbt_file_path
+
+    except Exception as e:
+        error_msg = f"Unexpected error processing {table_name}: {str(e)}"
+        logger.error(f"   ERROR: {error_msg}", exc_info=True)
+        _record_commenting_error(table_name, 'UNEXPECTED_ERROR', error_msg, len(unused_columns))
+        return ""
+
+def run_commenting_out_for_table(table_name: str, unused_columns: list, tables_and_fields: list, tabular_model_path: str, dbt_models_path: str,
+                                 dbt_file_path: str = None):
+    """
+    Comments out one table's columns in its DBT file. run_commenting_out_for_all_tables passes the
+    file it resolved up front; without one, the file is looked up here.
+    """
+    logger.debug("🎯 DEBUG: Starting commenting for table: %s", table_name)
+    logger.debug("   DEBUG: Unused columns count: %s", len(unused_columns))
+    logger.debug("   DEBUG: Unused columns: %s%s", unused_columns[:3], '...' if len(unused_columns) > 3 else '')
+
+    if dbt_file_path is None:
+        dbt_file_path = resolve_commenting_target(table_name, unused_columns, tabular_model_path, DbtProjectIndex(dbt_models_path))
+        if not dbt_file_path:
             return False
-        
-        print(f"   DEBUG: Step 4 - Preparing clean column names...")
-        clean_column_names = [col.split('.', 1)[1] for col in unused_columns if '.' in col]
-        print(f"   DEBUG: Clean column names: {clean_column_names[:3]}{'...' if len(clean_column_names) > 3 else ''}")
-        
-        print(f"   DEBUG: Step 5 - Checking column mapping...")
-        field_to_sql_def = {}
-        for column_name in clean_column_names:
-            found_mapping = False
+
+    try:
+        # Parsing and rewriting must see a consistent file: serialise per DBT file.
+        with _get_dbt_file_lock(dbt_file_path):
+            logger.debug("   DEBUG: Step 3 - Parsing DBT columns...")
+            dbt_columns = analyze_dbt_columns_fixed(dbt_file_path)
+            logger.debug("   DEBUG: DBT columns parsed: %s", len(dbt_columns))
+            logger.debug("   DEBUG: First 3 DBT columns: %s", list(dbt_columns.items())[:3])
+            
+            if not dbt_columns:
+                error_msg = f"Could not parse DBT columns for {table_name}"
+                logger.error(f"   ERROR: {error_msg}")
+                _record_commenting_error(table_name, 'DBT_PARSING_FAILED', error_msg, len(unused_columns), dbt_file=dbt_file_path)
+                return False
+            
+            logger.debug("   DEBUG: Step 4 - Preparing clean column names...")
+            clean_column_names = [col.split('.', 1)[1] for col in unused_columns if '.' in col]
+            logger.debug("   DEBUG: Clean column names: %s%s", clean_column_names[:3], '...' if len(clean_column_names) > 3 else '')
+            
+            logger.debug("   DEBUG: Step 5 - Checking column mapping...")
+            sql_def_by_alias = {}
             for sql_def, pbi_alias in dbt_columns.items():
-                if pbi_alias.lower() == column_name.lower():
+                sql_def_by_alias.setdefault(pbi_alias.lower(), sql_def)
+
+            field_to_sql_def = {}
+            for column_name in clean_column_names:
+                sql_def = sql_def_by_alias.get(column_name.lower())
+                if sql_def is not None:
                     field_to_sql_def[column_name] = sql_def
-                    found_mapping = True
-                    print(f"   DEBUG: Mapped '{column_name}' -> '{sql_def[:50]}...'")
-                    break
-            if not found_mapping:
-                print(f"   DEBUG: NO MAPPING for '{column_name}' in DBT columns")
-        
-        print(f"   DEBUG: Total mappings found: {len(field_to_sql_def)}")
-        
-        if not field_to_sql_def:
-            error_msg = f"No column mappings found for {table_name}"
-            print(f"   ERROR: {error_msg}")
-            _commenting_error_log.append({ 'table': table_name, 'error_type': 'NO_COLUMN_MAPPINGS', 'error_message': error_msg, 'columns_affected': len(unused_columns) })
-            return False
+                    logger.debug("   DEBUG: Mapped '%s' -> '%s...'", column_name, sql_def[:50])
+                else:
+                    logger.debug("   DEBUG: NO MAPPING for '%s' in DBT columns", column_name)
+            
+            logger.debug("   DEBUG: Total mappings found: %s", len(field_to_sql_def))
+            
+            if not field_to_sql_def:
+                error_msg = f"No column mappings found for {table_name}"
+                logger.error(f"   ERROR: {error_msg}")
+                _record_commenting_error(table_name, 'NO_COLUMN_MAPPINGS', error_msg, len(unused_columns), dbt_file=dbt_file_path)
+                return False
 
-        print(f"   DEBUG: Step 6 - Executing commenting...")
-        success = comment_out_unused_columns_in_dbt(
-            dbt_file_path, dbt_columns, clean_column_names
-        )
+            logger.debug("   DEBUG: Step 6 - Executing commenting...")
+            success = comment_out_unused_columns_in_dbt(
+                dbt_file_path, dbt_columns, clean_column_names
+            )
         
         if success:
-            print(f"   ✅ SUCCESS: Table {table_name} processed successfully")
+            logger.info(f"   ✅ SUCCESS: Table {table_name} processed successfully")
             return True
         else:
             error_msg = f"Failed to comment out columns in {table_name}"
-            print(f"   ERROR: {error_msg}")
-            _commenting_error_log.append({ 'table': table_name, 'error_type': 'COMMENTING_FAILED', 'error_message': error_msg, 'columns_affected': len(unused_columns) })
+            logger.error(f"   ERROR: {error_msg}")
+            _record_commenting_error(table_name, 'COMMENTING_FAILED', error_msg, len(unused_columns), dbt_file=dbt_file_path)
             return False
             
     except Exception as e:
         error_msg = f"Unexpected error processing {table_name}: {str(e)}"
-        print(f"   ERROR: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        _commenting_error_log.append({ 'table': table_name, 'error_type': 'UNEXPECTED_ERROR', 'error_message': error_msg, 'columns_affected': len(unused_columns) })
+        logger.error(f"   ERROR: {error_msg}", exc_info=True)
+        _record_commenting_error(table_name, 'UNEXPECTED_ERROR', error_msg, len(unused_columns))
         return False
 
-def run_commenting_out_for_all_tables(results: list, relationships: dict, indirect_usage: dict, tables_and_fields: list, tables_to_exclude: list, exclusion_patterns: list, user_selected_columns: list, tabular_model_path: str, dbt_models_path: str):
-    global _commenting_error_log
-    
-    _commenting_error_log = []
+def run_commenting_out_for_all_tables(results: list, relationships: dict, indirect_usage: dict, tables_and_fields: list, tables_to_exclude: list, exclusion_patterns: list, user_selected_columns: list, tabular_model_path: str, dbt_models_path: str,
+                                      max_workers: int = None, dbt_files: Dict[str, str] = None):
+    """
+    Comments out the selected columns table by table. Tables are independent jobs and run
+    on a thread pool; set max_workers=1 to process them serially.
+
+    Every table's DBT file is resolved before the pool starts (dbt_files, the table -> file
+    mapping the analysis already made, first): an alias lookup that reads the project while
+    another worker rewrites a file could miss it and fall back to a filename guess.
+    """
+    with _commenting_error_lock:
+        _commenting_error_log.clear()
     
-    print(f"\n🚀 STARTING COMMENTING OUT FOR ALL TABLES")
-    print("=" * 100)
+    logger.info(f"\n🚀 STARTING COMMENTING OUT FOR ALL TABLES")
+    logger.info("=" * 100)
     
     table_results = {}
     processed_tables = 0
     successes = 0
     excluded_tables_list = []
 
+    columns_by_table = {}
+    for col in user_selected_columns:
+        if '.' in col:
+            columns_by_table.setdefault(col.split('.', 1)[0], []).append(col)
+
+    jobs = []
     for tab_config in tables_and_fields:
         table_name = tab_config["table"]
         
         is_excluded_val, reason = is_table_excluded(table_name, tables_to_exclude, exclusion_patterns)
         
         if is_excluded_val:
-            print(f"↪ EXCLUDING TABLE: {table_name} (reason: {reason})")
+            logger.info(f"↪ EXCLUDING TABLE: {table_name} (reason: {reason})")
             excluded_tables_list.append(f"{table_name} → {reason}")
             table_results[table_name] = True
             processed_tables += 1
             successes += 1
             continue
         
-        columns_for_this_table = [col for col in user_selected_columns if col.startswith(f"{table_name}.")]
+        columns_for_this_table = columns_by_table.get(table_name, [])
         
         if not columns_for_this_table:
             successes += 1
             processed_tables += 1
             continue
 
-        success = run_commenting_out_for_table(table_name, columns_for_this_table, tables_and_fields, tabular_model_path, dbt_models_path)
-        table_results[table_name] = success
-        
-        if success:
+        jobs.append((table_name, columns_for_this_table))
+
+    dbt_files = dbt_files or {}
+    dbt_index = None
+    dbt_file_paths = {}
+    for table_name, columns_for_this_table in jobs:
+        dbt_file_path = dbt_files.get(table_name)
+        if not dbt_file_path or not os.path.exists(dbt_file_path):
+            if dbt_index is None:
+                dbt_index = DbtProjectIndex(dbt_models_path)
+            dbt_file_path = resolve_commenting_target(table_name, columns_for_this_table, tabular_model_path, dbt_index)
+        if dbt_file_path:
+            dbt_file_paths[table_name] = dbt_file_path
+        else:
+            table_results[table_name] = False
+    resolved_jobs = [(table_name, columns) for table_name, columns in jobs if table_name in dbt_file_paths]
+
+    if max_workers is None:
+        max_workers = COMMENTING_MAX_WORKERS
+    max_workers = max(1, min(max_workers, len(resolved_jobs)))
+
+    if max_workers == 1:
+        for table_name, columns_for_this_table in resolved_jobs:
+            table_results[table_name] = run_commenting_out_for_table(table_name, columns_for_this_table, tables_and_fields, tabular_model_path, dbt_models_path,
+                                                                     dbt_file_paths[table_name])
+    else:
+        logger.info(f"⚙️ Processing {len(resolved_jobs)} tables on {max_workers} worker threads...")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dbt-commenting") as executor:
+            futures = [
+                (table_name, executor.submit(run_commenting_out_for_table, table_name, columns_for_this_table, tables_and_fields, tabular_model_path, dbt_models_path,
+                                             dbt_file_paths[table_name]))
+                for table_name, columns_for_this_table in resolved_jobs
+            ]
+            for table_name, future in futures:
+                table_results[table_name] = future.result()
+
+    for table_name, _ in jobs:
+        if table_results[table_name]:
             successes += 1
-        
         processed_tables += 1
+
+    # Workers finish in arbitrary order; report errors in model order.
+    table_order = {tab_config["table"]: i for i, tab_config in enumerate(tables_and_fields)}
+    with _commenting_error_lock:
+        _commenting_error_log.sort(key=lambda error: table_order.get(error['table'], len(table_order)))
     
-    print(f"\n📊 COMMENTING OUT SUMMARY:")
-    print("=" * 100)
-    print(f"📢 Processed tables:    {processed_tables}")
-    print(f"✅ Successes:           {successes}")
-    print(f"❌ Errors:              {processed_tables - successes}")
-    print(f"↪ Excluded:            {len(excluded_tables_list)}")
+    logger.info(f"\n📊 COMMENTING OUT SUMMARY:")
+    logger.info("=" * 100)
+    logger.info(f"📢 Processed tables:    {processed_tables}")
+    logger.info(f"✅ Successes:           {successes}")
+    logger.info(f"❌ Errors:              {processed_tables - successes}")
+    logger.info(f"↪ Excluded:            {len(excluded_tables_list)}")
     
     if _commenting_error_log:
-        print(f"\n🚨 ERROR DETAILS:")
-        print("=" * 100)
+        logger.warning(f"\n🚨 ERROR DETAILS:")
+        logger.warning("=" * 100)
         total_affected_columns = 0
         for error in _commenting_error_log:
-            print(f"❌ Table: {error['table']}")
-            print(f"   Error: {error['error_message']}")
-            print(f"   Affected columns: {error['columns_affected']}")
+            logger.warning(f"❌ Table: {error['table']}")
+            logger.warning(f"   Error: {error['error_message']}")
+            logger.warning(f"   Affected columns: {error['columns_affected']}")
             total_affected_columns += error['columns_affected']
             if 'snowflake_alias' in error:
-                print(f"   Snowflake alias: {error['snowflake_alias']}")
+                logger.warning(f"   Snowflake alias: {error['snowflake_alias']}")
             if 'dbt_file' in error:
-                print(f"   DBT file: {error['dbt_file']}")
-            print()
+                logger.warning(f"   DBT file: {error['dbt_file']}")
+            logger.warning("")
         
-        print(f"⚠️ TOTAL COLUMNS NOT COMMENTED: {total_affected_columns}")
-        print("💡 Check terminal log above for detailed error information")
+        logger.warning(f"⚠️ TOTAL COLUMNS NOT COMMENTED: {total_affected_columns}")
+        logger.warning("💡 Check terminal log above for detailed error information")
     
     if successes > 0:
-        print(f"\n🎉 Successfully processed {successes} tables!")
-        print(f"📋 Check Git Changes - all changes should be visible.")
+        logger.info(f"\n🎉 Successfully processed {successes} tables!")
+        logger.info(f"📋 Check Git Changes - all changes should be visible.")
     
     return table_results
 
@@ -2158,81 +3147,149 @@ def run_commenting_out_for_all_tables(results: list, relationships: dict, indire
 
 
 def perform_analysis(zip_file_paths: List[str], tabular_model_path: str, dbt_models_path: str,
-                     progress_callback=None, enable_detailed_logging=False):
-    global _analysis_log_details
-    _analysis_log_details = []
-
-    def report_progress(value):
-        if progress_callback: progress_callback(value)
-
-    report_progress(0)
-    log_and_print("🚀 Power BI Field Usage Analyzer - Core Logic")
-
-    config = { "measures_folder_name": "measures", "tables_to_exclude": ["RefreshDate"], "exclusion_patterns": ["partition", "refresh"] }
-    for zip_path in zip_file_paths:
-        if not Path(zip_path).exists(): raise FileNotFoundError(f"PBIX file not found: {zip_path}")
-
-    report_progress(5)
-    log_and_print("\n📋 STEP 1: Dynamically loading columns from the model...")
-    tables_and_fields = dynamically_generate_field_config(tabular_model_path, config["tables_to_exclude"], config["exclusion_patterns"], config["measures_folder_name"])
-    if not tables_and_fields: raise ValueError("Failed to load any tables from the model.")
-    all_fields = [f"{conf['table']}.{field}" for conf in tables_and_fields for field in conf['fields']]
-
-    log_and_print("📋 STEP 1.5: Searching for usage in 'Sort By Column'...")
-    sort_by_columns = find_usage_in_sort_by_column(tables_and_fields, tabular_model_path)
-
-    log_and_print("📋 STEP 1.6: Searching for usage in RLS (Row-Level Security)...")
-    rls_columns = find_usage_in_rls_filters(tabular_model_path)
+                     progress_callback=None, enable_detailed_logging=False, dbt_index: DbtProjectIndex = None,
+                     scan_workers: int = None):
+    """
+    Runs the full REPORTING analysis. The second return value (intermediate_data) also carries
+    'profile': per-stage wall/CPU time, files/bytes read, JSON parses, regex evaluations and the process RSS high-water mark.
+    Pass a prebuilt `dbt_index` to reuse one dbt project listing across several models.
+    `scan_workers` caps the processes used to scan one large PBIX (None = CPU count, 1 = serial).
+    """
+    for event in iter_analysis(zip_file_paths, tabular_model_path, dbt_models_path, enable_detailed_logging=enable_detailed_logging,
+                               dbt_index=dbt_index, scan_workers=scan_workers):
+        if progress_callback and "progress" in event:
+            progress_callback(event["progress"])
+        if event["event"] == "done":
+            return event["results"], event["intermediate_data"]
+
+def iter_analysis(zip_file_paths: List[str], tabular_model_path: str, dbt_models_path: str,
+                  enable_detailed_logging=False, cancel_event: threading.Event = None,
+                  dbt_index: DbtProjectIndex = None, scan_workers: int = None) -> Iterator[Dict]:
+    """
+    Event-stream version of perform_analysis. Yields dicts with an "event" key:
 
-    report_progress(20)
-    log_and_print("📋 STEP 2: Searching for direct field usage in PBIX...")
-    direct_usage = search_for_field_usage(zip_file_paths, tables_and_fields, detailed_logging=enable_detailed_logging)
+      stage    - a pipeline step started ("stage", "progress")
+      columns  - the model columns are known; "rows" are UI rows with only model-level flags set
+      pbix     - one PBIX file was processed ("file", "index", "total", "progress", "results",
+                 "usage": {'Table.Column': flags} for the new findings)
+      progress - plain progress update
+      done     - final "results" and "intermediate_data" (same as perform_analysis returns)
 
-    report_progress(50)
-    log_and_print("📋 STEP 3: Loading and analyzing measures...")
-    # ... (loading measures without change)
-    measures_path = ""
-    if Path(tabular_model_path).exists():
-        for folder in glob.glob(os.path.join(tabular_model_path, '**', '*'), recursive=True):
-            if os.path.isdir(folder) and config["measures_folder_name"].lower() in os.path.basename(folder).lower():
-                measures_path = folder
-                break
-    measure_defs = load_measures_from_tabular_editor(measures_path, tables_and_fields, tabular_model_path)
-    dependencies = analyze_measure_dependencies(measure_defs, all_fields, detailed_logging=enable_detailed_logging)
-    basic_dependencies = dependencies['basic_dependencies'] if isinstance(dependencies, dict) and 'basic_dependencies' in dependencies else dependencies
-    indirect_usage = find_indirect_usage_by_measures(direct_usage, basic_dependencies, all_fields)
+    Setting `cancel_event` makes the next checkpoint raise AnalysisCancelled; closing the
+    generator has the same effect at the next event. Either way open files are closed.
+    """
+    profiler = AnalysisProfiler("perform_analysis")
+    with profiler.activate(), cancellation_scope(cancel_event):
+        final_ui_results, intermediate_data = yield from _iter_analysis_stages(
+            zip_file_paths, tabular_model_path, dbt_models_path, profiler,
+            enable_detailed_logging=enable_detailed_logging, dbt_index=dbt_index, scan_workers=scan_workers
+        )
 
-    report_progress(75)
-    log_and_print("📋 STEP 4: Checking relationships...")
-    relationships = search_for_relationships(tabular_model_path, all_fields)
+    intermediate_data["profile"] = profiler.to_dict()
+    totals = intermediate_data["profile"]["totals"]
+    logger.info(f"⏱️ Analysis took {totals['wall_s']:.2f}s (CPU {totals['cpu_s']:.2f}s), "
+                f"{totals['files_read']:,} files read, {totals['json_parses']:,} JSON parses, {totals['regex_evals']:,} regex evaluations.")
+    yield {"event": "done", "results": final_ui_results, "intermediate_data": intermediate_data}
 
-    report_progress(90)
-    log_and_print("📋 STEP 5: Preparing initial results for UI...")
+def _build_ui_rows(tables_and_fields: List[Dict], exclusion_patterns: list, usage_flags: Dict[str, Dict[str, bool]],
+                   indirect_usage: Dict, relationships: Dict[str, bool], sort_by_columns: Set[str], rls_columns: Set[str]) -> List[Dict]:
+    no_usage = {"visualization": False, "measure": False, "filter": False}
     ui_results = []
     for table_config in tables_and_fields:
         table_name, fields_list, hierarchy_fields = table_config.get("table"), table_config.get("fields", []), table_config.get("fields_in_hierarchies", [])
         if not table_name or not fields_list: continue
         for field in fields_list:
-            is_excluded, _ = is_field_excluded(field, config["exclusion_patterns"])
+            is_excluded, _ = is_field_excluded(field, exclusion_patterns)
             if is_excluded: continue
 
             full_name = f"{table_name}.{field}"
+            flags = usage_flags.get(full_name, no_usage)
             ui_results.append({
                 "table": table_name, "column": field,
-                "visualization": any(res.get('field') == full_name and 'VISUALIZATION' in res.get('usage_type', '') for res in direct_usage),
-                "measure": any(res.get('field') == full_name and 'MEASURE' in res.get('usage_type', '') for res in direct_usage),
+                "visualization": flags["visualization"],
+                "measure": flags["measure"],
                 "indirect_measure": full_name in indirect_usage,
                 "hierarchy": field in hierarchy_fields,
-                "filter": any(res.get('field') == full_name and 'FILTER' in res.get('usage_type', '') for res in direct_usage),
+                "filter": flags["filter"],
                 "relationship": relationships.get(full_name, False),
                 "tabular_sort": full_name in sort_by_columns,
                 "rls": full_name in rls_columns
             })
+    return ui_results
+
+def _iter_analysis_stages(zip_file_paths: List[str], tabular_model_path: str, dbt_models_path: str,
+                          profiler: AnalysisProfiler, enable_detailed_logging=False, dbt_index: DbtProjectIndex = None,
+                          scan_workers: int = None):
+    clear_log_buffer()
+
+    def stage(name: str, progress: int) -> Dict:
+        profiler.start_stage(name)
+        return {"event": "stage", "stage": name, "progress": progress}
+
+    yield {"event": "progress", "progress": 0}
+    logger.info("🚀 Power BI Field Usage Analyzer - Core Logic")
+
+    config = { "measures_folder_name": "measures", "tables_to_exclude": ["RefreshDate"], "exclusion_patterns": ["partition", "refresh"] }
+    for zip_path in zip_file_paths:
+        if not Path(zip_path).exists(): raise FileNotFoundError(f"PBIX file not found: {zip_path}")
+
+    yield stage("STEP 1 - Model columns", 5)
+    logger.info("\n📋 STEP 1: Dynamically loading columns from the model...")
+    # One listing of the model folder, shared by every stage below
+    model_index = ModelDirectoryIndex(tabular_model_path)
+    tables_and_fields = dynamically_generate_field_config(tabular_model_path, config["tables_to_exclude"], config["exclusion_patterns"], config["measures_folder_name"], model_index=model_index)
+    if not tables_and_fields: raise ValueError("Failed to load any tables from the model.")
+    all_fields = [f"{conf['table']}.{field}" for conf in tables_and_fields for field in conf['fields']]
+
+    yield stage("STEP 1.5 - Sort By Column", 10)
+    logger.info("📋 STEP 1.5: Searching for usage in 'Sort By Column'...")
+    sort_by_columns = find_usage_in_sort_by_column(tables_and_fields, tabular_model_path, model_index=model_index)
+
+    yield stage("STEP 1.6 - RLS filters", 15)
+    logger.info("📋 STEP 1.6: Searching for usage in RLS (Row-Level Security)...")
+    rls_columns = find_usage_in_rls_filters(tabular_model_path, model_index=model_index)
+
+    # Every column is known now; the UI can show them while the PBIX files are scanned
+    yield {
+        "event": "columns",
+        "rows": _build_ui_rows(tables_and_fields, config["exclusion_patterns"], {}, {}, {}, sort_by_columns, rls_columns),
+    }
+
+    yield stage("STEP 2 - PBIX field usage", 20)
+    logger.info("📋 STEP 2: Searching for direct field usage in PBIX...")
+    direct_usage = yield from iter_field_usage(zip_file_paths, tables_and_fields, detailed_logging=enable_detailed_logging, progress_range=(20, 50),
+                                                  scan_workers=scan_workers)
+
+    yield stage("STEP 3 - Measures", 50)
+    logger.info("📋 STEP 3: Loading and analyzing measures...")
+    measures_path = model_index.first_dir_containing(config["measures_folder_name"])
+    # Field references are matched as each measure is parsed, while the next files are still being read
+    field_patterns = compile_field_patterns(all_fields)
+    measure_defs, field_dependencies = {}, {}
+    for measure_name, expression in iter_measure_definitions(measures_path, tables_and_fields, tabular_model_path, model_index=model_index):
+        measure_defs[measure_name] = expression
+        field_dependencies[measure_name] = measure_field_dependencies(expression, field_patterns)
+    logger.info(f"✅ Loaded {len(measure_defs)} measures for analysis.")
+    dependencies = analyze_measure_dependencies(measure_defs, all_fields, detailed_logging=enable_detailed_logging, field_dependencies=field_dependencies)
+    basic_dependencies = dependencies['basic_dependencies'] if isinstance(dependencies, dict) and 'basic_dependencies' in dependencies else dependencies
+    indirect_usage = find_indirect_usage_by_measures(direct_usage, basic_dependencies, all_fields)
+
+    yield stage("STEP 4 - Relationships", 75)
+    logger.info("📋 STEP 4: Checking relationships...")
+    relationships = search_for_relationships(tabular_model_path, all_fields, model_index=model_index)
+
+    yield stage("STEP 5 - UI rows", 90)
+    logger.info("📋 STEP 5: Preparing initial results for UI...")
+    ui_results = _build_ui_rows(
+        tables_and_fields, config["exclusion_patterns"], usage_flags_by_field(direct_usage),
+        indirect_usage, relationships, sort_by_columns, rls_columns
+    )
 
     # ==============================================================================
     # 🚀 STEP 5.5: NEW LOGIC - Validating hidden intra-file dependencies
     # ==============================================================================
-    log_and_print("📋 STEP 5.5: Checking for hidden intra-file dependencies...")
+    yield stage("STEP 5.5 - Intra-file dependencies", 95)
+    logger.info("📋 STEP 5.5: Checking for hidden intra-file dependencies...")
 
     # Create a map for quick field usage status checks
     usage_status_map = {f"{item['table']}.{item['column']}": any(item.values()) for item in ui_results}
@@ -2243,16 +3300,25 @@ def perform_analysis(zip_file_paths: List[str], tabular_model_path: str, dbt_mod
         if item['table'] not in results_by_table: results_by_table[item['table']] = []
         results_by_table[item['table']].append(item)
 
+    if dbt_index is None:
+        dbt_index = DbtProjectIndex(dbt_models_path)
+
     final_ui_results = []
+    # table -> {column: position in the DBT model}, reused by the UI for sorting (no re-reading SQL files)
+    dbt_column_orders = {}
+    dbt_files = {}
     for table_name, fields_in_table in results_by_table.items():
+        check_cancelled()
         try:
-            alias = find_snowflake_alias_for_table(table_name, tabular_model_path)
-            dbt_file = find_dbt_file_for_alias(alias, dbt_models_path) if alias else None
+            alias = find_snowflake_alias_for_table(table_name, tabular_model_path, model_index=model_index)
+            dbt_file = dbt_index.file_for_alias(alias) if alias else None
             if not dbt_file or not os.path.exists(dbt_file):
                 final_ui_results.extend(fields_in_table)
                 continue
 
-            with open(dbt_file, 'r', encoding='utf-8') as f: content = f.read()
+            content = dbt_index.content(dbt_file)
+            dbt_files[table_name] = dbt_file
+            dbt_column_orders[table_name] = dbt_column_positions(analyze_dbt_columns_from_content(content, dbt_file))
 
             for field_A in fields_in_table:
                 field_A_fullname = f"{field_A['table']}.{field_A['column']}"
@@ -2260,6 +3326,7 @@ def perform_analysis(zip_file_paths: List[str], tabular_model_path: str, dbt_mod
                 # Run logic only for fields that are initially unused
                 if not usage_status_map.get(field_A_fullname, True):
                     # Count occurrences
+                    record_regex_evals()
                     occurrences = len(re.findall(r'(?<![\w\d_])' + re.escape(field_A['column']) + r'(?![\w\d_])', content, re.IGNORECASE))
 
                     if occurrences > 1:
@@ -2271,14 +3338,16 @@ def perform_analysis(zip_file_paths: List[str], tabular_model_path: str, dbt_mod
                             # Find the definition line of the neighbor (field_B)
                             for line in content.splitlines():
                                 defined_alias = _get_alias_from_line_final(line)
+                                record_regex_evals(2)
                                 if defined_alias and defined_alias.lower() == field_B['column'].lower():
                                     # Check if our field (field_A) is in the neighbor's definition (field_B)
+                                    record_regex_evals()
                                     if re.search(r'(?<![\w\d_])' + re.escape(field_A['column']) + r'(?![\w\d_])', line, re.IGNORECASE):
                                         # It is used. Check the neighbor's status.
                                         field_B_fullname = f"{field_B['table']}.{field_B['column']}"
                                         if usage_status_map.get(field_B_fullname, False):
                                             # Neighbor is used, so we block it
-                                            log_and_print(f"   -> BLOCKED: Field '{field_A_fullname}' is a component of the used field '{field_B_fullname}'.")
+                                            logger.info(f"   -> BLOCKED: Field '{field_A_fullname}' is a component of the used field '{field_B_fullname}'.")
                                             field_A['relationship'] = True # Let's use the 'relationship' field as a blocking flag
                                             is_blocked_by_neighbor = True
                                             break
@@ -2286,29 +3355,32 @@ def perform_analysis(zip_file_paths: List[str], tabular_model_path: str, dbt_mod
 
                 final_ui_results.append(field_A)
         except Exception as e:
-            log_and_print(f"   -> WARNING: Error during intra-file analysis for table '{table_name}': {e}")
+            logger.warning(f"   -> WARNING: Error during intra-file analysis for table '{table_name}': {e}")
             final_ui_results.extend(fields_in_table)
 
+    profiler.end_stage()
+
     intermediate_data = {
         "direct_usage": direct_usage, "relationships": relationships, "indirect_usage": indirect_usage,
         "tables_and_fields": tables_and_fields, "config": config,
-        "dbt_models_path": dbt_models_path, "tabular_model_path": tabular_model_path
+        "dbt_models_path": dbt_models_path, "tabular_model_path": tabular_model_path,
+        "dbt_column_orders": dbt_column_orders, "dbt_files": dbt_files, "measure_dependencies": basic_dependencies
     }
 
-    report_progress(100)
-    log_and_print(f"✅ Analysis complete. Prepared {len(final_ui_results)} rows for the UI.")
+    yield {"event": "progress", "progress": 100}
+    logger.info(f"✅ Analysis complete. Prepared {len(final_ui_results)} rows for the UI.")
 
     return final_ui_results, intermediate_data
 
-def apply_changes(dbt_path: str, intermediate_data: dict):
-    print("\n🎯 Applying Changes...")
+def apply_changes(dbt_path: str, intermediate_data: dict, max_workers: int = None):
+    logger.info("\n🎯 Applying Changes...")
     
     columns_to_comment_out = intermediate_data.get('columns_to_comment_out', [])
     if not columns_to_comment_out:
-        print("No columns were selected for commenting out.")
+        logger.info("No columns were selected for commenting out.")
         return
 
-    print(f"Will process {len(columns_to_comment_out)} columns selected by the user.")
+    logger.info(f"Will process {len(columns_to_comment_out)} columns selected by the user.")
     
     config = intermediate_data["config"]
     exclusion_patterns = config["exclusion_patterns"]
@@ -2322,13 +3394,13 @@ def apply_changes(dbt_path: str, intermediate_data: dict):
             
             is_excluded, reason = is_field_excluded(field_name, exclusion_patterns)
             if is_excluded:
-                print(f"🔍 Skipping excluded field during commenting: '{column}' (reason: {reason})")
+                logger.info(f"🔍 Skipping excluded field during commenting: '{column}' (reason: {reason})")
                 excluded_count += 1
                 continue
             
             is_table_excluded_val, table_reason = is_table_excluded(table_name, config["tables_to_exclude"], exclusion_patterns)
             if is_table_excluded_val:
-                print(f"🔍 Skipping field from excluded table: '{column}' (reason: {table_reason})")
+                logger.info(f"🔍 Skipping field from excluded table: '{column}' (reason: {table_reason})")
                 excluded_count += 1
                 continue
                 
@@ -2336,10 +3408,10 @@ def apply_changes(dbt_path: str, intermediate_data: dict):
         else:
             filtered_columns.append(column)
     
-    print(f"After filtering: {len(filtered_columns)} columns will be processed ({excluded_count} excluded)")
+    logger.info(f"After filtering: {len(filtered_columns)} columns will be processed ({excluded_count} excluded)")
     
     if not filtered_columns:
-        print("No columns remaining after filtering for commenting out.")
+        logger.info("No columns remaining after filtering for commenting out.")
         return
 
     run_commenting_out_for_all_tables(
@@ -2351,9 +3423,12 @@ def apply_changes(dbt_path: str, intermediate_data: dict):
         exclusion_patterns=intermediate_data["config"]["exclusion_patterns"],
         user_selected_columns=filtered_columns,  # Używamy przefiltrowanej listy
         tabular_model_path=intermediate_data["tabular_model_path"],
-        dbt_models_path=dbt_path
+        dbt_models_path=dbt_path,
+        max_workers=max_workers,
+        # The analysis' table -> DBT file mapping holds only while the DBT path is the analysed one
+        dbt_files=intermediate_data.get("dbt_files") if _same_path(intermediate_data.get("dbt_models_path"), dbt_path) else None
     )
-    print("✅ Changes applied.")
+    logger.info("✅ Changes applied.")
 
 def _calculate_dax_complexity(dax_expression: str) -> int:
     if not dax_expression:
@@ -2400,49 +3475,18 @@ def _find_most_referenced_fields(dependencies: Dict[str, set]) -> List[tuple]:
 
     return sorted(field_counts.items(), key=lambda x: x[1], reverse=True)[:10]
 
-def extract_usage_context_simple(json_data: Any, field_name: str, table_name: str) -> str:
-    try:
-        if not isinstance(json_data, dict) or not field_name:
-            return 'Invalid Input'
-
-        json_str = json.dumps(json_data).lower()
-        field_lower = field_name.lower()
-
-        context_patterns = {
-            'legend': ['legend', 'colorvalue', 'series'],
-            'values': ['values', 'measure', 'sum(', 'count('],
-            'filter': ['filter', 'slicer', 'where'],
-            'axis': ['axis', 'category', 'column', 'row']
-        }
-
-        for context_type, patterns in context_patterns.items():
-            for pattern in patterns:
-                if pattern in json_str and field_lower in json_str:
-                    pattern_pos = json_str.find(pattern)
-                    field_pos = json_str.find(field_lower)
-                    
-                    if pattern_pos != -1 and field_pos != -1:
-                        distance = abs(pattern_pos - field_pos)
-                        if distance < 100:
-                            return context_type.title()
-        
-        return 'Unknown'
-        
-    except Exception as e:
-        return f'Error: {str(e)[:20]}'
-
-    
 def generate_error_report() -> dict:
-    global _commenting_error_log
+    with _commenting_error_lock:
+        error_log = list(_commenting_error_log)
     
-    if not _commenting_error_log:
+    if not error_log:
         return {'has_errors': False}
 
     error_types = {}
     total_affected_columns = 0
     failed_tables = []
     
-    for error in _commenting_error_log:
+    for error in error_log:
         error_type = error['error_type']
         if error_type not in error_types:
             error_types[error_type] = 0
@@ -2460,12 +3504,12 @@ def generate_error_report() -> dict:
     
     return {
         'has_errors': True,
-        'total_errors': len(_commenting_error_log),
+        'total_errors': len(error_log),
         'total_affected_columns': total_affected_columns,
         'failed_tables': failed_tables,
         'error_types': error_types,
         'error_descriptions': error_descriptions,
-        'detailed_errors': _commenting_error_log
+        'detailed_errors': error_log
     }
 
 def get_marts_path_from_reporting(reporting_path: str) -> str:
@@ -2474,11 +3518,44 @@ def get_marts_path_from_reporting(reporting_path: str) -> str:
     
     marts_path = reporting_path.replace('reporting', 'marts')
     if not os.path.exists(marts_path):
-        print(f"⚠️ Marts path does not exist: {marts_path}")
+        logger.warning(f"⚠️ Marts path does not exist: {marts_path}")
         return ""
     
     return marts_path
 
+def collect_marts_audit_candidates(marts_path: str, reporting_column_names: set) -> List[Dict]:
+    """
+    All MARTS fields worth auditing: technical fields, keys/ids and columns that are
+    already handled by the REPORTING analysis are left out. Sorted by model, then field.
+    """
+    all_marts_fields = get_all_fields_from_dbt_path_for_audit(marts_path)
+
+    logger.info(f"Excluding {len(reporting_column_names)} fields from initial analysis.")
+
+    candidate_fields = []
+
+    fields_to_exclude_technical = {'elt_dmr', 'elt_dmr_core', 'elt_dmr_marts', 'tableindicator'}
+    technical_suffixes = ['id', 'bk', 'key']
+    marts_excluded_lower = {f.lower() for f in FIELDS_TO_EXCLUDE_FROM_MARTS_ANALYSIS}
+
+    for field_data in all_marts_fields:
+        field_name = field_data['field']
+        field_name_lower = field_name.lower()
+
+        if (field_name_lower in fields_to_exclude_technical or
+            field_name_lower in marts_excluded_lower or
+            field_name in reporting_column_names or
+            "partition" in field_name_lower or
+            any(field_name_lower.endswith(s) for s in technical_suffixes)):
+            continue
+
+        candidate_fields.append(field_data)
+
+    logger.info(f"Found {len(candidate_fields)} candidate fields for the audit after filtering.")
+
+    candidate_fields.sort(key=lambda x: (x['source_model'], x['field']))
+    return candidate_fields
+
 def can_comment_field_in_marts_final(field_to_check: str, source_model: str, scan_path: str, file_to_ignore: str = None) -> tuple[bool, list]:
     blocking_info = []
     source_model_variants = [source_model, source_model.replace('marts_', '')]
@@ -2558,6 +3635,7 @@ def analyze_marts_optimization(reporting_path: str, tabular_model_path: str,
     if total_fields == 0: return results
 
     for i, field_full in enumerate(commented_fields_in_reporting):
+        check_cancelled()
         if progress_callback:
             progress_callback(int(((i + 1) / total_fields) * 100))
 
@@ -2714,7 +3792,7 @@ def _get_zone_of_interest(lines: List[str]) -> set:
     return set(range(first_select_start_line, len(lines)))
 
 def comment_out_unused_columns_in_dbt(sql_file_path: str, dbt_columns: Dict[str, str], unused_column_names: List[str]) -> bool:
-    print(f"   [REPORTING WRAPPER] Delegating modification of {os.path.basename(sql_file_path)} to core engine.")
+    logger.debug("   [REPORTING WRAPPER] Delegating modification of %s to core engine.", os.path.basename(sql_file_path))
     
     return _execute_commenting_safely(sql_file_path, unused_column_names)
 
@@ -2740,15 +3818,15 @@ def comment_out_fields_in_marts(marts_analysis_results: dict, tabular_model_path
     marts_path = marts_analysis_results['marts_path']
 
     for source_marts_model, field_aliases in fields_by_marts_model.items():
-        print(f"\n[MARTS WRAPPER] Processing model: {source_marts_model}")
+        logger.debug("\n[MARTS WRAPPER] Processing model: %s", source_marts_model)
         marts_sql_file = find_dbt_file_for_alias(source_marts_model, marts_path)
         
         if not marts_sql_file:
-            print(f"   [ERROR] SQL file not found for '{source_marts_model}'. Skipping.")
+            logger.error(f"   [ERROR] SQL file not found for '{source_marts_model}'. Skipping.")
             failed_count += len(field_aliases)
             continue
         
-        print(f"   [MARTS WRAPPER] Delegating modification of {os.path.basename(marts_sql_file)} to core engine.")
+        logger.debug("   [MARTS WRAPPER] Delegating modification of %s to core engine.", os.path.basename(marts_sql_file))
         success = _execute_commenting_safely(marts_sql_file, field_aliases)
         
         if success:
@@ -2826,7 +3904,7 @@ def analyze_dbt_columns_for_audit(file_path: str) -> Dict[str, str]:
                 dbt_columns[col_def] = alias
         return dbt_columns
     except Exception as e:
-        print(f"   [MARTS AUDIT] Error analyzing DBT columns in '{file_path}': {e}")
+        logger.error(f"   [MARTS AUDIT] Error analyzing DBT columns in '{file_path}': {e}")
         return {}
 
 def get_all_fields_from_dbt_path_for_audit(path: str) -> List[Dict]:
@@ -2835,13 +3913,13 @@ def get_all_fields_from_dbt_path_for_audit(path: str) -> List[Dict]:
     This version is for the MARTS AUDIT functionality only.
     """
     if not os.path.exists(path):
-        print(f"⚠️ [Marts Audit Collector] Path does not exist: {path}")
+        logger.warning(f"⚠️ [Marts Audit Collector] Path does not exist: {path}")
         return []
 
     all_fields = []
     sql_files = glob.glob(os.path.join(path, "**", "*.sql"), recursive=True)
     
-    print(f"🔍 [Marts Audit Collector] Found {len(sql_files)} .sql files in '{path}' to scan.")
+    logger.info(f"🔍 [Marts Audit Collector] Found {len(sql_files)} .sql files in '{path}' to scan.")
 
     for file_path in sql_files:
         try:
@@ -2855,10 +3933,10 @@ def get_all_fields_from_dbt_path_for_audit(path: str) -> List[Dict]:
                     "source_model": model_name
                 })
         except Exception as e:
-            print(f"⚠️ [Marts Audit Collector] Error while processing file {os.path.basename(file_path)}: {e}")
+            logger.warning(f"⚠️ [Marts Audit Collector] Error while processing file {os.path.basename(file_path)}: {e}")
             continue
             
-    print(f"✅ [Marts Audit Collector] Successfully collected {len(all_fields)} fields.")
+    logger.info(f"✅ [Marts Audit Collector] Successfully collected {len(all_fields)} fields.")
     return all_fields
 
 def _extract_column_alias_for_audit(line_for_parsing: str) -> str:
@@ -2928,7 +4006,7 @@ def analyze_dbt_columns_for_audit(file_path: str) -> Dict[str, str]:
                 dbt_columns[col_def] = alias
         return dbt_columns
     except Exception as e:
-        print(f"   [MARTS AUDIT] Error analyzing DBT columns in '{file_path}': {e}")
+        logger.error(f"   [MARTS AUDIT] Error analyzing DBT columns in '{file_path}': {e}")
         return {}
 
 def get_all_fields_from_dbt_path_for_audit(path: str) -> List[Dict]:
@@ -2937,13 +4015,13 @@ def get_all_fields_from_dbt_path_for_audit(path: str) -> List[Dict]:
     This version is for the MARTS AUDIT functionality only.
     """
     if not os.path.exists(path):
-        print(f"⚠️ [Marts Audit Collector] Path does not exist: {path}")
+        logger.warning(f"⚠️ [Marts Audit Collector] Path does not exist: {path}")
         return []
 
     all_fields = []
     sql_files = glob.glob(os.path.join(path, "**", "*.sql"), recursive=True)
     
-    print(f"🔍 [Marts Audit Collector] Found {len(sql_files)} .sql files in '{path}' to scan.")
+    logger.info(f"🔍 [Marts Audit Collector] Found {len(sql_files)} .sql files in '{path}' to scan.")
 
     for file_path in sql_files:
         try:
@@ -2957,8 +4035,437 @@ def get_all_fields_from_dbt_path_for_audit(path: str) -> List[Dict]:
                     "source_model": model_name
                 })
         except Exception as e:
-            print(f"⚠️ [Marts Audit Collector] Error while processing file {os.path.basename(file_path)}: {e}")
+            logger.warning(f"⚠️ [Marts Audit Collector] Error while processing file {os.path.basename(file_path)}: {e}")
             continue
             
-    print(f"✅ [Marts Audit Collector] Successfully collected {len(all_fields)} fields.")
+    logger.info(f"✅ [Marts Audit Collector] Successfully collected {len(all_fields)} fields.")
     return all_fields
+
+
+# ===========================
+# 🖥️ COMMAND-LINE ENTRY POINT (headless, no Qt)
+# ===========================
+
+EXIT_OK = 0
+EXIT_ERROR = 1              # unexpected failure
+EXIT_USAGE = 2              # bad arguments / config file
+EXIT_INPUT_NOT_FOUND = 3    # a PBIX, model or dbt path does not exist
+EXIT_MISSING_DEPENDENCY = 4 # e.g. --format parquet without pyarrow/pandas
+EXIT_PARTIAL_FAILURE = 5    # commenting finished with errors for some tables / some workspace models failed
+EXIT_UNUSED_FOUND = 10      # only with --fail-on-unused
+
+USAGE_FLAG_KEYS = ["visualization", "measure", "indirect_measure", "hierarchy", "filter", "relationship", "tabular_sort", "rls"]
+
+# Keys a --config JSON file may set; command-line arguments always win
+CLI_CONFIG_KEYS = ["pbix", "tabular", "dbt", "marts", "fields", "fields_file", "output", "format",
+                   "detailed", "max_workers", "scan_workers", "log_json", "fail_on_unused", "export_dir", "export_format",
+                   "save_history", "history_db", "workspace"]
+
+
+class CliUsageError(Exception):
+    pass
+
+
+def is_row_used(row: dict) -> bool:
+    return any(row.get(k) for k in USAGE_FLAG_KEYS)
+
+
+def _load_cli_config(config_path: str) -> dict:
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise CliUsageError(f"Cannot read config file '{config_path}': {e}")
+    if not isinstance(config, dict):
+        raise CliUsageError(f"Config file '{config_path}' must contain a JSON object.")
+    unknown = sorted(set(config) - set(CLI_CONFIG_KEYS))
+    if unknown:
+        raise CliUsageError(f"Unknown keys in config file: {', '.join(unknown)}")
+    return config
+
+
+def _merge_cli_config(args, config: dict):
+    for key, value in config.items():
+        if getattr(args, key, None) in (None, False):
+            setattr(args, key, value)
+    if isinstance(args.pbix, str):
+        args.pbix = [args.pbix]
+
+
+def _require(args, *names):
+    missing = [f"--{name.replace('_', '-')}" for name in names if not getattr(args, name, None)]
+    if missing:
+        raise CliUsageError(f"Missing required option(s) for '{args.command}': {', '.join(missing)}")
+
+
+def _check_paths_exist(*paths):
+    for path in paths:
+        if path and not os.path.exists(path):
+            raise FileNotFoundError(f"Path not found: {path}")
+
+
+def _read_field_list(args) -> List[str]:
+    """Fields from --fields and/or --fields-file (one per line, or a JSON list of strings / rows)."""
+    fields = list(args.fields or [])
+    if args.fields_file:
+        with open(args.fields_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if text.lstrip().startswith(('[', '{')):
+            data = json.loads(text)
+            rows = data.get('rows', []) if isinstance(data, dict) else data
+            for item in rows:
+                if isinstance(item, str):
+                    fields.append(item)
+                elif isinstance(item, dict) and 'table' in item and 'column' in item:
+                    if not item.get('is_used', is_row_used(item)):
+                        fields.append(f"{item['table']}.{item['column']}")
+                elif isinstance(item, dict) and 'field' in item:
+                    fields.append(item['field'])
+        else:
+            fields.extend(line.strip() for line in text.splitlines() if line.strip() and not line.startswith('#'))
+    return list(OrderedDict.fromkeys(fields))
+
+
+def _flatten_for_table(record: dict) -> dict:
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, (list, tuple, set)):
+            flat[key] = "; ".join(str(v) for v in value)
+        elif isinstance(value, dict):
+            flat[key] = json.dumps(value, ensure_ascii=False, default=str)
+        else:
+            flat[key] = value
+    return flat
+
+
+def write_cli_output(payload: dict, records: List[dict], output_path: str = None, output_format: str = "json"):
+    """
+    json    -> the whole payload (records, summary, profile ...)
+    csv     -> the records only, list values joined with '; '
+    parquet -> the records only (pyarrow, or pandas as a fallback)
+    Without output_path, json/csv are written to stdout.
+    """
+    import csv
+
+    if output_format == "json":
+        text = json.dumps(payload, indent=2, ensure_ascii=False, default=lambda o: sorted(o) if isinstance(o, set) else str(o))
+        if output_path:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text + "\n")
+        return
+
+    flat_records = [_flatten_for_table(r) for r in records]
+    columns = list(OrderedDict.fromkeys(k for r in flat_records for k in r))
+
+    if output_format == "csv":
+        stream = open(output_path, 'w', encoding='utf-8', newline='') if output_path else sys.stdout
+        try:
+            writer = csv.DictWriter(stream, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(flat_records)
+        finally:
+            if output_path:
+                stream.close()
+        return
+
+    if output_format == "parquet":
+        if not output_path:
+            raise CliUsageError("--format parquet requires --output")
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pylist(flat_records) if flat_records else pa.table({c: [] for c in columns})
+            pq.write_table(table, output_path)
+        except ImportError:
+            import pandas as pd  # ImportError propagates -> EXIT_MISSING_DEPENDENCY
+            pd.DataFrame(flat_records, columns=columns).to_parquet(output_path, index=False)
+        return
+
+    raise CliUsageError(f"Unsupported output format: {output_format}")
+
+
+def _unused_fields_from_analysis(args) -> List[str]:
+    _require(args, "pbix", "tabular", "dbt")
+    _check_paths_exist(*args.pbix, args.tabular, args.dbt)
+    ui_results, _ = perform_analysis(args.pbix, args.tabular, args.dbt, enable_detailed_logging=args.detailed, scan_workers=args.scan_workers)
+    return [f"{row['table']}.{row['column']}" for row in ui_results if not is_row_used(row)]
+
+
+def _cli_analyze(args) -> int:
+    _require(args, "pbix", "tabular", "dbt")
+    _check_paths_exist(*args.pbix, args.tabular, args.dbt)
+
+    ui_results, intermediate_data = perform_analysis(args.pbix, args.tabular, args.dbt, enable_detailed_logging=args.detailed, scan_workers=args.scan_workers)
+    rows = [dict(row, is_used=is_row_used(row)) for row in ui_results]
+    unused_count = sum(1 for row in rows if not row['is_used'])
+
+    payload = {
+        "command": "analyze",
+        "inputs": {"pbix": args.pbix, "tabular": args.tabular, "dbt": args.dbt},
+        "summary": {"total_columns": len(rows), "used_columns": len(rows) - unused_count, "unused_columns": unused_count},
+        "rows": rows,
+        "profile": intermediate_data.get("profile"),
+    }
+    if args.save_history:
+        from results_store import ResultsStore
+        with ResultsStore(args.history_db) as store:
+            payload["history_run_id"] = store.record_run(ui_results, intermediate_data, args.pbix)
+    write_cli_output(payload, rows, args.output, args.format)
+    logger.info(f"✅ {unused_count} of {len(rows)} columns are unused.")
+
+    if args.export_dir:
+        from analyzer_export import export_analysis
+        export_analysis(ui_results, intermediate_data, args.export_dir, args.export_format or "csv")
+        logger.info(f"💾 Result tables exported to {args.export_dir}")
+
+    if args.fail_on_unused and unused_count:
+        return EXIT_UNUSED_FOUND
+    return EXIT_OK
+
+
+def _cli_marts(args) -> int:
+    _require(args, "tabular", "dbt")
+    _check_paths_exist(args.tabular, args.dbt)
+
+    fields = _read_field_list(args)
+    if not fields:
+        logger.info("No --fields/--fields-file given, running the REPORTING analysis to find unused columns...")
+        fields = _unused_fields_from_analysis(args)
+
+    results = analyze_marts_optimization(args.dbt, args.tabular, fields)
+    records = ([dict(r, can_comment=True) for r in results['can_comment_in_marts']] +
+               [dict(r, can_comment=False) for r in results['cannot_comment_in_marts']])
+    payload = {"command": "marts", "summary": results.get('summary', {}), "errors": results.get('errors', []), "results": records}
+
+    exit_code = EXIT_OK
+    if args.apply:
+        commenting = comment_out_fields_in_marts(results, args.tabular, args.dbt)
+        payload["apply"] = commenting
+        if commenting.get('failed_count'):
+            exit_code = EXIT_PARTIAL_FAILURE
+
+    write_cli_output(payload, records, args.output, args.format)
+    return exit_code
+
+
+def _cli_audit(args) -> int:
+    _require(args, "dbt")
+    marts_path = args.marts or get_marts_path_from_reporting(args.dbt)
+    if not marts_path:
+        raise CliUsageError("Could not determine the MARTS path; pass --marts explicitly.")
+    _check_paths_exist(args.dbt, marts_path)
+
+    fields = _read_field_list(args)
+    if not fields:
+        reporting_columns = {f['field'] for f in get_all_fields_from_dbt_path(args.dbt)}
+        fields = [f"{c['source_model']}.{c['field']}" for c in collect_marts_audit_candidates(marts_path, reporting_columns)]
+
+    results = analyze_marts_audit(marts_path, args.dbt, fields)
+    records = ([dict(r, can_comment=True) for r in results['can_comment_in_marts']] +
+               [dict(r, can_comment=False) for r in results['cannot_comment_in_marts']])
+    payload = {"command": "audit", "marts_path": marts_path, "summary": results.get('summary', {}), "results": records}
+
+    exit_code = EXIT_OK
+    if args.apply:
+        commenting = comment_out_fields_in_marts_audit(marts_path, [r['field'] for r in results['can_comment_in_marts']])
+        payload["apply"] = commenting
+        if commenting.get('failed_count'):
+            exit_code = EXIT_PARTIAL_FAILURE
+
+    write_cli_output(payload, records, args.output, args.format)
+    return exit_code
+
+
+def _cli_apply(args) -> int:
+    _require(args, "pbix", "tabular", "dbt")
+    _check_paths_exist(*args.pbix, args.tabular, args.dbt)
+
+    ui_results, intermediate_data = perform_analysis(args.pbix, args.tabular, args.dbt, enable_detailed_logging=args.detailed, scan_workers=args.scan_workers)
+    columns = _read_field_list(args) or [f"{row['table']}.{row['column']}" for row in ui_results if not is_row_used(row)]
+
+    payload = {"command": "apply", "dry_run": args.dry_run, "columns": columns}
+    if not args.dry_run:
+        intermediate_data['columns_to_comment_out'] = columns
+        apply_changes(args.dbt, intermediate_data, max_workers=args.max_workers)
+        payload["error_report"] = generate_error_report()
+
+    write_cli_output(payload, [{"column": c} for c in columns], args.output, args.format)
+
+    if payload.get("error_report", {}).get("has_errors"):
+        return EXIT_PARTIAL_FAILURE
+    return EXIT_OK
+
+
+def _cli_history(args) -> int:
+    from results_store import ResultsStore
+
+    with ResultsStore(args.history_db) as store:
+        if args.run:
+            new_run = store.get_run(args.run)
+        else:
+            _require(args, "tabular", "dbt")
+            new_run = store.latest_run(args.tabular, args.dbt)
+        if not new_run:
+            raise CliUsageError("No stored analysis run found (run 'analyze --save-history' first).")
+
+        old_run = store.run_before(new_run["run_id"], started_before=args.since)
+        if not old_run:
+            raise CliUsageError(f"No earlier run to compare run #{new_run['run_id']} with.")
+
+        comparison = store.compare_runs(old_run["run_id"], new_run["run_id"])
+        if args.fields:
+            wanted = set(args.fields)
+            comparison["newly_unused"] = [f for f in comparison["newly_unused"] if f in wanted]
+            comparison["newly_used"] = [f for f in comparison["newly_used"] if f in wanted]
+            comparison["new_report_usage"] = [u for u in comparison["new_report_usage"] if u["field"] in wanted]
+            comparison["field_history"] = {f: store.field_history(f, args.tabular, args.dbt) for f in args.fields}
+
+    records = ([{"field": f, "change": "became_unused", "report": None} for f in comparison["newly_unused"]] +
+               [{"field": f, "change": "became_used", "report": None} for f in comparison["newly_used"]] +
+               [{"field": u["field"], "change": "new_report_usage", "report": u["report"]} for u in comparison["new_report_usage"]])
+    payload = dict(comparison, command="history", changes=records)
+    write_cli_output(payload, records, args.output, args.format)
+    logger.info(f"🗄️ Run #{old_run['run_id']} ({old_run['started_at']}) -> #{new_run['run_id']} ({new_run['started_at']}): "
+                f"{len(comparison['newly_unused'])} became unused, {len(comparison['newly_used'])} became used.")
+    return EXIT_OK
+
+
+def _cli_workspace(args) -> int:
+    from workspace_analysis import analyze_workspace, load_workspace
+
+    _require(args, "workspace")
+    _check_paths_exist(args.workspace)
+    try:
+        workspace = load_workspace(args.workspace)
+    except (OSError, ValueError) as e:
+        raise CliUsageError(f"Cannot read workspace file '{args.workspace}': {e}")
+    dbt_path = args.dbt or workspace["dbt"]
+    if not dbt_path:
+        raise CliUsageError("The workspace file has no 'dbt' path and --dbt was not given.")
+    _check_paths_exist(dbt_path, *[path for model in workspace["models"] for path in [model["tabular"], *model["pbix"]]])
+
+    result = analyze_workspace(workspace["models"], dbt_path, max_workers=args.max_workers, enable_detailed_logging=args.detailed,
+                               scan_workers=args.scan_workers)
+    payload = {
+        "command": "workspace",
+        "inputs": {"workspace": args.workspace, "dbt": dbt_path},
+        "summary": result["summary"],
+        "models": [
+            {"name": m["name"], "error": m["error"], "unused_columns": [f"{r['table']}.{r['column']}" for r in m.get("rows", []) if not r["is_used"]]}
+            for m in result["models"]
+        ],
+        "dbt_columns": result["dbt_columns"],
+    }
+    write_cli_output(payload, result["dbt_columns"], args.output, args.format)
+
+    if result["summary"]["failed_models"]:
+        return EXIT_PARTIAL_FAILURE
+    return EXIT_OK
+
+
+def build_arg_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="analyzer_cli",
+        description="Power BI field usage analyzer (headless). Finds unused model columns and comments them out in dbt.",
+        epilog="Exit codes: 0 ok, 1 error, 2 usage, 3 input not found, 4 missing dependency, "
+               "5 partial failure (commenting, workspace models), 10 unused columns found (--fail-on-unused)."
+    )
+    parser.add_argument("--config", help="JSON file with default values for the options below")
+    parser.add_argument("-v", "--verbose", action="store_true", help="DEBUG logging")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only warnings and errors")
+    parser.add_argument("--log-json", help="Also write logs as JSON lines to this file")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--pbix", nargs="+", help="One or more .pbix/.zip files")
+    common.add_argument("--tabular", help="Tabular Editor model folder, TMDL (PBIP) definition folder, .pbit file or model.bim")
+    common.add_argument("--dbt", help="dbt REPORTING models folder")
+    common.add_argument("--output", "-o", help="Output file (default: stdout for json/csv)")
+    common.add_argument("--format", choices=["json", "csv", "parquet"], help="Output format (default: json)")
+    common.add_argument("--detailed", action="store_true", default=None, help="Detailed PBIX usage analysis")
+    common.add_argument("--scan-workers", type=int, help="Processes scanning one large PBIX (default: CPU count; workspace: CPU count divided between models; 1 = serial)")
+
+    fields = argparse.ArgumentParser(add_help=False)
+    fields.add_argument("--fields", nargs="+", help="Fields to process (Table.column or model.field)")
+    fields.add_argument("--fields-file", help="Text file (one field per line) or the JSON output of 'analyze'")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    analyze = subparsers.add_parser("analyze", parents=[common], help="Run the REPORTING usage analysis")
+    analyze.add_argument("--fail-on-unused", action="store_true", default=None, help=f"Exit with {EXIT_UNUSED_FOUND} if any column is unused")
+    analyze.add_argument("--export-dir", help="Also export the result tables (UI rows, usage, relationships, measure dependencies) to this folder")
+    analyze.add_argument("--export-format", choices=["csv", "parquet", "xlsx"], help="Format of --export-dir tables (default: csv)")
+    analyze.add_argument("--save-history", action="store_true", default=None, help="Store the run in the results history (see 'history')")
+    analyze.add_argument("--history-db", help="Results history SQLite file (default: per-user app data folder)")
+
+    marts = subparsers.add_parser("marts", parents=[common, fields], help="Check which REPORTING-unused fields can also go from MARTS")
+    marts.add_argument("--apply", action="store_true", help="Comment out the fields that can be removed")
+
+    audit = subparsers.add_parser("audit", parents=[common, fields], help="MARTS internal audit")
+    audit.add_argument("--marts", help="MARTS models folder (default: derived from --dbt)")
+    audit.add_argument("--apply", action="store_true", help="Comment out the fields that can be removed")
+
+    apply = subparsers.add_parser("apply", parents=[common, fields], help="Comment out unused columns in the dbt REPORTING models")
+    apply.add_argument("--dry-run", action="store_true", help="Only list the columns that would be commented out")
+    apply.add_argument("--max-workers", type=int, help=f"Commenting threads (default: up to {COMMENTING_MAX_WORKERS})")
+
+    workspace = subparsers.add_parser("workspace", parents=[common], help="Analyse several Tabular models sharing one dbt project; report dbt columns unused by every model")
+    workspace.add_argument("--workspace", help="Workspace JSON file: {\"dbt\": ..., \"models\": [{\"name\", \"tabular\", \"pbix\": [...]}]}")
+    workspace.add_argument("--max-workers", type=int, help="Models analysed in parallel processes (default: CPU count)")
+
+    history = subparsers.add_parser("history", parents=[common], help="Compare stored runs: columns that became unused/used, reports that started using a column")
+    history.add_argument("--history-db", help="Results history SQLite file (default: per-user app data folder)")
+    history.add_argument("--run", type=int, help="Run to inspect (default: the latest run for --tabular/--dbt)")
+    history.add_argument("--since", help="Compare with the last run before this ISO date/time (default: the previous run)")
+    history.add_argument("--fields", nargs="+", help="Only report these fields (Table.column) and show their history")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    import logging
+    from analyzer_logging import configure_logging
+
+    parser = build_arg_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+
+    for key in CLI_CONFIG_KEYS:
+        if not hasattr(args, key):
+            setattr(args, key, None)
+
+    def cli_log_level():
+        return logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+
+    # Logs go to stderr from the start, so even an error in --config never lands in the results on stdout
+    configure_logging(cli_log_level(), stream=sys.stderr)
+    try:
+        if args.config:
+            _merge_cli_config(args, _load_cli_config(args.config))
+        args.format = args.format or "json"
+        args.detailed = bool(args.detailed)
+
+        configure_logging(cli_log_level(), json_log_path=args.log_json, stream=sys.stderr)
+
+        handlers = {"analyze": _cli_analyze, "marts": _cli_marts, "audit": _cli_audit, "apply": _cli_apply, "history": _cli_history,
+                    "workspace": _cli_workspace}
+        return handlers[args.command](args)
+    except CliUsageError as e:
+        logger.error(f"❌ {e}")
+        return EXIT_USAGE
+    except FileNotFoundError as e:
+        logger.error(f"❌ {e}")
+        return EXIT_INPUT_NOT_FOUND
+    except ImportError as e:
+        logger.error(f"❌ Missing optional dependency: {e}")
+        return EXIT_MISSING_DEPENDENCY
+    except Exception as e:
+        logger.error(f"❌ {type(e).__name__}: {e}", exc_info=True)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+# analyzer_export.py
+
+"""
+Columnar export of analysis results.
+
+Writes one table per result set:
+
+    ui_rows              - final REPORTING rows (one per model column, with usage flags)
+    direct_usage         - every PBIX usage hit
+    indirect_usage       - column -> measure that uses it
+    relationships        - columns used in relationships
+    measure_dependencies - measure -> column / measure it references
+
+Formats:
+    csv     - one <table>.csv per table, streamed row by row
+    parquet - one <table>.parquet per table, written in row groups of chunk_size (needs pyarrow)
+    xlsx    - one workbook, one sheet per table, written chunk by chunk through pandas
+              (xlsxwriter in constant-memory mode when installed, otherwise openpyxl)
+
+Rows are produced by generators and written chunk_size rows at a time, so no
+format needs the whole table in memory (except openpyxl, which keeps the workbook).
+Column names are stable, so the files can be loaded into data-quality dashboards
+or the "Semantic model documentation" template as-is.
+"""
+
+import csv
+import os
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from analyzer_logging import get_logger
+from usage_records import iter_usage_dicts
+
+logger = get_logger("analyzer_export")
+
+EXPORT_FORMATS = ("csv", "parquet", "xlsx")
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Excel's hard limit (1,048,576) minus the header row
+EXCEL_MAX_DATA_ROWS = 1_048_575
+
+USAGE_FLAG_COLUMNS = ("visualization", "measure", "filter", "indirect_measure", "relationship", "hierarchy", "tabular_sort", "rls")
+
+
+# ===========================
+# 📋 TABLE DEFINITIONS
+# ===========================
+# Each table: list of (column, type) with type in "string" / "bool" / "int", and a
+# row generator taking (ui_results, intermediate_data).
+
+def _split_field(field: str) -> Tuple[str, str]:
+    if field and '.' in field:
+        table, column = field.split('.', 1)
+        return table, column
+    return "", field or ""
+
+
+def iter_ui_rows(ui_results: Iterable[Dict], intermediate_data: Dict) -> Iterator[Dict]:
+    for row in ui_results:
+        record = {"table": row.get("table", ""), "column": row.get("column", "")}
+        for flag in USAGE_FLAG_COLUMNS:
+            record[flag] = bool(row.get(flag))
+        record["is_used"] = any(record[flag] for flag in USAGE_FLAG_COLUMNS)
+        # Only present when exported from the UI (the user's checkbox)
+        record["comment_out"] = row.get("checked")
+        yield record
+
+
+def iter_direct_usage(ui_results: Iterable[Dict], intermediate_data: Dict) -> Iterator[Dict]:
+    for hit in iter_usage_dicts(intermediate_data.get("direct_usage", [])):
+        table, column = _split_field(hit.get("field"))
+        yield {
+            "field": hit.get("field"), "table": table, "column": column,
+            "usage_type": hit.get("usage_type"), "page": hit.get("page"), "object_name": hit.get("object_name"),
+            "file": hit.get("file"), "method": hit.get("method"), "source_file": hit.get("source_file"),
+        }
+
+
+def iter_indirect_usage(ui_results: Iterable[Dict], intermediate_data: Dict) -> Iterator[Dict]:
+    for field, measures in sorted(intermediate_data.get("indirect_usage", {}).items()):
+        table, column = _split_field(field)
+        for measure in sorted(measures):
+            yield {"field": field, "table": table, "column": column, "measure": measure}
+
+
+def iter_relationships(ui_results: Iterable[Dict], intermediate_data: Dict) -> Iterator[Dict]:
+    for field, in_relationship in sorted(intermediate_data.get("relationships", {}).items()):
+        if in_relationship:
+            table, column = _split_field(field)
+            yield {"field": field, "table": table, "column": column}
+
+
+def iter_measure_dependencies(ui_results: Iterable[Dict], intermediate_data: Dict) -> Iterator[Dict]:
+    for measure, dependencies in sorted(intermediate_data.get("measure_dependencies", {}).items()):
+        for dependency in sorted(dependencies):
+            if dependency.startswith("MEASURE:"):
+                yield {"measure": measure, "dependency": dependency[len("MEASURE:"):], "dependency_type": "measure"}
+            else:
+                yield {"measure": measure, "dependency": dependency, "dependency_type": "column"}
+
+
+_FIELD_COLUMNS = [("field", "string"), ("table", "string"), ("column", "string")]
+
+EXPORT_TABLES: Dict[str, Tuple[List[Tuple[str, str]], Callable]] = {
+    "ui_rows": (
+        [("table", "string"), ("column", "string")] + [(flag, "bool") for flag in USAGE_FLAG_COLUMNS]
+        + [("is_used", "bool"), ("comment_out", "bool")],
+        iter_ui_rows,
+    ),
+    "direct_usage": (
+        _FIELD_COLUMNS + [("usage_type", "string"), ("page", "string"), ("object_name", "string"),
+                          ("file", "string"), ("method", "string"), ("source_file", "string")],
+        iter_direct_usage,
+    ),
+    "indirect_usage": (_FIELD_COLUMNS + [("measure", "string")], iter_indirect_usage),
+    "relationships": (list(_FIELD_COLUMNS), iter_relationships),
+    "measure_dependencies": (
+        [("measure", "string"), ("dependency", "string"), ("dependency_type", "string")],
+        iter_measure_dependencies,
+    ),
+}
+
+
+def iter_chunks(rows: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ===========================
+# 💾 WRITERS
+# ===========================
+
+def _write_csv(path: str, columns: List[Tuple[str, str]], rows: Iterable[Dict], chunk_size: int) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=[name for name, _ in columns], extrasaction="ignore")
+        writer.writeheader()
+        for chunk in iter_chunks(rows, chunk_size):
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def _write_parquet(path: str, columns: List[Tuple[str, str]], rows: Iterable[Dict], chunk_size: int) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow)") from e
+
+    arrow_types = {"string": pa.string(), "bool": pa.bool_(), "int": pa.int64()}
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns])
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_chunks(rows, chunk_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+        if count == 0:
+            writer.write_table(schema.empty_table())
+    return count
+
+
+def _open_excel_writer(path: str):
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise ImportError("Excel export needs pandas") from e
+    try:
+        import xlsxwriter  # noqa: F401
+        return pd, pd.ExcelWriter(path, engine="xlsxwriter", engine_kwargs={"options": {"constant_memory": True}})
+    except ImportError:
+        pass
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Excel export needs xlsxwriter or openpyxl (pip install xlsxwriter)") from e
+    return pd, pd.ExcelWriter(path, engine="openpyxl")
+
+
+def _write_excel_sheets(pd, excel_writer, sheet_name: str, columns: List[Tuple[str, str]], rows: Iterable[Dict], chunk_size: int) -> int:
+    """Appends the rows to sheet_name chunk by chunk; continues on sheet_name_2, _3 ... past Excel's row limit."""
+    names = [name for name, _ in columns]
+    count = 0
+    sheet_index, sheet_rows = 1, 0
+
+    def current_sheet():
+        return sheet_name if sheet_index == 1 else f"{sheet_name[:28]}_{sheet_index}"
+
+    for chunk in iter_chunks(rows, min(chunk_size, EXCEL_MAX_DATA_ROWS)):
+        if sheet_rows + len(chunk) > EXCEL_MAX_DATA_ROWS:
+            room = EXCEL_MAX_DATA_ROWS - sheet_rows
+            head, chunk = chunk[:room], chunk[room:]
+            if head:
+                pd.DataFrame(head, columns=names).to_excel(excel_writer, sheet_name=current_sheet(), startrow=sheet_rows + 1, header=False, index=False)
+                count += len(head)
+            sheet_index, sheet_rows = sheet_index + 1, 0
+
+        frame = pd.DataFrame(chunk, columns=names)
+        if sheet_rows == 0:
+            frame.to_excel(excel_writer, sheet_name=current_sheet(), index=False)
+        else:
+            frame.to_excel(excel_writer, sheet_name=current_sheet(), startrow=sheet_rows + 1, header=False, index=False)
+        sheet_rows += len(chunk)
+        count += len(chunk)
+    if count == 0:
+        pd.DataFrame(columns=names).to_excel(excel_writer, sheet_name=current_sheet(), index=False)
+    return count
+
+
+# ===========================
+# 🚀 ENTRY POINT
+# ===========================
+
+def export_analysis(ui_results: List[Dict], intermediate_data: Dict, output_dir: str, export_format: str = "csv",
+                    tables: List[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE, base_name: str = "pbi_analysis") -> Dict[str, str]:
+    """
+    Writes the selected tables (default: all of EXPORT_TABLES) to output_dir.
+    Returns {table: file path}. Raises ImportError when the format's library is missing.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format} (expected one of {', '.join(EXPORT_FORMATS)})")
+    tables = tables or list(EXPORT_TABLES)
+    unknown = [t for t in tables if t not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown export table(s): {', '.join(unknown)}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = {}
+
+    if export_format == "xlsx":
+        path = os.path.join(output_dir, f"{base_name}.xlsx")
+        pd, excel_writer = _open_excel_writer(path)
+        with excel_writer:
+            for table in tables:
+                columns, row_source = EXPORT_TABLES[table]
+                count = _write_excel_sheets(pd, excel_writer, table, columns, row_source(ui_results, intermediate_data), chunk_size)
+                logger.info(f"   💾 {table}: {count:,} rows -> {os.path.basename(path)} [{table}]")
+                written[table] = path
+        return written
+
+    writer = _write_csv if export_format == "csv" else _write_parquet
+    for table in tables:
+        columns, row_source = EXPORT_TABLES[table]
+        path = os.path.join(output_dir, f"{base_name}_{table}.{export_format}")
+        count = writer(path, columns, row_source(ui_results, intermediate_data), chunk_size)
+        logger.info(f"   💾 {table}: {count:,} rows -> {os.path.basename(path)}")
+        written[table] = path
+    return written
@@ -0,0 +1,143 @@
+# analyzer_logging.py
+
+"""
+Leveled logging for the analyzer.
+
+Every module logs through get_logger(). Records are sent to:
+  * the console (stderr, message only), so stdout stays free for results,
+  * an in-memory ring buffer that the UI can read without the list growing forever,
+  * optionally a JSON-lines file for post-mortem analysis of long runs.
+
+Messages use lazy %-style arguments (logger.debug("x=%s", x)), so DEBUG calls in hot
+loops cost only a level check while DEBUG is off, which is the default.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from typing import List, Tuple
+
+LOGGER_NAME = "pbi_analyzer"
+DEFAULT_LOG_LEVEL = logging.INFO
+DEFAULT_RING_BUFFER_SIZE = 5000
+
+# Optional overrides for the automatic configuration done by get_logger()
+LOG_LEVEL_ENV_VAR = "PBI_ANALYZER_LOG_LEVEL"    # e.g. DEBUG
+JSON_LOG_ENV_VAR = "PBI_ANALYZER_JSON_LOG"      # path of a JSON-lines file
+
+_configure_lock = threading.Lock()
+_ring_buffer = None
+_json_handler = None
+_console_handler = None
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` formatted messages (with their level) in memory."""
+
+    def __init__(self, capacity: int = DEFAULT_RING_BUFFER_SIZE):
+        super().__init__()
+        self._entries = deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._entries.append((record.levelno, self.format(record)))
+        except Exception:
+            self.handleError(record)
+
+    def entries(self, min_level: int = logging.NOTSET) -> List[Tuple[int, str]]:
+        with self.lock:
+            return [entry for entry in self._entries if entry[0] >= min_level]
+
+    def messages(self, min_level: int = logging.NOTSET) -> List[str]:
+        return [message for _, message in self.entries(min_level)]
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record. Values passed as extra={'data': {...}} are included as-is."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        data = getattr(record, "data", None)
+        if data is not None:
+            entry["data"] = data
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: int = DEFAULT_LOG_LEVEL, json_log_path: str = None, console: bool = True,
+                      ring_buffer_size: int = DEFAULT_RING_BUFFER_SIZE, stream=None) -> logging.Logger:
+    """
+    (Re)configures the analyzer logger. Safe to call more than once; the console, ring buffer
+    and JSON-lines handlers are replaced rather than duplicated.
+    Console output goes to `stream` (stderr by default, so stdout can carry results).
+    """
+    global _ring_buffer, _json_handler, _console_handler
+
+    with _configure_lock:
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(level)
+        logger.propagate = False
+
+        for handler in (_ring_buffer, _json_handler, _console_handler):
+            if handler is not None:
+                logger.removeHandler(handler)
+                handler.close()
+        _json_handler = None
+        _console_handler = None
+
+        _ring_buffer = RingBufferHandler(ring_buffer_size)
+        _ring_buffer.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(_ring_buffer)
+
+        if console:
+            _console_handler = logging.StreamHandler(stream or sys.stderr)
+            _console_handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(_console_handler)
+
+        if json_log_path:
+            _json_handler = logging.FileHandler(json_log_path, mode="a", encoding="utf-8")
+            _json_handler.setFormatter(JsonLinesFormatter())
+            logger.addHandler(_json_handler)
+
+        return logger
+
+
+def set_log_level(level: int):
+    logging.getLogger(LOGGER_NAME).setLevel(level)
+
+
+def get_logger(name: str = None) -> logging.Logger:
+    if _ring_buffer is None:
+        level = logging.getLevelName(os.environ.get(LOG_LEVEL_ENV_VAR, "").upper() or DEFAULT_LOG_LEVEL)
+        configure_logging(level if isinstance(level, int) else DEFAULT_LOG_LEVEL,
+                          json_log_path=os.environ.get(JSON_LOG_ENV_VAR) or None)
+    if not name or name == "__main__":
+        return logging.getLogger(LOGGER_NAME)
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def get_log_messages(min_level: int = logging.NOTSET) -> List[str]:
+    """Returns the messages currently held in the ring buffer (oldest first)."""
+    if _ring_buffer is None:
+        return []
+    return _ring_buffer.messages(min_level)
+
+
+def clear_log_buffer():
+    if _ring_buffer is not None:
+        _ring_buffer.clear()
@@ -0,0 +1,248 @@
+# analyzer_profiler.py
+
+"""
+Lightweight stage profiler for perform_analysis.
+
+Each stage records wall time, CPU time, files read, bytes read, JSON parses,
+regex evaluations and rss_high_water_mb: the process's peak RSS so far, read when
+the stage ends. It never decreases, so a stage only raised the peak if its value is
+above the previous stage's; it is per process, not per analysis.
+
+Call sites in the analyzer bump counters through record_file_read(),
+record_json_parse() and record_regex_evals(). These are no-ops (a single
+thread-local lookup) when no profiler is active, so the hooks can stay in hot code.
+The active profiler is per thread, so analyses running side by side (REPORTING and
+MARTS jobs, workspace models) each count only their own work. Helper threads join
+their caller's profile with profiler_scope(); process workers profile themselves and
+hand their counters back through record_counters().
+bytes_read is measured on the decoded text, which is close enough to compare runs.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+COUNTER_NAMES = ("files_read", "bytes_read", "json_parses", "regex_evals")
+
+_active_profiler = threading.local()
+
+
+# ===========================
+# 📏 MEMORY
+# ===========================
+
+def get_rss_high_water_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None when it cannot be measured."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return round(peak / divisor, 1)
+    try:
+        import psutil  # only needed where `resource` is missing (Windows)
+    except ImportError:
+        return None
+    try:
+        mem = psutil.Process(os.getpid()).memory_info()
+        return round(getattr(mem, "peak_wset", mem.rss) / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+# ===========================
+# ⏱️ PROFILER
+# ===========================
+
+def _new_stage_entry(name: str) -> Dict:
+    entry = {"stage": name, "wall_s": 0.0, "cpu_s": 0.0, "rss_high_water_mb": None}
+    for counter in COUNTER_NAMES:
+        entry[counter] = 0
+    return entry
+
+
+class AnalysisProfiler:
+    """
+    Collects per-stage statistics. Stages are either used as a context manager
+    (`with profiler.stage("STEP 2"):`) or opened one after another with
+    start_stage(), which closes the previous stage; finish() closes the last one.
+    Counters recorded outside any stage are kept under "(outside stages)".
+    """
+
+    def __init__(self, name: str = "perform_analysis"):
+        self.name = name
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.stages: List[Dict] = []
+        self._unstaged = _new_stage_entry("(outside stages)")
+        self._current = None
+        self._stage_start = None
+        self._lock = threading.Lock()
+        self._total_wall_start = time.perf_counter()
+        self._total_cpu_start = time.process_time()
+        self._total_wall = None
+        self._total_cpu = None
+
+    # --- stages -------------------------------------------------------------
+
+    def start_stage(self, name: str):
+        self.end_stage()
+        with self._lock:
+            self._current = _new_stage_entry(name)
+            self._stage_start = (time.perf_counter(), time.process_time())
+
+    def end_stage(self):
+        with self._lock:
+            if self._current is None:
+                return
+            wall_start, cpu_start = self._stage_start
+            self._current["wall_s"] = round(time.perf_counter() - wall_start, 4)
+            self._current["cpu_s"] = round(time.process_time() - cpu_start, 4)
+            self._current["rss_high_water_mb"] = get_rss_high_water_mb()
+            self.stages.append(self._current)
+            self._current = None
+            self._stage_start = None
+
+    @contextmanager
+    def stage(self, name: str):
+        self.start_stage(name)
+        try:
+            yield self
+        finally:
+            self.end_stage()
+
+    def finish(self):
+        self.end_stage()
+        if self._total_wall is None:
+            self._total_wall = round(time.perf_counter() - self._total_wall_start, 4)
+            self._total_cpu = round(time.process_time() - self._total_cpu_start, 4)
+
+    # --- counters -----------------------------------------------------------
+
+    def add(self, counter: str, amount: int = 1):
+        with self._lock:
+            target = self._current if self._current is not None else self._unstaged
+            target[counter] += amount
+
+    def counters(self) -> Dict[str, int]:
+        """Counter totals over all stages, including the open one and work outside stages."""
+        with self._lock:
+            entries = self.stages + [self._unstaged] + ([self._current] if self._current is not None else [])
+            return {counter: sum(entry[counter] for entry in entries) for counter in COUNTER_NAMES}
+
+    # --- activation ---------------------------------------------------------
+
+    @contextmanager
+    def activate(self):
+        """Makes this profiler the target of the module-level record_* hooks in the calling thread."""
+        try:
+            with profiler_scope(self):
+                yield self
+        finally:
+            self.finish()
+
+    # --- output -------------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        stages = list(self.stages)
+        if any(self._unstaged[counter] for counter in COUNTER_NAMES):
+            stages.append(dict(self._unstaged))
+
+        totals = {counter: sum(s[counter] for s in stages) for counter in COUNTER_NAMES}
+        totals["wall_s"] = self._total_wall if self._total_wall is not None else round(sum(s["wall_s"] for s in stages), 4)
+        totals["cpu_s"] = self._total_cpu if self._total_cpu is not None else round(sum(s["cpu_s"] for s in stages), 4)
+        totals["rss_high_water_mb"] = get_rss_high_water_mb()
+
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "stages": stages,
+            "totals": totals,
+        }
+
+
+# ===========================
+# 🪝 HOOKS USED BY THE ANALYZER
+# ===========================
+
+def get_active_profiler() -> Optional[AnalysisProfiler]:
+    return getattr(_active_profiler, "profiler", None)
+
+
+@contextmanager
+def profiler_scope(profiler: Optional[AnalysisProfiler]):
+    """Sends the calling thread's record_* counts to `profiler` (e.g. a pool thread working for an analysis)."""
+    previous = getattr(_active_profiler, "profiler", None)
+    _active_profiler.profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler.profiler = previous
+
+
+def record_file_read(num_bytes: int = 0):
+    profiler = getattr(_active_profiler, "profiler", None)
+    if profiler is not None:
+        profiler.add("files_read")
+        if num_bytes:
+            profiler.add("bytes_read", num_bytes)
+
+
+def record_json_parse(count: int = 1):
+    profiler = getattr(_active_profiler, "profiler", None)
+    if profiler is not None:
+        profiler.add("json_parses", count)
+
+
+def record_regex_evals(count: int = 1):
+    profiler = getattr(_active_profiler, "profiler", None)
+    if profiler is not None:
+        profiler.add("regex_evals", count)
+
+
+def record_counters(counters: Dict[str, int]):
+    """Adds counters collected elsewhere (AnalysisProfiler.counters() of a worker process)."""
+    profiler = getattr(_active_profiler, "profiler", None)
+    if profiler is not None:
+        for counter, amount in counters.items():
+            if amount:
+                profiler.add(counter, amount)
+
+
+# ===========================
+# 📄 REPORTING
+# ===========================
+
+def format_profile_table(profile: Dict) -> str:
+    """Fixed-width text table of a profile dict (as returned by AnalysisProfiler.to_dict)."""
+    header = f"{'Stage':<34} {'Wall s':>8} {'CPU s':>8} {'Files':>7} {'MB read':>9} {'JSON':>7} {'Regex':>9} {'RSS HWM':>8}"
+    lines = [header, "-" * len(header)]
+
+    def row(label, data):
+        peak = data.get("rss_high_water_mb")
+        return (f"{label[:34]:<34} {data.get('wall_s', 0):>8.2f} {data.get('cpu_s', 0):>8.2f} "
+                f"{data.get('files_read', 0):>7,} {data.get('bytes_read', 0) / (1024 * 1024):>9.1f} "
+                f"{data.get('json_parses', 0):>7,} {data.get('regex_evals', 0):>9,} "
+                f"{(f'{peak:.1f}' if peak is not None else 'n/a'):>8}")
+
+    for stage in profile.get("stages", []):
+        lines.append(row(stage["stage"], stage))
+    lines.append("-" * len(header))
+    lines.append(row("TOTAL", profile.get("totals", {})))
+    return "\n".join(lines)
+
+
+def export_profile_json(profile: Dict, file_path: str):
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
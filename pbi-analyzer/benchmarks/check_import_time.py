@@ -0,0 +1,111 @@
+# check_import_time.py
+
+"""
+Cold-start budget check.
+
+Imports each module in a fresh interpreter with `python -X importtime`, takes the
+best cumulative time over a few runs and fails (exit code 1) when a module goes
+over its budget or pulls in a heavy dependency that should only be loaded lazily
+(pandas, pyarrow, ...).
+
+    python benchmarks/check_import_time.py
+    python benchmarks/check_import_time.py --runs 5 --scale 2.0   # slower CI machine
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> (budget in ms, modules it must not import at startup)
+IMPORT_BUDGETS = {
+    "analyzer_logging": (100, {"pandas", "numpy", "pyarrow", "PyQt6", "duckdb"}),
+    "analyzer_profiler": (100, {"pandas", "numpy", "pyarrow", "PyQt6", "psutil"}),
+    "analyzer_cli": (250, {"pandas", "numpy", "pyarrow", "PyQt6", "duckdb"}),
+    "main_ui": (700, {"pandas", "numpy", "pyarrow", "duckdb"}),
+}
+
+# Modules that need optional packages; skipped (not failed) when those are missing
+REQUIRES = {"main_ui": "PyQt6"}
+
+
+def measure_import(module: str) -> Tuple[float, Set[str]]:
+    """Returns (cumulative import time in ms, names of all modules imported) for one cold import."""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PACKAGE_DIR, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    cumulative_us = None
+    imported = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        name = parts[2]
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(parts[1])
+    if cumulative_us is None:
+        raise RuntimeError(f"No importtime entry found for {module}")
+    return cumulative_us / 1000.0, imported
+
+
+def is_available(package: str) -> bool:
+    completed = subprocess.run([sys.executable, "-c", f"import {package}"], capture_output=True)
+    return completed.returncode == 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fail if the analyzer's cold import time goes over budget.")
+    parser.add_argument("--runs", type=int, default=3, help="Cold imports per module; the best one counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply all budgets (for slow machines)")
+    parser.add_argument("modules", nargs="*", help="Subset of modules to check")
+    args = parser.parse_args(argv)
+
+    failures = []
+    results: Dict[str, float] = {}
+    for module in args.modules or IMPORT_BUDGETS:
+        budget_ms, forbidden = IMPORT_BUDGETS.get(module, (250, set()))
+        budget_ms *= args.scale
+
+        requirement = REQUIRES.get(module)
+        if requirement and not is_available(requirement):
+            print(f"⤴ {module:<20} skipped ({requirement} not installed)")
+            continue
+
+        best_ms, imported = None, set()
+        for _ in range(max(1, args.runs)):
+            elapsed_ms, imported = measure_import(module)
+            best_ms = elapsed_ms if best_ms is None else min(best_ms, elapsed_ms)
+        results[module] = best_ms
+
+        heavy = sorted(forbidden & imported)
+        status = "✅" if best_ms <= budget_ms and not heavy else "❌"
+        print(f"{status} {module:<20} {best_ms:8.1f} ms  (budget {budget_ms:.0f} ms)" + (f"  imports: {', '.join(heavy)}" if heavy else ""))
+
+        if best_ms > budget_ms:
+            failures.append(f"{module} took {best_ms:.1f} ms, budget is {budget_ms:.0f} ms")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)} at startup; load them inside the feature that needs them")
+
+    if failures:
+        print("\n❌ Import budget check failed:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+
+    print("\n✅ All modules are within their import budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+# check_regression.py
+
+"""
+Differential check of the analysis results.
+
+Generates a small workspace with generators.py (deterministic), runs perform_analysis
+on it in both logging modes and compares the normalised results with the committed
+expected file. The same workspace is then analysed through the other code paths that
+must not change the results:
+
+    copies    - the report plus a byte-identical copy (layout members reused across files)
+    parallel  - the PBIX scan forced onto the process pool (scan_workers=2, small batches)
+    bim/pbit  - the model read from a model.bim / .pbit built from the generated folder model
+
+It also checks the streaming model.bim scanner against json.loads with read chunks of
+1..13 characters, so every string, escape, bracket pair and number gets cut by a chunk
+boundary somewhere: on a handcrafted document and, when present, on the DataModelSchema
+of "Semantic model documentation.pbit" at the repository root.
+
+Exit code 1 on any difference. After an intended change of the results:
+
+    python benchmarks/check_regression.py --update
+
+Text-search details depend on set iteration order, so the check always runs with
+PYTHONHASHSEED=0 (it re-runs itself when started without it).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from typing import Dict, List
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analyzer_cli  # noqa: E402
+from bim_reader import MODEL_COLLECTIONS, JsonStreamScanner, iter_model_objects  # noqa: E402
+from generators import generate_workspace  # noqa: E402
+from model_text import sniff_encoding  # noqa: E402
+
+EXPECTED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "expected", "analysis_regression.json")
+WORKSPACE_SIZE = {"n_tables": 8, "n_columns": 12, "n_visuals": 36, "n_dbt_models": 10}
+SEED = 7
+
+SCANNER_CHUNK_SIZES = range(1, 14)
+SAMPLE_PBIT_PATH = os.path.join(os.path.dirname(PACKAGE_DIR), "Semantic model documentation.pbit")
+
+# Strings holding quotes, backslashes and brackets, numbers in every form, empty and nested containers
+SCANNER_DOCUMENT = r"""{
+  "name": "Sample \"model\" ]}",
+  "compatibilityLevel": 1.5e3,
+  "annotations": [{"name": "brackets", "value": "[[{{ \"}]\" \\\" ]]}}"}, [], {}, [[], [{}]]],
+  "model": {
+    "culture": "en-US",
+    "numbers": [0, -0.25, 1e-7, 12345678901234567890, 3.0E+2, true, false, null],
+    "expressions": [{"name": "q", "expression": ["let", "  s = \"}]\\\\\"", "in s"]}],
+    "tables": [
+      {"name": "Sales ]}", "columns": [{"name": "Amount", "dataType": "double"},
+                                     {"name": "Net", "type": "calculated", "expression": ["[Amount] * 0.8", "/* ] } */"]}],
+       "measures": [{"name": "Total \"x\"", "expression": "SUM(Sales[Amount]) // \\ ]"}],
+       "partitions": [{"name": "p", "source": {"type": "m", "expression": ["let \"[\"", "in 1"]}}]},
+      {"name": "\u00c9t\u00e9", "columns": [], "annotations": [{"value": "{\"json\": [1, 2]}"}]}
+    ],
+    "cultures": [{"name": "en-US", "linguisticMetadata": {"content": {"Entities": {"a": {"Terms": [{"x]": {"State": "Generated"}}]}}}}}],
+    "relationships": [{"name": "r", "fromTable": "Sales ]}", "fromColumn": "Amount", "toTable": "\u00c9t\u00e9", "toColumn": "K"}],
+    "roles": [{"name": "R", "tablePermissions": [{"name": "Sales ]}", "filterExpression": "[Net] > -1.5e-3"}]}]
+  },
+  "trailing": [1.25, "\\", "x"]
+}"""
+
+
+# ===========================
+# ⚙️ HELPERS
+# ===========================
+
+def _plain(value, root: str):
+    """JSON-ready copy of a result: records as dicts, sets sorted, the workspace root replaced."""
+    if hasattr(value, "to_dict"):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {str(key): _plain(item, root) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(_plain(item, root) for item in value)
+    if isinstance(value, (list, tuple)):
+        return [_plain(item, root) for item in value]
+    if isinstance(value, str):
+        return value.replace(root, "<root>").replace("\\", "/")
+    return value
+
+
+def _sort_records(records: List) -> List:
+    return sorted(records, key=lambda record: json.dumps(record, sort_keys=True))
+
+
+def run_analysis(pbix_paths: List[str], model_path: str, reporting_path: str, root: str, scan_workers: int = None) -> Dict:
+    """Normalised results of perform_analysis in both logging modes."""
+    results = {}
+    for detailed in (False, True):
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows, intermediate_data = analyzer_cli.perform_analysis(
+                pbix_paths, model_path, reporting_path, enable_detailed_logging=detailed, scan_workers=scan_workers
+            )
+        results["detailed" if detailed else "basic"] = _plain({
+            "rows": sorted(rows, key=lambda row: (row["table"], row["column"])),
+            "direct_usage": _sort_records(_plain(intermediate_data["direct_usage"], root)),
+            "indirect_usage": intermediate_data["indirect_usage"],
+            "relationships": intermediate_data["relationships"],
+        }, root)
+    return results
+
+
+# ===========================
+# 🧱 ALTERNATIVE MODEL SOURCES
+# ===========================
+
+def build_bim_model(workspace: Dict) -> Dict:
+    """model.bim content equivalent to the generated Tabular Editor folder (measure files become table measures)."""
+    model_path = workspace["tabular_model_path"]
+    tables = []
+    tables_dir = os.path.join(model_path, "tables")
+    for table_name in sorted(os.listdir(tables_dir)):
+        with open(os.path.join(tables_dir, table_name, f"{table_name}.json"), encoding="utf-8") as f:
+            table = json.load(f)
+        measures_dir = os.path.join(tables_dir, table_name, "measures")
+        if os.path.isdir(measures_dir):
+            table["measures"] = [
+                {"name": name, "expression": expression.splitlines()}
+                for file_name in sorted(os.listdir(measures_dir))
+                for name, expression in analyzer_cli.iter_measures_from_file(os.path.join(measures_dir, file_name))
+            ]
+        tables.append(table)
+
+    def load_all(folder: str) -> List[Dict]:
+        folder = os.path.join(model_path, folder)
+        items = []
+        for file_name in sorted(os.listdir(folder)) if os.path.isdir(folder) else []:
+            with open(os.path.join(folder, file_name), encoding="utf-8") as f:
+                items.append(json.load(f))
+        return items
+
+    return {"name": "Model", "compatibilityLevel": 1567, "model": {
+        "culture": "en-US",
+        "tables": tables,
+        "relationships": load_all("relationships"),
+        "roles": load_all("roles"),
+        "annotations": [{"name": "note", "value": "skipped: \"]}[{\" and \\\" escapes"}],
+    }}
+
+
+def write_model_sources(workspace: Dict, root: str) -> Dict[str, str]:
+    model = build_bim_model(workspace)
+    bim_path = os.path.join(root, "bim", "model.bim")
+    os.makedirs(os.path.dirname(bim_path), exist_ok=True)
+    with open(bim_path, "w", encoding="utf-8") as f:
+        json.dump(model, f, indent=2)
+
+    pbit_path = os.path.join(root, "model.pbit")
+    with zipfile.ZipFile(pbit_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        # Power BI writes the schema as UTF-16 LE without a BOM
+        archive.writestr("DataModelSchema", json.dumps(model).encode("utf-16-le"))
+        archive.writestr("Version", "1.28".encode("utf-16-le"))
+    return {"bim": bim_path, "pbit": pbit_path}
+
+
+# ===========================
+# 🔍 CHECKS
+# ===========================
+
+def _compare(name: str, actual, expected, failures: List[str]):
+    if actual == expected:
+        print(f"✅ {name}")
+        return
+    differing = sorted(key for key in set(actual) | set(expected) if actual.get(key) != expected.get(key)) if isinstance(actual, dict) else []
+    print(f"❌ {name}" + (f"  (differs in: {', '.join(differing)})" if differing else ""))
+    failures.append(name)
+
+
+def expected_model_objects(document) -> List:
+    """What iter_model_objects must yield for a decoded document (same traversal, done on the whole JSON)."""
+    events = []
+
+    def walk(members: Dict, nested: bool):
+        for key, value in members.items():
+            if key in MODEL_COLLECTIONS and isinstance(value, list):
+                events.extend((MODEL_COLLECTIONS[key], item) for item in value if isinstance(item, dict))
+            elif key == "model" and not nested and isinstance(value, dict):
+                walk(value, nested=True)
+
+    walk(document, nested=False)
+    return events
+
+
+def check_stream_scanner() -> List[str]:
+    failures = []
+    documents = {"handcrafted document": SCANNER_DOCUMENT}
+    if os.path.isfile(SAMPLE_PBIT_PATH):
+        with zipfile.ZipFile(SAMPLE_PBIT_PATH) as archive:
+            schema = archive.read("DataModelSchema")
+        documents[os.path.basename(SAMPLE_PBIT_PATH)] = schema.decode(sniff_encoding(schema[:4])).lstrip("\ufeff")
+    else:
+        print(f"⤴ {os.path.basename(SAMPLE_PBIT_PATH)} not found; scanned the handcrafted document only")
+
+    for name, text in documents.items():
+        decoded = json.loads(text)
+        expected_events = expected_model_objects(decoded)
+        top_level = list(decoded.values())
+        bad_chunks = []
+        for chunk_chars in SCANNER_CHUNK_SIZES:
+            if list(iter_model_objects(io.StringIO(text), chunk_chars)) != expected_events:
+                bad_chunks.append(chunk_chars)
+                continue
+            # Every top-level value once skipped and once decoded, alternating, so skip() also
+            # has to stop exactly where the next value starts
+            for first_decoded in (False, True):
+                scanner = JsonStreamScanner(io.StringIO(text), chunk_chars)
+                values = []
+                for index, _ in enumerate(scanner.iter_object()):
+                    if (index % 2 == 0) == first_decoded:
+                        values.append(scanner.value())
+                    else:
+                        scanner.skip()
+                        values.append(None)
+                if scanner.peek() != "" or values != [value if (index % 2 == 0) == first_decoded else None for index, value in enumerate(top_level)]:
+                    bad_chunks.append(chunk_chars)
+                    break
+        _compare(f"scanner: {name} (chunks of {SCANNER_CHUNK_SIZES[0]}..{SCANNER_CHUNK_SIZES[-1]} chars)",
+                 {"failing chunk sizes": bad_chunks}, {"failing chunk sizes": []}, failures)
+    return failures
+
+
+def check_analysis(work_dir: str, update: bool) -> List[str]:
+    failures = []
+    root = os.path.join(work_dir, "workspace")
+    workspace = generate_workspace(root, seed=SEED, **WORKSPACE_SIZE)
+    pbix_paths = workspace["pbix_paths"]
+    model_path, reporting_path = workspace["tabular_model_path"], workspace["reporting_path"]
+
+    copy_path = os.path.join(root, "report_copy.pbix")
+    shutil.copyfile(pbix_paths[0], copy_path)
+
+    actual = {
+        "folder": run_analysis(pbix_paths, model_path, reporting_path, root, scan_workers=1),
+        "copies": run_analysis(pbix_paths + [copy_path], model_path, reporting_path, root, scan_workers=1),
+    }
+
+    if update:
+        os.makedirs(os.path.dirname(EXPECTED_PATH), exist_ok=True)
+        with open(EXPECTED_PATH, "w", encoding="utf-8") as f:
+            json.dump(actual, f, indent=1, sort_keys=True, ensure_ascii=False)
+            f.write("\n")
+        print(f"📝 Expected results written to {os.path.relpath(EXPECTED_PATH, PACKAGE_DIR)}")
+    else:
+        with open(EXPECTED_PATH, encoding="utf-8") as f:
+            expected = json.load(f)
+        for case in actual:
+            _compare(f"analysis: {case}", actual[case], expected.get(case), failures)
+
+    scan_min_work, batch_bytes = analyzer_cli.PARALLEL_SCAN_MIN_WORK, analyzer_cli.PARALLEL_SCAN_BATCH_BYTES
+    analyzer_cli.PARALLEL_SCAN_MIN_WORK, analyzer_cli.PARALLEL_SCAN_BATCH_BYTES = 0, 16 * 1024
+    try:
+        parallel = run_analysis(pbix_paths, model_path, reporting_path, root, scan_workers=2)
+    finally:
+        analyzer_cli.PARALLEL_SCAN_MIN_WORK, analyzer_cli.PARALLEL_SCAN_BATCH_BYTES = scan_min_work, batch_bytes
+    _compare("analysis: parallel scan = serial scan", parallel, actual["folder"], failures)
+
+    for source, path in write_model_sources(workspace, root).items():
+        result = run_analysis(pbix_paths, path, reporting_path, root, scan_workers=1)
+        same_rows = {mode: {key: result[mode][key] for key in ("rows", "relationships", "indirect_usage")} for mode in result}
+        folder_rows = {mode: {key: actual["folder"][mode][key] for key in ("rows", "relationships", "indirect_usage")} for mode in result}
+        _compare(f"analysis: {source} model = folder model", same_rows, folder_rows, failures)
+    return failures
+
+
+# ===========================
+# 🚀 ENTRY POINT
+# ===========================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare analysis results on a generated workspace with the committed expected results.")
+    parser.add_argument("--update", action="store_true", help="Rewrite the expected results instead of comparing")
+    args = parser.parse_args(argv)
+
+    if os.environ.get("PYTHONHASHSEED") != "0":
+        env = dict(os.environ, PYTHONHASHSEED="0")
+        return subprocess.call([sys.executable, os.path.abspath(__file__), *(argv if argv is not None else sys.argv[1:])], env=env)
+
+    logging.getLogger("pbi_analyzer").setLevel(logging.ERROR)
+    work_dir = tempfile.mkdtemp(prefix="pbi_regression_")
+    try:
+        failures = check_analysis(work_dir, args.update) + check_stream_scanner()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n❌ {len(failures)} check(s) failed.")
+        return 1
+    print("\n✅ All regression checks passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
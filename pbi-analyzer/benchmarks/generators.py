@@ -0,0 +1,309 @@
+# generators.py
+
+"""
+Deterministic synthetic inputs for the benchmarks.
+
+Every generator takes a seed and only uses its own random.Random instance, so the
+same arguments always produce byte-identical files and runs can be compared
+across commits.
+
+Layout produced by generate_workspace():
+
+    <root>/
+      datasets/Model/              Tabular Editor "save to folder" model
+        tables/<Table>/<Table>.json
+        tables/Measures/measures/*.dax
+        relationships/*.json
+        roles/*.json
+      dbt/models/reporting/        one view per table, alias = Snowflake view name
+      dbt/models/marts/            one base model per table + ref() chains on top of it
+      report.pbix                  extracted-report layout (sections/visualContainers JSON)
+"""
+
+import json
+import os
+import random
+import shutil
+import zipfile
+from typing import Dict, List
+
+MEASURES_TABLE = "Measures"
+
+VISUAL_TYPES = [
+    "clusteredColumnChart", "lineChart", "tableEx", "pivotTable", "card",
+    "slicer", "barChart", "donutChart", "multiRowCard", "scatterChart"
+]
+
+DATA_TYPES = ["string", "int64", "double", "dateTime", "boolean"]
+
+
+# ===========================
+# 🧱 TABULAR MODEL
+# ===========================
+
+def build_table_specs(n_tables: int, n_columns: int, seed: int = 42) -> List[Dict]:
+    """Names and columns of the synthetic tables. Shared by all the generators below."""
+    rnd = random.Random(seed)
+    tables = []
+    for t in range(n_tables):
+        prefix = "Fact" if t % 4 == 0 else "Dim"
+        name = f"{prefix}Table{t:03d}"
+        columns = [f"{name}Key"] + [f"Attribute_{t:03d}_{c:03d}" for c in range(1, n_columns)]
+        tables.append({
+            "name": name,
+            "alias": name.upper(),
+            "columns": columns,
+            "data_types": [rnd.choice(DATA_TYPES) for _ in columns],
+        })
+    return tables
+
+
+def generate_tabular_model(model_path: str, tables: List[Dict], n_measures: int = None, seed: int = 42):
+    """Writes a Tabular Editor folder model: tables with hierarchies/sort-by, measures, relationships and RLS roles."""
+    rnd = random.Random(seed)
+    tables_dir = os.path.join(model_path, "tables")
+    os.makedirs(tables_dir, exist_ok=True)
+
+    for table in tables:
+        name, columns = table["name"], table["columns"]
+        table_json = {
+            "name": name,
+            "lineageTag": f"lt-{name.lower()}",
+            "columns": [
+                {"name": col, "dataType": dtype, "sourceColumn": col, "summarizeBy": "none", "lineageTag": f"lt-{name.lower()}-{i}"}
+                for i, (col, dtype) in enumerate(zip(columns, table["data_types"]))
+            ],
+            "partitions": [{
+                "name": name,
+                "mode": "import",
+                "source": {
+                    "type": "m",
+                    "expression": [
+                        "let",
+                        '    Source = Snowflake.Databases("account.snowflakecomputing.com", "WH"),',
+                        '    DB = Source{[Name="ANALYTICS",Kind="Database"]}[Data],',
+                        '    Schema = DB{[Name="REPORTING",Kind="Schema"]}[Data],',
+                        f'    View = Schema{{[Name="{table["alias"]}",Kind="View"]}}[Data]',
+                        "in",
+                        "    View"
+                    ]
+                }
+            }]
+        }
+
+        if len(columns) > 3:
+            levels = rnd.sample(columns[1:], min(3, len(columns) - 1))
+            table_json["hierarchies"] = [{
+                "name": f"{name} Hierarchy",
+                "levels": [{"name": col, "ordinal": i, "column": col} for i, col in enumerate(levels)]
+            }]
+            sort_target, sort_by = rnd.sample(columns[1:], 2)
+            for col in table_json["columns"]:
+                if col["name"] == sort_target:
+                    col["sortByColumn"] = sort_by
+
+        table_dir = os.path.join(tables_dir, name)
+        os.makedirs(table_dir, exist_ok=True)
+        with open(os.path.join(table_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(table_json, f, indent=2)
+
+    # Measures: a mix of direct column references and measure-on-measure chains
+    n_measures = n_measures if n_measures is not None else max(5, len(tables) * 2)
+    measures_dir = os.path.join(tables_dir, MEASURES_TABLE, "measures")
+    os.makedirs(measures_dir, exist_ok=True)
+    with open(os.path.join(tables_dir, MEASURES_TABLE, f"{MEASURES_TABLE}.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": MEASURES_TABLE, "columns": []}, f, indent=2)
+
+    measure_names = []
+    for m in range(n_measures):
+        measure_name = f"Measure {m:04d}"
+        if measure_names and rnd.random() < 0.3:
+            expression = f"[{rnd.choice(measure_names)}] * 1.1"
+        else:
+            table = rnd.choice(tables)
+            column = rnd.choice(table["columns"][1:] or table["columns"])
+            aggregation = rnd.choice(["SUM", "AVERAGE", "DISTINCTCOUNT", "MAX"])
+            expression = f"CALCULATE({aggregation}('{table['name']}'[{column}]), ALL('{table['name']}'))"
+        measure_names.append(measure_name)
+        with open(os.path.join(measures_dir, f"{measure_name}.dax"), "w", encoding="utf-8") as f:
+            f.write(expression + "\n")
+
+    # Relationships: every Fact table points at the next few Dim tables through their keys
+    relationships_dir = os.path.join(model_path, "relationships")
+    os.makedirs(relationships_dir, exist_ok=True)
+    dims = [t for t in tables if t["name"].startswith("Dim")]
+    for fact in (t for t in tables if t["name"].startswith("Fact")):
+        for dim in dims[:3] if len(dims) <= 3 else rnd.sample(dims, 3):
+            fk_column = rnd.choice(fact["columns"][1:] or fact["columns"])
+            rel_name = f"{fact['name']}_{dim['name']}"
+            with open(os.path.join(relationships_dir, f"{rel_name}.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "name": rel_name,
+                    "fromTable": fact["name"], "fromColumn": fk_column,
+                    "toTable": dim["name"], "toColumn": dim["columns"][0]
+                }, f, indent=2)
+
+    # RLS roles
+    roles_dir = os.path.join(model_path, "roles")
+    os.makedirs(roles_dir, exist_ok=True)
+    for r in range(max(1, len(tables) // 10)):
+        table = rnd.choice(tables)
+        column = rnd.choice(table["columns"][1:] or table["columns"])
+        with open(os.path.join(roles_dir, f"Role{r:02d}.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "name": f"Role{r:02d}",
+                "modelPermission": "read",
+                "tablePermissions": [{"name": table["name"], "filterExpression": f"'{table['name']}'[{column}] = USERPRINCIPALNAME()"}]
+            }, f, indent=2)
+
+
+# ===========================
+# 📊 PBIX
+# ===========================
+
+def _column_ref(source_alias: str, column: str) -> Dict:
+    return {"Column": {"Expression": {"SourceRef": {"Source": source_alias}}, "Property": column}}
+
+
+def generate_pbix(pbix_path: str, tables: List[Dict], n_visuals: int, visuals_per_page: int = 12,
+                  usage_ratio: float = 0.35, seed: int = 42):
+    """
+    Writes a zip in the extracted-report layout the analyzer reads
+    (report/sections/<page>/visualContainers/<visual>/config.json + filters.json).
+    Only roughly `usage_ratio` of the columns are ever placed on a visual, so the
+    analysis has a realistic share of unused columns to report.
+    """
+    rnd = random.Random(seed)
+    used_pool = []
+    for table in tables:
+        k = max(1, int(len(table["columns"]) * usage_ratio))
+        used_pool.extend((table["name"], col) for col in rnd.sample(table["columns"], k))
+
+    n_pages = max(1, (n_visuals + visuals_per_page - 1) // visuals_per_page)
+    os.makedirs(os.path.dirname(os.path.abspath(pbix_path)), exist_ok=True)
+
+    with zipfile.ZipFile(pbix_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("report/config.json", json.dumps({"version": "5.43", "themeCollection": {}}, indent=2))
+        visual_index = 0
+        for page in range(n_pages):
+            section = f"{page:03d}_Page {page + 1}"
+            zf.writestr(f"report/sections/{section}/section.json", json.dumps({
+                "displayName": f"Page {page + 1}", "displayOption": 1, "height": 720.0, "width": 1280.0, "ordinal": page
+            }, indent=2))
+
+            for _ in range(min(visuals_per_page, n_visuals - visual_index)):
+                visual_type = rnd.choice(VISUAL_TYPES)
+                picks = rnd.sample(used_pool, min(len(used_pool), rnd.randint(1, 4)))
+                entities = sorted({table_name for table_name, _ in picks})
+                aliases = {table_name: f"t{i}" for i, table_name in enumerate(entities)}
+
+                select = [dict(_column_ref(aliases[t], c), Name=f"{t}.{c}") for t, c in picks]
+                where = []
+                if rnd.random() < 0.4:
+                    t, c = rnd.choice(picks)
+                    where.append({"Condition": {"In": {
+                        "Expressions": [_column_ref(aliases[t], c)],
+                        "Values": [[{"Literal": {"Value": f"'{rnd.randint(1, 999)}'"}}]]
+                    }}})
+
+                config = {
+                    "name": f"visual{visual_index:05d}",
+                    "layouts": [{"id": 0, "position": {"x": rnd.randint(0, 1000), "y": rnd.randint(0, 600), "z": visual_index, "width": 280, "height": 200}}],
+                    "singleVisual": {
+                        "visualType": visual_type,
+                        "projections": {
+                            "Category" if visual_type != "slicer" else "Values": [{"queryRef": f"{t}.{c}"} for t, c in picks]
+                        },
+                        "prototypeQuery": {
+                            "Version": 2,
+                            "From": [{"Name": aliases[t], "Entity": t, "Type": 0} for t in entities],
+                            "Select": select,
+                            "Where": where
+                        },
+                        "vcObjects": {"title": [{"properties": {"text": {"expr": {"Literal": {"Value": f"'Visual {visual_index}'"}}}}}]}
+                    }
+                }
+                folder = f"report/sections/{section}/visualContainers/{visual_index:05d}_{visual_type}"
+                zf.writestr(f"{folder}/config.json", json.dumps(config, indent=2))
+                zf.writestr(f"{folder}/filters.json", json.dumps([], indent=2))
+                visual_index += 1
+
+
+# ===========================
+# 🗂️ DBT PROJECT
+# ===========================
+
+def generate_dbt_project(dbt_models_path: str, tables: List[Dict], n_models: int = None, seed: int = 42):
+    """
+    reporting/<table>.sql  -> alias = Snowflake view name, selects every column from its marts model
+    marts/marts_<table>.sql -> base model
+    marts/marts_<table>_step_<k>.sql -> ref() chain on top of the base model, re-selecting a subset of columns
+    `n_models` is the total number of marts models (at least one per table).
+    """
+    rnd = random.Random(seed)
+    reporting_dir = os.path.join(dbt_models_path, "reporting")
+    marts_dir = os.path.join(dbt_models_path, "marts")
+    os.makedirs(reporting_dir, exist_ok=True)
+    os.makedirs(marts_dir, exist_ok=True)
+
+    n_models = max(len(tables), n_models or len(tables))
+    chain_lengths = [0] * len(tables)
+    for i in range(n_models - len(tables)):
+        chain_lengths[i % len(tables)] += 1
+
+    for table, chain_length in zip(tables, chain_lengths):
+        base_model = f"marts_{table['name'].lower()}"
+        columns = table["columns"]
+
+        lines = ["{{ config(materialized='view', alias='%s') }}" % table["alias"], "", "select"]
+        lines += [f"    {'' if i == 0 else ', '}{col.lower()} as {col}" for i, col in enumerate(columns)]
+        lines += ["from {{ ref('%s') }}" % base_model, ""]
+        with open(os.path.join(reporting_dir, f"{table['name'].lower()}.sql"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+        lines = ["{{ config(materialized='table') }}", "", "with source as (", "    select * from {{ source('raw', '%s') }}" % table["name"].lower(), ")", "", "select"]
+        lines += [f"    {'' if i == 0 else ', '}src.raw_{col.lower()} as {col.lower()}" for i, col in enumerate(columns)]
+        lines += ["from source as src", ""]
+        with open(os.path.join(marts_dir, f"{base_model}.sql"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+        previous = base_model
+        for step in range(1, chain_length + 1):
+            model_name = f"{base_model}_step_{step}"
+            picked = rnd.sample(columns, max(1, len(columns) // 4))
+            lines = ["select"]
+            lines += [f"    {'' if i == 0 else ', '}p.{col.lower()}" for i, col in enumerate(picked)]
+            lines += ["from {{ ref('%s') }} as p" % previous, ""]
+            with open(os.path.join(marts_dir, f"{model_name}.sql"), "w", encoding="utf-8") as f:
+                f.write("\n".join(lines))
+            previous = model_name
+
+
+# ===========================
+# 📦 EVERYTHING TOGETHER
+# ===========================
+
+def generate_workspace(root: str, n_tables: int, n_columns: int, n_visuals: int, n_dbt_models: int = None,
+                       seed: int = 42, clean: bool = True) -> Dict:
+    """Generates the model, PBIX and dbt tree under `root` and returns their paths."""
+    if clean:
+        shutil.rmtree(root, ignore_errors=True)
+    tables = build_table_specs(n_tables, n_columns, seed=seed)
+
+    model_path = os.path.join(root, "datasets", "Model")
+    dbt_models_path = os.path.join(root, "dbt", "models")
+    pbix_path = os.path.join(root, "report.pbix")
+
+    generate_tabular_model(model_path, tables, seed=seed + 1)
+    generate_pbix(pbix_path, tables, n_visuals, seed=seed + 2)
+    generate_dbt_project(dbt_models_path, tables, n_models=n_dbt_models, seed=seed + 3)
+
+    return {
+        "root": root,
+        "tabular_model_path": model_path,
+        "dbt_models_path": dbt_models_path,
+        "reporting_path": os.path.join(dbt_models_path, "reporting"),
+        "marts_path": os.path.join(dbt_models_path, "marts"),
+        "pbix_paths": [pbix_path],
+        "tables": tables,
+    }
@@ -0,0 +1,198 @@
+# run_benchmarks.py
+
+"""
+Times the analyzer entry points on synthetic inputs of growing size and reports
+how they scale.
+
+    python benchmarks/run_benchmarks.py                      # default scales 1 2 4 8
+    python benchmarks/run_benchmarks.py --scales 1 2 4 --repeat 3 --json bench.json
+
+Scale 1 is BASE_SIZE (tables, columns per table, visuals, dbt models); scale k
+multiplies the table, visual and dbt model counts by k. Inputs are generated
+deterministically (see generators.py), so numbers from different commits are
+comparable on the same machine.
+
+The "exponent" column is the slope of log(time) against log(scale): ~1.0 means
+linear scaling, ~2.0 quadratic.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analyzer_cli  # noqa: E402
+from analyzer_logging import configure_logging  # noqa: E402
+from generators import generate_workspace  # noqa: E402
+
+BASE_SIZE = {"n_tables": 10, "n_columns": 25, "n_visuals": 40, "n_dbt_models": 20}
+DEFAULT_SCALES = [1, 2, 4, 8]
+BENCHMARKS = ["perform_analysis", "analyze_marts_optimization", "analyze_marts_audit", "apply_changes"]
+
+
+# ===========================
+# ⚙️ HELPERS
+# ===========================
+
+def size_for_scale(scale: int) -> Dict:
+    return {
+        "n_tables": BASE_SIZE["n_tables"] * scale,
+        "n_columns": BASE_SIZE["n_columns"],
+        "n_visuals": BASE_SIZE["n_visuals"] * scale,
+        "n_dbt_models": BASE_SIZE["n_dbt_models"] * scale,
+    }
+
+
+def time_call(func: Callable, repeat: int, setup: Callable = None) -> Dict:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return {"best_s": round(min(timings), 4), "median_s": round(statistics.median(timings), 4), "runs": len(timings), "result": result}
+
+
+def scaling_exponent(scales: List[int], times: List[float]) -> float:
+    """Least-squares slope of log(time) vs log(scale)."""
+    points = [(math.log(s), math.log(t)) for s, t in zip(scales, times) if t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if denominator == 0:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator, 2)
+
+
+# ===========================
+# ⏱️ ONE SIZE
+# ===========================
+
+def run_size(scale: int, work_dir: str, repeat: int, seed: int, only: List[str]) -> Dict:
+    size = size_for_scale(scale)
+    workspace = generate_workspace(os.path.join(work_dir, f"scale_{scale}"), seed=seed, **size)
+    timings = {}
+
+    analysis = time_call(
+        lambda: analyzer_cli.perform_analysis(workspace["pbix_paths"], workspace["tabular_model_path"], workspace["reporting_path"]),
+        repeat
+    )
+    ui_results, intermediate_data = analysis.pop("result")
+    if "perform_analysis" in only:
+        timings["perform_analysis"] = analysis
+
+    unused_fields = [
+        f"{row['table']}.{row['column']}" for row in ui_results
+        if not any(row.get(k) for k in ("visualization", "measure", "filter", "indirect_measure", "relationship", "hierarchy", "tabular_sort", "rls"))
+    ]
+
+    if "analyze_marts_optimization" in only:
+        measured = time_call(
+            lambda: analyzer_cli.analyze_marts_optimization(workspace["reporting_path"], workspace["tabular_model_path"], unused_fields),
+            repeat
+        )
+        measured.pop("result")
+        timings["analyze_marts_optimization"] = measured
+
+    if "analyze_marts_audit" in only:
+        audit_fields = [f"marts_{table['name'].lower()}.{col.lower()}" for table in workspace["tables"] for col in table["columns"]]
+        measured = time_call(
+            lambda: analyzer_cli.analyze_marts_audit(workspace["marts_path"], workspace["reporting_path"], audit_fields),
+            repeat
+        )
+        measured.pop("result")
+        timings["analyze_marts_audit"] = measured
+
+    if "apply_changes" in only:
+        # apply_changes rewrites SQL files, so every run gets a fresh copy of the dbt tree
+        scratch = os.path.join(work_dir, f"scale_{scale}_apply")
+
+        def fresh_copy():
+            shutil.rmtree(scratch, ignore_errors=True)
+            shutil.copytree(workspace["dbt_models_path"], scratch)
+            data = dict(intermediate_data, columns_to_comment_out=unused_fields)
+            return os.path.join(scratch, "reporting"), data
+
+        measured = time_call(analyzer_cli.apply_changes, repeat, setup=fresh_copy)
+        measured.pop("result")
+        timings["apply_changes"] = measured
+
+    return {
+        "scale": scale,
+        "size": size,
+        "total_columns": size["n_tables"] * size["n_columns"],
+        "unused_columns": len(unused_fields),
+        "profile": intermediate_data.get("profile"),
+        "timings": timings,
+    }
+
+
+# ===========================
+# 🚀 MAIN
+# ===========================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Power BI usage analyzer on synthetic inputs.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="Size multipliers (default: 1 2 4 8)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement; best and median are reported")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the input generators")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS, help="Subset of entry points to time")
+    parser.add_argument("--json", dest="json_path", help="Write the full results (including stage profiles) to this file")
+    parser.add_argument("--work-dir", help="Where to generate inputs (default: a temporary directory that is removed afterwards)")
+    args = parser.parse_args(argv)
+
+    # The analyzer is chatty at INFO; benchmarks only need warnings
+    configure_logging(level=logging.WARNING)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="pbi_analyzer_bench_")
+    results = []
+    try:
+        for scale in sorted(set(args.scales)):
+            print(f"⏱️ Scale {scale}: {size_for_scale(scale)}", flush=True)
+            results.append(run_size(scale, work_dir, args.repeat, args.seed, args.only))
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    scales = [r["scale"] for r in results]
+    print()
+    print(f"{'Benchmark':<28}" + "".join(f"{'x' + str(s):>10}" for s in scales) + f"{'exponent':>10}")
+    print("-" * (28 + 10 * len(scales) + 10))
+    exponents = {}
+    for name in args.only:
+        times = [r["timings"][name]["best_s"] for r in results]
+        exponents[name] = scaling_exponent(scales, times)
+        exponent_text = f"{exponents[name]:.2f}" if exponents[name] is not None else "n/a"
+        print(f"{name:<28}" + "".join(f"{t:>10.3f}" for t in times) + f"{exponent_text:>10}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "base_size": BASE_SIZE,
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "results": results,
+                "scaling_exponents": exponents,
+            }, f, indent=2)
+        print(f"\n💾 Results saved to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
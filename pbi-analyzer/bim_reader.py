@@ -0,0 +1,306 @@
+# bim_reader.py
+
+"""
+Streaming reader for model.bim (and the identical DataModelSchema JSON inside a .pbit).
+
+The file is never loaded as one document. A small scanner walks the top-level
+structure chunk by chunk; the elements of model.tables, model.relationships and
+model.roles are decoded one at a time with json.JSONDecoder.raw_decode, and
+everything else (expressions, cultures with linguistic metadata, annotations ...) is
+skipped by bracket counting without being decoded. Memory is bounded by the read
+buffer plus the largest single table.
+
+iter_model_objects() yields ("table" | "relationship" | "role", dict) events;
+snapshot_from_objects() collects them into the snapshot shared with the TMDL reader:
+
+    {"source_path", "format", "tables": {name: table dict}, "roles": [...], "relationships": [...]}
+
+Table dicts keep the Tabular Editor JSON shape; expressions stored as lists of lines
+are joined for measures/columns/role filters, and partition source expressions are
+always lists of lines.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from analyzer_logging import get_logger
+from analyzer_profiler import record_file_read, record_json_parse
+from model_text import expression_lines, expression_text, sniff_encoding
+
+logger = get_logger("bim_reader")
+
+BIM_EXTENSION = ".bim"
+READ_CHUNK_CHARS = 1 << 20
+
+# model member -> event kind
+MODEL_COLLECTIONS = {"tables": "table", "relationships": "relationship", "roles": "role"}
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_STRING_LITERAL_PATTERN = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_STRING_LITERAL = re.compile(_STRING_LITERAL_PATTERN, re.DOTALL)
+_OUTSIDE_STRINGS = re.compile(rf'(?:[^"]+|{_STRING_LITERAL_PATTERN})*', re.DOTALL)
+_STRING_OR_BRACKET = re.compile(rf'{_STRING_LITERAL_PATTERN}|[\[\]{{}}]', re.DOTALL)
+_NOT_BRACKET = re.compile(r"[^\[\]{}]+")
+_BRACKET_PAIR = re.compile(r"(?:\{\}|\[\])+")
+_VALUE_DELIMITERS = " \t\r\n,]}"
+
+_model_cache: Dict[str, Tuple[tuple, Dict]] = {}
+_model_cache_lock = threading.Lock()
+
+
+# ===========================
+# 🔎 STREAMING SCANNER
+# ===========================
+
+class JsonStreamScanner:
+    """Pull scanner over a text stream: walks objects/arrays, decodes or skips single values."""
+
+    def __init__(self, stream: TextIO, chunk_chars: int = READ_CHUNK_CHARS):
+        self._stream = stream
+        self._chunk_chars = chunk_chars
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, min_chars: int = 0) -> bool:
+        """Drops the consumed text and appends the next chunk; False at end of stream."""
+        if self._eof:
+            return False
+        data = self._stream.read(max(self._chunk_chars, min_chars))
+        if not data:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"{message} near: {self._buffer[self._pos:self._pos + 40]!r}")
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it; '' at end of stream."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self._error(f"Expected '{char}'")
+        self._pos += 1
+
+    def value(self):
+        """Decodes the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number cut by the end of the buffer ("1.", "1e") decodes as its prefix: only a
+                # delimiter after it proves it complete
+                if self._eof or (end < len(self._buffer) and (isinstance(value, (str, dict, list)) or self._buffer[end] in _VALUE_DELIMITERS)):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # Read at least as much as is pending, so re-decoding a large value stays linear overall
+            self._fill(len(self._buffer) - self._pos)
+
+    def skip(self):
+        """
+        Consumes the next value without decoding it. Containers are skipped a buffer at a time:
+        with the strings and matched bracket pairs removed, what is left of the buffer tells
+        whether the value ends in it; only the buffer where it does is walked token by token.
+        """
+        if self.peek() not in "{[":
+            self.value()
+            return
+        self._pos += 1
+        depth = 1
+        while True:
+            # Stop before a string cut by the end of the buffer
+            safe_end = _OUTSIDE_STRINGS.match(self._buffer, self._pos).end()
+            brackets = _NOT_BRACKET.sub("", _STRING_LITERAL.sub("", self._buffer[self._pos:safe_end]))
+            unmatched = _collapse_bracket_pairs(brackets)
+            closes = len(unmatched) - len(unmatched.lstrip("]}"))
+            if closes >= depth:
+                break
+            depth += len(unmatched) - 2 * closes
+            self._pos = safe_end
+            if not self._fill():
+                raise self._error("Unexpected end of JSON")
+
+        for match in _STRING_OR_BRACKET.finditer(self._buffer, self._pos, safe_end):
+            char = match.group()
+            if char in "[{":
+                depth += 1
+            elif char in "]}":
+                depth -= 1
+                if depth == 0:
+                    self._pos = match.end()
+                    return
+
+    def iter_object(self) -> Iterator[str]:
+        """Yields each key of the next object; the caller must consume the key's value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self._error("Expected ',' or '}'")
+
+    def iter_array(self) -> Iterator[None]:
+        """Yields once per element of the next array; the caller must consume each element."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise self._error("Expected ',' or ']'")
+
+
+def _collapse_bracket_pairs(brackets: str) -> str:
+    """Removes matched pairs: what remains is the unmatched closers followed by the unmatched openers."""
+    while True:
+        collapsed = _BRACKET_PAIR.sub("", brackets)
+        if len(collapsed) == len(brackets):
+            return collapsed
+        brackets = collapsed
+
+
+def iter_model_objects(stream: TextIO, chunk_chars: int = READ_CHUNK_CHARS) -> Iterator[Tuple[str, Dict]]:
+    """("table" | "relationship" | "role", dict) for a model.bim / DataModelSchema text stream, in file order."""
+    scanner = JsonStreamScanner(stream, chunk_chars)
+    yield from _iter_model_members(scanner, nested=False)
+
+
+def _iter_model_members(scanner: JsonStreamScanner, nested: bool) -> Iterator[Tuple[str, Dict]]:
+    for key in scanner.iter_object():
+        kind = MODEL_COLLECTIONS.get(key)
+        if kind and scanner.peek() == "[":
+            for _ in scanner.iter_array():
+                item = scanner.value()
+                if isinstance(item, dict):
+                    yield kind, item
+        elif key == "model" and not nested and scanner.peek() == "{":
+            yield from _iter_model_members(scanner, nested=True)
+        else:
+            scanner.skip()
+
+
+# ===========================
+# 🔁 MODEL OBJECTS -> ANALYZER STRUCTURES
+# ===========================
+
+def table_from_schema(table: Dict) -> Dict:
+    table = dict(table)
+    columns = []
+    for column in table.get("columns", []):
+        if "expression" in column:
+            column = dict(column, expression=expression_text(column["expression"]))
+        columns.append(column)
+    table["columns"] = columns
+    table["measures"] = [dict(measure, expression=expression_text(measure.get("expression"))) for measure in table.get("measures", [])]
+
+    partitions = []
+    for partition in table.get("partitions", []):
+        source = partition.get("source")
+        if isinstance(source, dict):
+            partition = dict(partition, source=dict(source, expression=expression_lines(source.get("expression"))))
+        partitions.append(partition)
+    table["partitions"] = partitions
+    return table
+
+
+def role_from_schema(role: Dict) -> Dict:
+    permissions = [
+        dict(permission, filterExpression=expression_text(permission.get("filterExpression")))
+        for permission in role.get("tablePermissions", [])
+    ]
+    return dict(role, tablePermissions=permissions)
+
+
+def snapshot_from_objects(objects: Iterable[Tuple[str, Dict]], source_path: str, source_format: str) -> Dict:
+    snapshot = {"source_path": source_path, "format": source_format, "tables": OrderedDict(), "roles": [], "relationships": []}
+    for kind, item in objects:
+        if kind == "table" and item.get("name"):
+            snapshot["tables"][item["name"]] = table_from_schema(item)
+        elif kind == "role":
+            snapshot["roles"].append(role_from_schema(item))
+        elif kind == "relationship" and all(k in item for k in ("fromTable", "fromColumn", "toTable", "toColumn")):
+            snapshot["relationships"].append(item)
+    record_json_parse()
+    return snapshot
+
+
+# ===========================
+# 🚀 ENTRY POINT
+# ===========================
+
+def find_bim_file(model_path: str) -> Optional[str]:
+    """model_path itself when it is a .bim file, or the single .bim in a folder that is not a Tabular Editor export."""
+    if not model_path:
+        return None
+    if os.path.isfile(model_path):
+        return model_path if model_path.lower().endswith(BIM_EXTENSION) else None
+    if not os.path.isdir(model_path) or os.path.isdir(os.path.join(model_path, "tables")):
+        return None
+    try:
+        candidates = sorted(entry.path for entry in os.scandir(model_path) if entry.is_file() and entry.name.lower().endswith(BIM_EXTENSION))
+    except OSError:
+        return None
+    if len(candidates) == 1:
+        return candidates[0]
+    preferred = [path for path in candidates if os.path.basename(path).lower() == "model.bim"]
+    return preferred[0] if preferred else None
+
+
+def load_bim_model(model_path: str) -> Optional[Dict]:
+    """Snapshot of a model.bim (streamed), or None when model_path is not one. Cached until the file changes."""
+    bim_path = find_bim_file(model_path)
+    if bim_path is None:
+        return None
+
+    stat = os.stat(bim_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(bim_path)
+    with _model_cache_lock:
+        cached = _model_cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    with open(bim_path, "rb") as f:
+        encoding = sniff_encoding(f.read(4))
+    try:
+        with open(bim_path, "r", encoding=encoding) as f:
+            snapshot = snapshot_from_objects(iter_model_objects(f), bim_path, "bim")
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read the model from '{os.path.basename(bim_path)}': {e}") from e
+    record_file_read(stat.st_size)
+
+    logger.debug("BIM model %s: %d tables, %d roles, %d relationships.",
+                 bim_path, len(snapshot["tables"]), len(snapshot["roles"]), len(snapshot["relationships"]))
+    with _model_cache_lock:
+        _model_cache[key] = (signature, snapshot)
+    return snapshot
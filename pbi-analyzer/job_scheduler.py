@@ -0,0 +1,107 @@
+# job_scheduler.py
+
+"""
+Small job queue for the UI, on top of QThreadPool.
+
+A job is a worker object with a run() method (and optionally cancel()) whose
+signals report progress and results; the scheduler only decides where and when
+run() executes. Jobs with different ids run concurrently on the pool; submitting
+a job whose id is already running queues it behind the running one.
+
+The worker object stays in the GUI thread, so its signals are delivered there
+(queued) even though run() executes on a pool thread.
+"""
+
+from collections import deque
+from typing import Dict, List
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from analyzer_logging import get_logger
+
+logger = get_logger("job_scheduler")
+
+# Reporting analysis, MARTS analysis and a couple of audits at the same time
+DEFAULT_MAX_JOBS = 4
+
+
+class _JobRunnable(QRunnable):
+    def __init__(self, job_id: str, worker, done_signal):
+        super().__init__()
+        self._job_id = job_id
+        self._worker = worker
+        self._done_signal = done_signal
+
+    def run(self):
+        try:
+            self._worker.run()
+        except Exception as e:
+            # Workers report their own errors; this only guards the pool thread
+            logger.error(f"❌ Job '{self._job_id}' crashed: {e}", exc_info=True)
+        finally:
+            self._done_signal.emit(self._job_id)
+
+
+class JobScheduler(QObject):
+    job_started = pyqtSignal(str)
+    job_done = pyqtSignal(str)
+
+    # Emitted from the pool thread; handled in the scheduler's (GUI) thread
+    _runnable_done = pyqtSignal(str)
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_jobs)
+        self._running: Dict[str, object] = {}
+        self._queued: Dict[str, deque] = {}
+        self._runnable_done.connect(self._on_runnable_done)
+
+    def submit(self, job_id: str, worker) -> bool:
+        """Starts the worker now (True) or queues it behind the running job with the same id (False)."""
+        if job_id in self._running:
+            self._queued.setdefault(job_id, deque()).append(worker)
+            logger.debug("Job '%s' is already running; queued (%d waiting).", job_id, len(self._queued[job_id]))
+            return False
+        self._start(job_id, worker)
+        return True
+
+    def is_running(self, job_id: str) -> bool:
+        return job_id in self._running
+
+    def running_jobs(self) -> List[str]:
+        return list(self._running)
+
+    def worker(self, job_id: str):
+        return self._running.get(job_id)
+
+    def cancel(self, job_id: str):
+        """Drops queued jobs with this id and asks the running one to stop (if it supports cancel())."""
+        self._queued.pop(job_id, None)
+        worker = self._running.get(job_id)
+        if worker is not None and hasattr(worker, "cancel"):
+            worker.cancel()
+
+    def shutdown(self, timeout_ms: int = 5000) -> bool:
+        """Cancels everything and waits for the pool; True if all jobs stopped in time."""
+        for job_id in list(self._running):
+            self.cancel(job_id)
+        self._queued.clear()
+        return self._pool.waitForDone(timeout_ms)
+
+    def _start(self, job_id: str, worker):
+        self._running[job_id] = worker
+        self._pool.start(_JobRunnable(job_id, worker, self._runnable_done))
+        logger.debug("Job '%s' started (%d running).", job_id, len(self._running))
+        self.job_started.emit(job_id)
+
+    def _on_runnable_done(self, job_id: str):
+        self._running.pop(job_id, None)
+        self.job_done.emit(job_id)
+
+        waiting = self._queued.get(job_id)
+        if waiting:
+            next_worker = waiting.popleft()
+            if not waiting:
+                del self._queued[job_id]
+            self._start(job_id, next_worker)
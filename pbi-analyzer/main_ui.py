@@ -2,40 +2,62 @@
 
 import sys
 import os
+import logging
+import threading
 from PyQt6.QtWidgets import (
-    QApplication, QFileDialog, QTableWidgetItem, QWidget, QHBoxLayout, 
-    QCheckBox, QMessageBox, QFrame, QLabel, QTableWidget
+    QApplication, QFileDialog, QInputDialog, QWidget, QMessageBox, QLabel, QTableView
 )
-from PyQt6.QtCore import QThread, QObject, pyqtSignal, Qt, QSettings, QPropertyAnimation, QRect
-from PyQt6.QtGui import QBrush, QColor
+from PyQt6.QtCore import QObject, pyqtSignal, Qt, QSettings, QPropertyAnimation, QRect, QTimer
 
 from ui_components import MainWindow
-import analyzer_cli
-
 import analyzer_cli
 from analyzer_cli import FIELDS_TO_EXCLUDE_FROM_MARTS_ANALYSIS
+from analyzer_logging import get_logger, get_log_messages
+from analyzer_profiler import format_profile_table, export_profile_json
+from job_scheduler import JobScheduler
+from tmdl_reader import is_tmdl_model
+from bim_reader import find_bim_file
+
+logger = get_logger("main_ui")
+
+# Delay between the last keystroke in a filter box and re-filtering the table
+FILTER_DEBOUNCE_MS = 150
+
+# Job ids for the scheduler. There is one MARTS path (derived from the dbt path), so audits share
+# one id: a second audit queues behind the running one
+REPORTING_JOB = "reporting"
+MARTS_JOB = "marts"
+MARTS_AUDIT_JOB = "marts_audit"
 
 
 class MartsAnalysisWorker(QObject):
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
+    cancelled = pyqtSignal()
 
     def __init__(self, reporting_path, tabular_path, fields_to_analyze):
         super().__init__()
         self.reporting_path = reporting_path
         self.tabular_path = tabular_path
         self.fields_to_analyze = fields_to_analyze
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
 
     def run(self):
         try:
-            results = analyzer_cli.analyze_marts_optimization(
-                self.reporting_path, 
-                self.tabular_path, 
-                self.fields_to_analyze,
-                progress_callback=self.progress.emit
-            )
+            with analyzer_cli.cancellation_scope(self._cancel_event):
+                results = analyzer_cli.analyze_marts_optimization(
+                    self.reporting_path, 
+                    self.tabular_path, 
+                    self.fields_to_analyze,
+                    progress_callback=self.progress.emit
+                )
             self.finished.emit(results)
+        except analyzer_cli.AnalysisCancelled:
+            self.cancelled.emit()
         except Exception as e:
             self.error.emit(f"An error occurred during MARTS analysis: {e}")
 
@@ -43,54 +65,91 @@ class MartsAuditWorker(QObject):
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
+    cancelled = pyqtSignal()
 
     def __init__(self, marts_path, reporting_path, fields_to_analyze):
         super().__init__()
         self.marts_path = marts_path
         self.reporting_path = reporting_path
         self.fields_to_analyze = fields_to_analyze
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
 
     def run(self):
-        print("[DEBUG] 5. MartsAuditWorker.run() started in a new thread.")
+        logger.debug("5. MartsAuditWorker.run() started on a pool thread.")
         try:
-            print("[DEBUG] 6. Calling analyzer_cli.analyze_marts_audit...")
-            results = analyzer_cli.analyze_marts_audit(
-                self.marts_path, 
-                self.reporting_path, 
-                self.fields_to_analyze,
-                progress_callback=self.progress.emit
-            )
-            print(f"[DEBUG] 8. Analysis finished. Emitting 'finished' signal with {len(results.get('can_comment_in_marts', []))} optimizable fields.")
+            logger.debug("6. Calling analyzer_cli.analyze_marts_audit...")
+            with analyzer_cli.cancellation_scope(self._cancel_event):
+                results = analyzer_cli.analyze_marts_audit(
+                    self.marts_path, 
+                    self.reporting_path, 
+                    self.fields_to_analyze,
+                    progress_callback=self.progress.emit
+                )
+            logger.debug("8. Analysis finished. Emitting 'finished' signal with %d optimizable fields.", len(results.get('can_comment_in_marts', [])))
             self.finished.emit(results)
+        except analyzer_cli.AnalysisCancelled:
+            self.cancelled.emit()
         except Exception as e:
-            print(f"[DEBUG] ERROR! An exception occurred in worker: {e}")
+            logger.error(f"ERROR! An exception occurred in worker: {e}", exc_info=True)
             self.error.emit(f"An error occurred during MARTS AUDIT analysis: {e}")
 
 class AnalysisWorker(QObject):
     finished = pyqtSignal(list, dict)
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
+    stage_changed = pyqtSignal(str)
+    columns_ready = pyqtSignal(list)
+    usage_found = pyqtSignal(dict)
+    cancelled = pyqtSignal()
     
     def __init__(self, pbix_paths, tabular_path, dbt_path):
         super().__init__()
         self.pbix_paths = pbix_paths  
         self.tabular_path = tabular_path
         self.dbt_path = dbt_path
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        # Called from the GUI thread; the analysis stops at its next checkpoint
+        self._cancel_event.set()
 
     def run(self):
+        events = analyzer_cli.iter_analysis(
+            self.pbix_paths, self.tabular_path, self.dbt_path, cancel_event=self._cancel_event
+        )
         try:
-            ui_results, intermediate_data = analyzer_cli.perform_analysis(
-                self.pbix_paths, self.tabular_path, self.dbt_path, progress_callback=self.progress.emit 
-            )
-            self.finished.emit(ui_results, intermediate_data)
+            for event in events:
+                if "progress" in event:
+                    self.progress.emit(event["progress"])
+
+                kind = event["event"]
+                if kind == "stage":
+                    self.stage_changed.emit(event["stage"])
+                elif kind == "columns":
+                    self.columns_ready.emit(event["rows"])
+                elif kind == "pbix":
+                    self.stage_changed.emit(f"PBIX {event['index']}/{event['total']}: {event['file']}")
+                    if event["usage"]:
+                        self.usage_found.emit(event["usage"])
+                elif kind == "done":
+                    self.finished.emit(event["results"], event["intermediate_data"])
+        except analyzer_cli.AnalysisCancelled:
+            logger.info("⏹ Analysis cancelled.")
+            self.cancelled.emit()
         except Exception as e:
             self.error.emit(f"An error occurred during analysis: {e}")
+        finally:
+            events.close()
 
 class AppController:
     def __init__(self, view: MainWindow):
         self.view = view
-        self.thread = None
-        self.worker = None
+        self.jobs = JobScheduler(parent=self.view)
+        self.jobs.job_started.connect(self._update_jobs_label)
+        self.jobs.job_done.connect(self._update_jobs_label)
         self.intermediate_data = None
         
         self.marts_tab_results = None     
@@ -107,44 +166,17 @@ class AppController:
         self._load_settings()
         self.view.adjustSize()
 
-    def _filter_table(self, table: QTableWidget, column_indices: list, filter_text: str):
-        filter_lower = filter_text.lower()
-        
-        for row in range(table.rowCount()):
-            is_separator = isinstance(table.cellWidget(row, 0), QFrame)
-            if is_separator:
-                continue
-            
-            match = False
-            if not filter_lower:
-                match = True
-            else:
-                for col_index in column_indices:
-                    item = table.item(row, col_index)
-                    if item and filter_lower in item.text().lower():
-                        match = True
-                        break 
-            
-            table.setRowHidden(row, not match)
-
-        for row in range(table.rowCount()):
-            is_separator = isinstance(table.cellWidget(row, 0), QFrame)
-            if not is_separator:
-                continue
-
-            group_has_visible_rows = False
+    def _filter_table(self, table: QTableView, column_indices: list, filter_text: str):
+        table.model().set_filter(column_indices, filter_text)
 
-            for next_row in range(row + 1, table.rowCount()):
-                is_next_row_separator = isinstance(table.cellWidget(next_row, 0), QFrame)
-                if is_next_row_separator:
-                    break 
+    def _connect_filter_input(self, filter_input, table: QTableView, column_indices: list):
+        # Debounced: the filter runs once typing pauses, not on every keystroke
+        timer = QTimer(self.view)
+        timer.setSingleShot(True)
+        timer.setInterval(FILTER_DEBOUNCE_MS)
+        timer.timeout.connect(lambda: self._filter_table(table, column_indices, filter_input.text()))
+        filter_input.textChanged.connect(lambda _text: timer.start())
 
-                if not table.isRowHidden(next_row):
-                    group_has_visible_rows = True
-                    break
-            
-            table.setRowHidden(row, not group_has_visible_rows)
-                    
     def _on_marts_analysis_finished(self, marts_results):
         self.marts_tab_results = marts_results 
         self._update_marts_table_with_results(self.marts_tab_results)
@@ -166,41 +198,13 @@ class AppController:
         
         self._prepare_marts_audit_tab()
 
-    def _on_marts_checkbox_changed(self, row: int, state: int, target_table: QTableWidget):
-        try:
-            is_optimizable_item = target_table.item(row, 3)
-            if not is_optimizable_item:
-                return
-                
-            was_originally_optimizable = is_optimizable_item.text() == "✅"
 
-            if was_originally_optimizable and state == Qt.CheckState.Unchecked.value:
-                background_brush = QBrush(QColor(0, 150, 0, 80))  
-            else:
-                background_brush = QBrush()
-
-            for col in range(target_table.columnCount()):
-                item = target_table.item(row, col)
-                original_background = is_optimizable_item.background() if is_optimizable_item.text() != "✅" else QBrush()
-                
-                if item:
-                    final_brush = background_brush if background_brush != QBrush() else original_background
-                    item.setBackground(final_brush)
-                        
-        except Exception as e:
-            print(f"Error changing MARTS row color: {e}")
 
     def _run_marts_audit_analysis(self):
-        print("\n[DEBUG] 1. _run_marts_audit_analysis triggered.") 
-        fields_to_analyze = []
-        for row in range(self.view.marts_audit_table.rowCount()):
-            if not self.view.marts_audit_table.cellWidget(row, 0):
-                continue
-            field_item = self.view.marts_audit_table.item(row, 1)
-            if field_item:
-                fields_to_analyze.append(field_item.text())
-        
-        print(f"[DEBUG] 2. Fields to analyze: {len(fields_to_analyze)}")
+        logger.debug("1. _run_marts_audit_analysis triggered.")
+        fields_to_analyze = [record["field"] for record in self.view.marts_audit_model.records()]
+        
+        logger.debug("2. Fields to analyze: %d", len(fields_to_analyze))
         if not fields_to_analyze:
             QMessageBox.warning(self.view, "Warning", "No fields to analyze in MARTS AUDIT tab")
             return
@@ -213,25 +217,23 @@ class AppController:
         reporting_path = self.view.dbt_path_input.text()
         marts_path = analyzer_cli.get_marts_path_from_reporting(reporting_path)
         
-        print("[DEBUG] 3. Creating MartsAuditWorker.")
-        self.thread = QThread()
-        self.worker = MartsAuditWorker(marts_path, reporting_path, fields_to_analyze)
-        self.worker.moveToThread(self.thread)
-        
-        self.worker.progress.connect(self.view.marts_audit_progress_bar.setValue)
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self._on_marts_audit_analysis_finished)
-        self.worker.error.connect(self._on_marts_analysis_error)
-        
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self._clear_thread_references)
-        
-        print("[DEBUG] 4. Starting thread.")
-        self.thread.start()
+        logger.debug("3. Creating MartsAuditWorker.")
+        worker = MartsAuditWorker(marts_path, reporting_path, fields_to_analyze)
+        worker.progress.connect(self.view.marts_audit_progress_bar.setValue)
+        worker.finished.connect(lambda results, path=marts_path: self._on_marts_audit_analysis_finished(results, path))
+        worker.error.connect(self._on_marts_audit_analysis_error)
+        worker.cancelled.connect(self._on_marts_audit_analysis_cancelled)
+        
+        logger.debug("4. Submitting audit job.")
+        self.jobs.submit(MARTS_AUDIT_JOB, worker)
+
+    def _on_marts_audit_analysis_finished(self, marts_results, marts_path=None):
+        current_marts_path = analyzer_cli.get_marts_path_from_reporting(self.view.dbt_path_input.text())
+        if marts_path and marts_path != current_marts_path:
+            # The dbt path changed while the audit ran; its rows are gone from the tab
+            logger.info(f"⤴ Ignoring audit results for '{marts_path}' (current MARTS path: '{current_marts_path}').")
+            return
 
-    def _on_marts_audit_analysis_finished(self, marts_results):
         self.marts_audit_tab_results = marts_results 
         
         self._update_marts_table_with_results(self.marts_audit_tab_results, target_table=self.view.marts_audit_table)
@@ -256,17 +258,7 @@ class AppController:
             QMessageBox.warning(self.view, "Warning", "Please run MARTS audit analysis first.")
             return
         
-        fields_to_comment = []
-        for row in range(self.view.marts_audit_table.rowCount()):
-            if not self.view.marts_audit_table.cellWidget(row, 0):
-                continue
-            checkbox_widget = self.view.marts_audit_table.cellWidget(row, 0)
-            if checkbox_widget:
-                checkbox = checkbox_widget.findChild(QCheckBox)
-                if checkbox and checkbox.isChecked() and checkbox.isEnabled():
-                    field_item = self.view.marts_audit_table.item(row, 1)
-                    if field_item:
-                        fields_to_comment.append(field_item.text())
+        fields_to_comment = [record["field"] for record in self.view.marts_audit_model.checked_records()]
         
         if not fields_to_comment:
             QMessageBox.information(self.view, "Info", "No fields selected for commenting in MARTS audit.")
@@ -325,35 +317,53 @@ class AppController:
         self.view.run_marts_analysis_btn.setEnabled(True)
         self.view.statusBar().showMessage("MARTS analysis failed.")
 
+    def _on_marts_audit_analysis_error(self, error_msg):
+        self.view.marts_audit_progress_bar.hide()
+        QMessageBox.critical(self.view, "MARTS Audit Error", error_msg)
+        self.view.run_marts_audit_analysis_btn.setEnabled(True)
+        self.view.statusBar().showMessage("MARTS audit failed.")
+
+    def _on_marts_analysis_cancelled(self):
+        self.view.marts_progress_bar.hide()
+        self.view.run_marts_analysis_btn.setEnabled(bool(self.view.marts_model.records()))
+
+    def _on_marts_audit_analysis_cancelled(self):
+        self.view.marts_audit_progress_bar.hide()
+        self.view.run_marts_audit_analysis_btn.setEnabled(bool(self.view.marts_audit_model.records()))
+
+    def _update_jobs_label(self, *_):
+        running = self.jobs.running_jobs()
+        self.view.jobs_label.setText(f"⚙️ {len(running)} job(s) running" if running else "")
+
     def _connect_signals(self):
         self.view.pbix_browse_btn.clicked.connect(self._browse_pbix_file)
         self.view.tabular_browse_btn.clicked.connect(self._browse_tabular_folder)
+        self.view.tabular_file_btn.clicked.connect(self._browse_tabular_file)
         self.view.dbt_browse_btn.clicked.connect(self._browse_dbt_folder)
         self.view.run_analysis_btn.clicked.connect(self._run_analysis)
 
         QApplication.instance().aboutToQuit.connect(self._save_settings)
+        QApplication.instance().aboutToQuit.connect(self.jobs.shutdown)
         self.view.show_full_summary_btn.clicked.connect(self._show_full_optimization_summary)
 
+        self.view.cancel_analysis_btn.clicked.connect(self._cancel_analysis)
         self.view.apply_changes_btn.clicked.connect(self._apply_changes)
         self.view.show_summary_btn.clicked.connect(self._show_analysis_summary)
+        self.view.show_profile_btn.clicked.connect(self._show_performance_profile)
+        self.view.show_log_btn.clicked.connect(self._show_analysis_log)
+        self.view.export_results_btn.clicked.connect(self._export_results)
         self.view.enable_live_mode_checkbox.stateChanged.connect(self._toggle_apply_button)
-        self.view.reporting_filter_input.textChanged.connect(
-            lambda text: self._filter_table(self.view.results_table, [1], text) 
-        )
+        self._connect_filter_input(self.view.reporting_filter_input, self.view.results_table, [1])
 
         self.view.run_marts_analysis_btn.clicked.connect(self._run_marts_analysis)
         self.view.apply_marts_changes_btn.clicked.connect(self._apply_marts_changes)
-        self.view.marts_filter_input.textChanged.connect(
-            lambda text: self._filter_table(self.view.marts_table, [2], text) 
-        )
+        self._connect_filter_input(self.view.marts_filter_input, self.view.marts_table, [2])
 
         self.view.run_marts_audit_analysis_btn.clicked.connect(self._run_marts_audit_analysis)
         self.view.apply_marts_audit_changes_btn.clicked.connect(self._apply_marts_audit_changes)
-        self.view.marts_audit_filter_input.textChanged.connect(
-            lambda text: self._filter_table(self.view.marts_audit_table, [2], text) 
-        )
+        self._connect_filter_input(self.view.marts_audit_filter_input, self.view.marts_audit_table, [2])
         
-        print("[DEBUG] All signals connected successfully, including MARTS AUDIT and corrected table filters.")
+        logger.debug("All signals connected successfully, including MARTS AUDIT and corrected table filters.")
         
 
     def _clear_widget_focus(self):
@@ -383,19 +393,20 @@ class AppController:
             self.view.tabs.hide()
 
         self.view.progress_bar.hide()
+        self.view.cancel_analysis_btn.hide()
         self.view.statusBar().showMessage("Paths have changed. Please run analysis again.")
         self.view.enable_live_mode_checkbox.setEnabled(False)
         self.view.enable_live_mode_checkbox.setChecked(False)
         self.view.show_summary_btn.setEnabled(False)
+        self.view.show_profile_btn.setEnabled(False)
+        self.view.export_results_btn.setEnabled(False)
 
-        self.view.marts_table.clearContents()
-        self.view.marts_table.setRowCount(0)
+        self.view.marts_model.clear()
         self.view.run_marts_analysis_btn.setEnabled(False)
         self.view.apply_marts_changes_btn.setEnabled(False)
         self.marts_tab_results = None 
 
-        self.view.marts_audit_table.clearContents()
-        self.view.marts_audit_table.setRowCount(0)
+        self.view.marts_audit_model.clear()
         self.view.run_marts_audit_analysis_btn.setEnabled(False)
         self.view.apply_marts_audit_changes_btn.setEnabled(False)
         self.view.show_full_summary_btn.hide()
@@ -413,89 +424,26 @@ class AppController:
         Gathers, FILTERS, SORTS, and populates the third tab.
         Uses a COMPLETE list of technical fields for exclusion.
         """
-        print("Preparing MARTS AUDIT tab...")
+        logger.info("Preparing MARTS AUDIT tab...")
         
         marts_path = analyzer_cli.get_marts_path_from_reporting(self.view.dbt_path_input.text())
         if not marts_path:
             self.view.marts_audit_info_label.setText("❌ Could not determine MARTS path. Cannot proceed with audit.")
             return
             
-        all_marts_fields = analyzer_cli.get_all_fields_from_dbt_path_for_audit(marts_path)
-        
-        reporting_column_names_to_exclude = set()
-        for row in range(self.view.results_table.rowCount()):
-            if not self.view.results_table.item(row, 2):
-                continue
-            column_item = self.view.results_table.item(row, 2)
-            if column_item:
-                reporting_column_names_to_exclude.add(column_item.text())
-
-        print(f"Excluding {len(reporting_column_names_to_exclude)} fields from initial analysis.")
-        
-        candidate_fields = []
-        
-        fields_to_exclude_technical = {'elt_dmr', 'elt_dmr_core', 'elt_dmr_marts', 'tableindicator'}
-        technical_suffixes = ['id', 'bk', 'key']
-        marts_excluded_lower = {f.lower() for f in FIELDS_TO_EXCLUDE_FROM_MARTS_ANALYSIS}
-
-        for field_data in all_marts_fields:
-            field_name = field_data['field']
-            field_name_lower = field_name.lower()
-
-            if (field_name_lower in fields_to_exclude_technical or
-                field_name_lower in marts_excluded_lower or
-                field_name in reporting_column_names_to_exclude or
-                "partition" in field_name_lower or
-                any(field_name_lower.endswith(s) for s in technical_suffixes)):
-                continue
-            
-            candidate_fields.append(field_data)
-            
-        print(f"Found {len(candidate_fields)} candidate fields for the audit after filtering.")
+        reporting_column_names_to_exclude = {record["column"] for record in self.view.results_model.records()}
 
-        candidate_fields.sort(key=lambda x: (x['source_model'], x['field']))
-        
-        self.view.marts_audit_table.clearContents()
-        self.view.marts_audit_table.setRowCount(0)
+        candidate_fields = analyzer_cli.collect_marts_audit_candidates(marts_path, reporting_column_names_to_exclude)
         
-        last_model_name = None
-        current_row = 0
-        for field_data in candidate_fields:
-            current_model_name = field_data['source_model']
-            
-            if last_model_name is not None and current_model_name != last_model_name:
-                self.view.marts_audit_table.insertRow(current_row)
-                separator = QFrame()
-                separator.setFrameShape(QFrame.Shape.HLine)
-                separator.setFrameShadow(QFrame.Shadow.Sunken)
-                self.view.marts_audit_table.setCellWidget(current_row, 0, separator)
-                self.view.marts_audit_table.setSpan(current_row, 0, 1, self.view.marts_audit_table.columnCount())
-                current_row += 1
-
-            self.view.marts_audit_table.insertRow(current_row)
-            
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox = QCheckBox()
-            checkbox.setChecked(True)
-            checkbox.stateChanged.connect(
-                lambda state, r=current_row: self._on_marts_checkbox_changed(r, state, self.view.marts_audit_table)
-            )
-            
-            checkbox_layout.addWidget(checkbox)
-            checkbox_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            checkbox_layout.setContentsMargins(0,0,0,0)
-            self.view.marts_audit_table.setCellWidget(current_row, 0, checkbox_widget)
-
-            full_name = f"{field_data['source_model']}.{field_data['field']}"
-            self.view.marts_audit_table.setItem(current_row, 1, QTableWidgetItem(full_name))
-            self.view.marts_audit_table.setItem(current_row, 2, QTableWidgetItem(field_data['source_model']))
-            self.view.marts_audit_table.setItem(current_row, 3, QTableWidgetItem("Pending..."))
-            self.view.marts_audit_table.setItem(current_row, 4, QTableWidgetItem(""))
-            self.view.marts_audit_table.setItem(current_row, 5, QTableWidgetItem(""))
-
-            last_model_name = current_model_name
-            current_row += 1
+        self.view.marts_audit_model.set_records([
+            {
+                "field": f"{field_data['source_model']}.{field_data['field']}",
+                "source_model": field_data['source_model'],
+                "can_comment": None,
+                "checked": True,
+            }
+            for field_data in candidate_fields
+        ])
 
         self.view.marts_audit_info_label.setText(f"📋 Found {len(candidate_fields)} fields for internal audit. Ready to run analysis.")
         self.view.run_marts_audit_analysis_btn.setEnabled(len(candidate_fields) > 0)
@@ -517,12 +465,12 @@ class AppController:
                 if os.path.exists(path):
                     self.pbix_paths.append(path)
                 else:
-                    print(f"⚠️ Skipped non-existent file: {os.path.basename(path)}")
+                    logger.warning(f"⚠️ Skipped non-existent file: {os.path.basename(path)}")
         else:
             old_pbix_path = settings.value("paths/pbix", "")
             if old_pbix_path and os.path.exists(old_pbix_path):
                 self.pbix_paths = [old_pbix_path]
-                print(f"📋 Migrated old PBIX path: {os.path.basename(old_pbix_path)}")
+                logger.info(f"📋 Migrated old PBIX path: {os.path.basename(old_pbix_path)}")
                 settings.setValue("paths/pbix_list", self.pbix_paths)
                 settings.remove("paths/pbix")
         
@@ -534,11 +482,11 @@ class AppController:
         self._check_paths_and_enable_button()
         
         if self.pbix_paths:
-            print(f"📁 Loaded {len(self.pbix_paths)} PBIX file(s) from settings:")
+            logger.info(f"📁 Loaded {len(self.pbix_paths)} PBIX file(s) from settings:")
             for i, path in enumerate(self.pbix_paths, 1):
-                print(f"   {i}. {os.path.basename(path)}")
+                logger.info(f"   {i}. {os.path.basename(path)}")
         else:
-            print("📁 No valid PBIX files in settings")
+            logger.info("📁 No valid PBIX files in settings")
 
     def _check_paths_and_enable_button(self):
         all_paths_set = all([
@@ -574,7 +522,7 @@ class AppController:
             self._check_paths_and_enable_button()
             self._reset_to_input_state()
             
-            print(f"📁 Selected {len(self.pbix_paths)} PBIX file(s)")
+            logger.info(f"📁 Selected {len(self.pbix_paths)} PBIX file(s)")
 
     def _update_pbix_display(self):
         if not self.pbix_paths:
@@ -600,7 +548,7 @@ class AppController:
         path = QFileDialog.getExistingDirectory(self.view, "Select Tabular Model Folder", start_dir)
         if path:
             self.view.tabular_path_input.setText(path)
-            if "datasets" not in path.lower():
+            if "datasets" not in path.lower() and not is_tmdl_model(path) and not find_bim_file(path):
                 QMessageBox.warning(
                     self.view, 
                     "Check Tabular Path", 
@@ -609,6 +557,17 @@ class AppController:
             self._check_paths_and_enable_button()
             self._reset_to_input_state()
 
+    def _browse_tabular_file(self):
+        current = self.view.tabular_path_input.text()
+        start_dir = os.path.dirname(current) if os.path.isfile(current) else current
+        path, _ = QFileDialog.getOpenFileName(
+            self.view, "Select Model File", start_dir, "Power BI Templates (*.pbit);;Tabular Models (*.bim);;Power BI Files (*.pbix);;All Files (*)"
+        )
+        if path:
+            self.view.tabular_path_input.setText(path)
+            self._check_paths_and_enable_button()
+            self._reset_to_input_state()
+
     def _browse_dbt_folder(self):
         start_dir = self.view.dbt_path_input.text()
         path = QFileDialog.getExistingDirectory(self.view, "Select DBT Models Folder", start_dir)
@@ -624,20 +583,23 @@ class AppController:
             self._reset_to_input_state()
 
     def _run_analysis(self):
-        if self.thread is not None and self.thread.isRunning():
+        if self.jobs.is_running(REPORTING_JOB):
             return
         
-        print(f"🔍 DEBUG: self.pbix_paths = {self.pbix_paths}")
-        print(f"🔍 DEBUG: type = {type(self.pbix_paths)}")
-        print(f"🔍 DEBUG: length = {len(self.pbix_paths)}")
+        logger.debug("🔍 pbix_paths (%d): %s", len(self.pbix_paths), self.pbix_paths)
         
         if not self.pbix_paths:
             QMessageBox.warning(self.view, "No Files", "Please select PBIX files first.")
             return
         
         self.view.setMaximumHeight(16777215)
+        # A new REPORTING run replaces the rows the MARTS jobs would write their results into
+        for job_id in self.jobs.running_jobs():
+            self.jobs.cancel(job_id)
         self._reset_to_input_state()
         self.view.progress_bar.show()
+        self.view.cancel_analysis_btn.setEnabled(True)
+        self.view.cancel_analysis_btn.show()
         self.view.run_analysis_btn.setEnabled(False)
         self.view.statusBar().showMessage("Analysis in progress, please wait...")
         
@@ -645,27 +607,54 @@ class AppController:
         tabular_path = self.view.tabular_path_input.text()
         dbt_path = self.view.dbt_path_input.text()
         
-        self.thread = QThread()
-        self.worker = AnalysisWorker(pbix_paths, tabular_path, dbt_path)
-        self.worker.moveToThread(self.thread)
-        self.worker.progress.connect(self.view.progress_bar.setValue)
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self._on_analysis_finished)
-        self.worker.error.connect(self._on_analysis_error)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self._clear_thread_references)
-        
-        self.thread.start()
+        worker = AnalysisWorker(pbix_paths, tabular_path, dbt_path)
+        worker.progress.connect(self.view.progress_bar.setValue)
+        worker.stage_changed.connect(self._on_analysis_stage_changed)
+        worker.columns_ready.connect(self._on_analysis_columns_ready)
+        worker.usage_found.connect(self._on_analysis_usage_found)
+        worker.finished.connect(self._on_analysis_finished)
+        worker.error.connect(self._on_analysis_error)
+        worker.cancelled.connect(self._on_analysis_cancelled)
+        
+        self.jobs.submit(REPORTING_JOB, worker)
         self._clear_widget_focus()
-    
-    def _clear_thread_references(self):
-        self.thread = None
-        self.worker = None
+
+    def _cancel_analysis(self):
+        if not self.jobs.is_running(REPORTING_JOB):
+            return
+        self.jobs.cancel(REPORTING_JOB)
+        self.view.cancel_analysis_btn.setEnabled(False)
+        self.view.statusBar().showMessage("Cancelling analysis...")
+
+    def _on_analysis_stage_changed(self, stage: str):
+        self.view.statusBar().showMessage(f"Analysis in progress: {stage}")
+
+    def _on_analysis_columns_ready(self, rows: list):
+        # Partial results: every model column, updated as PBIX files are scanned
+        self._populate_table(rows)
+        self.view.tabs.show()
+        self.view.tabs.setCurrentIndex(0)
+
+    def _on_analysis_usage_found(self, usage: dict):
+        updates = {}
+        for field, flags in usage.items():
+            update = {key: True for key, value in flags.items() if value}
+            if update:
+                updates[field] = dict(update, is_used=True, checked=False)
+        self.view.results_model.update_records("field", updates)
+
+    def _on_analysis_cancelled(self):
+        self.view.progress_bar.hide()
+        self.view.cancel_analysis_btn.hide()
+        self.view.results_model.clear()
+        self.view.tabs.hide()
+        self.view.run_analysis_btn.setEnabled(True)
+        self.view.statusBar().showMessage("Analysis cancelled.")
+        self.view.adjustSize()
 
     def _on_analysis_finished(self, ui_results: list, intermediate_data: dict):
         self.view.progress_bar.hide()
+        self.view.cancel_analysis_btn.hide()
         self.intermediate_data = intermediate_data
         self._populate_table(ui_results)
 
@@ -676,13 +665,23 @@ class AppController:
         self.view.run_analysis_btn.setEnabled(True)
         self.view.enable_live_mode_checkbox.setEnabled(True)
         self.view.show_summary_btn.setEnabled(True)
+        self.view.show_profile_btn.setEnabled(bool(intermediate_data.get("profile")))
+        self.view.export_results_btn.setEnabled(True)
+        self._save_run_to_history(ui_results, intermediate_data)
 
         self._adjust_window_size(expanding=True)
 
-    def _transfer_to_marts_tab(self, commented_fields: list):
-        self.view.marts_table.clearContents()
-        self.view.marts_table.setRowCount(0)
+    def _save_run_to_history(self, ui_results: list, intermediate_data: dict):
+        """Keeps every finished analysis in the local results history (see 'analyzer_cli history')."""
+        import sqlite3
+        from results_store import ResultsStore
+        try:
+            with ResultsStore() as store:
+                store.record_run(ui_results, intermediate_data, self.pbix_paths)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"⚠️ Could not save the run to the results history: {e}")
 
+    def _transfer_to_marts_tab(self, commented_fields: list):
         fields_by_table = {}
         for field in commented_fields:
             if '.' in field:
@@ -694,55 +693,29 @@ class AppController:
         final_sorted_fields = []
         for table_name in sorted(fields_by_table.keys()):
             columns_to_sort = fields_by_table[table_name]
-            dbt_order = self._get_dbt_field_order_for_marts(table_name)
+            dbt_positions = self._get_dbt_column_positions(table_name)
             
-            if dbt_order:
-                dbt_order_lower = [col.lower() for col in dbt_order]
-                columns_to_sort.sort(key=lambda col: dbt_order_lower.index(col.lower()) if col.lower() in dbt_order_lower else 9999)
+            if dbt_positions:
+                positions_lower = {}
+                for column, position in dbt_positions.items():
+                    positions_lower.setdefault(column.lower(), position)
+                columns_to_sort.sort(key=lambda col: positions_lower.get(col.lower(), 9999))
             else:
                 columns_to_sort.sort()
             
             for col in columns_to_sort:
                 final_sorted_fields.append(f"{table_name}.{col}")
 
-        last_table_name = None
-        current_row = 0
-        for field in final_sorted_fields:
-            current_table_name = field.split('.', 1)[0]
-            
-            if last_table_name is not None and current_table_name != last_table_name:
-                self.view.marts_table.insertRow(current_row)
-                separator = QFrame()
-                separator.setFrameShape(QFrame.Shape.HLine)
-                separator.setFrameShadow(QFrame.Shadow.Sunken)
-                self.view.marts_table.setCellWidget(current_row, 0, separator)
-                self.view.marts_table.setSpan(current_row, 0, 1, self.view.marts_table.columnCount())
-                current_row += 1
-
-            self.view.marts_table.insertRow(current_row)
-            
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox = QCheckBox()
-            checkbox.setChecked(True)
-
-            checkbox.stateChanged.connect(
-                lambda state, r=current_row: self._on_marts_checkbox_changed(r, state, self.view.marts_table)
-            )
-            
-            checkbox_layout.addWidget(checkbox)
-            checkbox_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            checkbox_layout.setContentsMargins(0,0,0,0)
-            self.view.marts_table.setCellWidget(current_row, 0, checkbox_widget)
-            
-            self.view.marts_table.setItem(current_row, 1, QTableWidgetItem(field))
-            self.view.marts_table.setItem(current_row, 2, QTableWidgetItem("Pending analysis..."))
-            self.view.marts_table.setItem(current_row, 3, QTableWidgetItem("❓"))
-            self.view.marts_table.setItem(current_row, 4, QTableWidgetItem(""))
-            self.view.marts_table.setItem(current_row, 5, QTableWidgetItem(""))
-
-            last_table_name = current_table_name
-            current_row += 1
+        self.view.marts_model.set_records([
+            {
+                "field": field,
+                "table": field.split('.', 1)[0],
+                "source_model": "Pending analysis...",
+                "can_comment": None,
+                "checked": True,
+            }
+            for field in final_sorted_fields
+        ])
         
         self.view.run_marts_analysis_btn.setEnabled(True)
         self.view.tabs.setCurrentIndex(1)
@@ -756,13 +729,7 @@ class AppController:
         )
 
     def _run_marts_analysis(self):
-        fields_to_analyze = []
-        for row in range(self.view.marts_table.rowCount()):
-            if not self.view.marts_table.cellWidget(row, 0):
-                continue
-            field_item = self.view.marts_table.item(row, 1)
-            if field_item:
-                fields_to_analyze.append(field_item.text())
+        fields_to_analyze = [record["field"] for record in self.view.marts_model.records()]
         
         if not fields_to_analyze:
             QMessageBox.warning(self.view, "Warning", "No fields to analyze in MARTS tab")
@@ -776,21 +743,13 @@ class AppController:
         reporting_path = self.view.dbt_path_input.text()
         tabular_path = self.view.tabular_path_input.text()
         
-        self.thread = QThread()
-        self.worker = MartsAnalysisWorker(reporting_path, tabular_path, fields_to_analyze)
-        self.worker.moveToThread(self.thread)
-        
-        self.worker.progress.connect(self.view.marts_progress_bar.setValue)
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self._on_marts_analysis_finished)
-        self.worker.error.connect(self._on_marts_analysis_error)
-        
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self._clear_thread_references)
+        worker = MartsAnalysisWorker(reporting_path, tabular_path, fields_to_analyze)
+        worker.progress.connect(self.view.marts_progress_bar.setValue)
+        worker.finished.connect(self._on_marts_analysis_finished)
+        worker.error.connect(self._on_marts_analysis_error)
+        worker.cancelled.connect(self._on_marts_analysis_cancelled)
         
-        self.thread.start()
+        self.jobs.submit(MARTS_JOB, worker)
 
     def _update_marts_table_with_results(self, marts_results, target_table=None):
         if not marts_results:
@@ -806,7 +765,8 @@ class AppController:
                 'can_comment': True,
                 'source_model': item.get('source_model', 'Unknown'),
                 'blocked_by': '',
-                'usage_example': ''
+                'usage_example': '',
+                'checked': True
             }
         
         for item in marts_results.get('cannot_comment_in_marts', []):
@@ -822,7 +782,9 @@ class AppController:
                 'can_comment': False,
                 'source_model': item.get('source_model', 'Unknown'),
                 'blocked_by': blocking_files,
-                'usage_example': usage_example
+                'usage_example': usage_example,
+                'checked': False,
+                'checkable': False
             }
         
         for item in marts_results.get('errors', []):
@@ -830,52 +792,12 @@ class AppController:
                 'can_comment': False,
                 'source_model': 'ERROR',
                 'blocked_by': 'Model not found',
-                'usage_example': item.get('error', '')
+                'usage_example': item.get('error', ''),
+                'checked': False,
+                'checkable': False
             }
         
-        for row in range(target_table.rowCount()):
-            field_item = target_table.item(row, 1)
-            if not field_item:
-                continue
-                
-            field_name = field_item.text()
-            if field_name in field_map:
-                info = field_map[field_name]
-                
-                target_table.setItem(row, 2, QTableWidgetItem(info['source_model']))
-                
-                if info['can_comment']:
-                    used_item = QTableWidgetItem("✅")
-                    used_item.setBackground(QBrush(QColor(0, 150, 0, 50)))
-                    
-                    checkbox_widget = target_table.cellWidget(row, 0)
-                    if checkbox_widget:
-                        checkbox = checkbox_widget.findChild(QCheckBox)
-                        if checkbox:
-                            checkbox.setChecked(True)
-                else:
-                    used_item = QTableWidgetItem("❌")
-                    used_item.setBackground(QBrush(QColor(150, 0, 0, 50)))
-                    
-                    checkbox_widget = target_table.cellWidget(row, 0)
-                    if checkbox_widget:
-                        checkbox = checkbox_widget.findChild(QCheckBox)
-                        if checkbox:
-                            checkbox.setChecked(False)
-                            checkbox.setEnabled(False)
-                
-                target_table.setItem(row, 3, used_item)
-                
-                blocked_item = QTableWidgetItem(info['blocked_by'])
-                if info['blocked_by']:
-                    blocked_item.setToolTip(f"Full list: {info['blocked_by']}")
-                target_table.setItem(row, 4, blocked_item)
-                
-                usage_item = QTableWidgetItem(info['usage_example'][:100])
-                if info['usage_example']:
-                    usage_item.setToolTip(info['usage_example'])
-                target_table.setItem(row, 5, usage_item)
-        
+        target_table.model().sourceModel().update_records('field', field_map)
         target_table.resizeColumnsToContents()
 
     def _apply_marts_changes(self):
@@ -883,15 +805,7 @@ class AppController:
             QMessageBox.warning(self.view, "Warning", "Please run MARTS analysis first.")
             return
         
-        fields_to_comment = []
-        for row in range(self.view.marts_table.rowCount()):
-            checkbox_widget = self.view.marts_table.cellWidget(row, 0)
-            if checkbox_widget:
-                checkbox = checkbox_widget.findChild(QCheckBox)
-                if checkbox and checkbox.isChecked() and checkbox.isEnabled():
-                    field_item = self.view.marts_table.item(row, 1)
-                    if field_item:
-                        fields_to_comment.append(field_item.text())
+        fields_to_comment = [record["field"] for record in self.view.marts_model.checked_records()]
         
         if not fields_to_comment:
             QMessageBox.information(self.view, "Info", "No fields selected for commenting in MARTS.")
@@ -955,6 +869,7 @@ class AppController:
 
     def _on_analysis_error(self, error_msg: str):
         self.view.progress_bar.hide()
+        self.view.cancel_analysis_btn.hide()
         QMessageBox.critical(self.view, "Analysis Error", error_msg)
         self.view.statusBar().showMessage("Analysis failed. Please try again.")
         self.view.run_analysis_btn.setEnabled(True)
@@ -963,51 +878,12 @@ class AppController:
     def _populate_table(self, data: list):
         sorted_data = self._sort_data_by_dbt_order(data)
         
-        self.view.results_table.clearContents()
-        self.view.results_table.setRowCount(0)
-        last_table_name = None
-        current_row = 0
-        
+        records = []
         for row_data in sorted_data:
-            current_table_name = row_data.get("table", "")
-            
-            if last_table_name is not None and current_table_name != last_table_name:
-                self.view.results_table.insertRow(current_row)
-                separator = QFrame()
-                separator.setFrameShape(QFrame.Shape.HLine)
-                separator.setFrameShadow(QFrame.Shadow.Sunken)
-                self.view.results_table.setCellWidget(current_row, 0, separator)
-                self.view.results_table.setSpan(current_row, 0, 1, self.view.results_table.columnCount())
-                current_row += 1
-                
-            self.view.results_table.insertRow(current_row)
             is_used = any([row_data.get(k) for k in ["visualization", "measure", "indirect_measure", "hierarchy", "filter", "relationship", "tabular_sort", "rls"]])
-            
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox = QCheckBox()
-            checkbox.setChecked(not is_used)
-            
-            checkbox.stateChanged.connect(lambda state, row=current_row: self._on_checkbox_changed(row, state))
-            
-            checkbox_layout.addWidget(checkbox)
-            checkbox_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            checkbox_layout.setContentsMargins(0,0,0,0)
-            self.view.results_table.setCellWidget(current_row, 0, checkbox_widget)
-            self.view.results_table.setItem(current_row, 1, QTableWidgetItem(row_data.get("table", "")))
-            self.view.results_table.setItem(current_row, 2, QTableWidgetItem(row_data.get("column", "")))
-            self.view.results_table.setItem(current_row, 3, QTableWidgetItem("✅" if is_used else "❌"))
-            self.view.results_table.setItem(current_row, 4, QTableWidgetItem("✅" if row_data.get("visualization") else "❌"))
-            self.view.results_table.setItem(current_row, 5, QTableWidgetItem("✅" if row_data.get("measure") else "❌"))
-            self.view.results_table.setItem(current_row, 6, QTableWidgetItem("✅" if row_data.get("filter") else "❌"))
-            self.view.results_table.setItem(current_row, 7, QTableWidgetItem("✅" if row_data.get("indirect_measure") else "❌"))
-            self.view.results_table.setItem(current_row, 8, QTableWidgetItem("✅" if row_data.get("relationship") else "❌"))
-            self.view.results_table.setItem(current_row, 9, QTableWidgetItem("✅" if row_data.get("hierarchy") else "❌"))
-            self.view.results_table.setItem(current_row, 10, QTableWidgetItem("✅" if row_data.get("tabular_sort") else "❌"))
-            self.view.results_table.setItem(current_row, 11, QTableWidgetItem("✅" if row_data.get("rls") else "❌"))
-            
-            last_table_name = current_table_name
-            current_row += 1
+            records.append(dict(row_data, field=f"{row_data.get('table', '')}.{row_data.get('column', '')}", is_used=is_used, checked=not is_used))
+        
+        self.view.results_model.set_records(records)
 
     def _sort_data_by_dbt_order(self, data: list) -> list:
         if not self.intermediate_data:
@@ -1026,130 +902,46 @@ class AppController:
             for table_name in sorted(tables_data.keys()):
                 table_items = tables_data[table_name]
                 
-                print(f"📄 Sorting table '{table_name}' with {len(table_items)} columns...")
+                dbt_positions = self._get_dbt_column_positions(table_name)
                 
-                dbt_order = self._get_dbt_field_order(table_name)
-                
-                if dbt_order:
-                    print(f"   📋 DBT order: {dbt_order[:5]}{'...' if len(dbt_order) > 5 else ''}")
-                    
+                if dbt_positions:
                     def sort_key(item):
                         column_name = item.get("column", "")
-                        if column_name in dbt_order:
-                            dbt_index = dbt_order.index(column_name)
-                            print(f"   🔍 '{column_name}' -> DBT position {dbt_index}")
-                            return dbt_index
-                        else:
-                            unknown_index = 999999 + ord(column_name[0].lower()) if column_name else 999999
-                            print(f"   ❓ '{column_name}' -> Unknown, position {unknown_index}")
-                            return unknown_index
+                        position = dbt_positions.get(column_name)
+                        if position is not None:
+                            return position
+                        return 999999 + ord(column_name[0].lower()) if column_name else 999999
                     
                     table_items.sort(key=sort_key)
                     
-                    print(f"   ✅ Final order for table '{table_name}':")
-                    for i, item in enumerate(table_items[:10]):
-                        column = item.get("column", "")
-                        is_used = any([item.get(k) for k in ["visualization", "measure", "indirect_measure", "hierarchy", "filter", "relationship"]])
-                        status = "USED" if is_used else "UNUSED"
-                        print(f"      {i+1:2d}. {column} ({status})")
-                    if len(table_items) > 10:
-                        print(f"      ... and {len(table_items) - 10} more")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("   ✅ Final order for table '%s':", table_name)
+                        for i, item in enumerate(table_items[:10]):
+                            column = item.get("column", "")
+                            is_used = any([item.get(k) for k in ["visualization", "measure", "indirect_measure", "hierarchy", "filter", "relationship"]])
+                            status = "USED" if is_used else "UNUSED"
+                            logger.debug("      %2d. %s (%s)", i + 1, column, status)
+                        if len(table_items) > 10:
+                            logger.debug("      ... and %d more", len(table_items) - 10)
                         
                 else:
-                    print(f"   ⚠️ No DBT order found, using alphabetical fallback")
+                    logger.debug("   ⚠️ No DBT order found for '%s', using alphabetical fallback", table_name)
                     table_items.sort(key=lambda x: x.get("column", ""))
                 
                 sorted_result.extend(table_items)
             
-            print(f"🎯 Total sorted items: {len(sorted_result)}")
+            logger.debug("🎯 Total sorted items: %d", len(sorted_result))
             return sorted_result
             
         except Exception as e:
-            print(f"⚠️ Warning: Could not sort by DBT order: {e}")
+            logger.warning(f"⚠️ Warning: Could not sort by DBT order: {e}")
             return sorted(data, key=lambda x: (x.get("table", ""), x.get("column", "")))
             
-    def _get_dbt_field_order(self, table_name: str) -> list:
-        try:
-            tabular_model_path = self.intermediate_data.get("tabular_model_path", "")
-            dbt_models_path = self.view.dbt_path_input.text()
-            
-            if not tabular_model_path or not dbt_models_path:
-                print(f"   ❌ Missing paths for table '{table_name}'")
-                return []
-            
-            alias = analyzer_cli.find_snowflake_alias_for_table(table_name, tabular_model_path)
-            if not alias:
-                print(f"   ❌ No Snowflake alias found for table '{table_name}'")
-                return []
-            
-            print(f"   🔍 Found alias '{alias}' for table '{table_name}'")
-            
-            dbt_file = analyzer_cli.find_dbt_file_for_alias(alias, dbt_models_path)
-            if not dbt_file:
-                print(f"   ❌ No DBT file found for alias '{alias}'")
-                return []
-            
-            print(f"   🔍 Found DBT file: {os.path.basename(dbt_file)}")
-            
-            dbt_columns = analyzer_cli.analyze_dbt_columns_fixed(dbt_file)
-            
-            field_order = list(dbt_columns.values())
-            print(f"   📋 Extracted {len(field_order)} columns from DBT file")
-            
-            return field_order
-            
-        except Exception as e:
-            print(f"   ❌ Error getting DBT field order for {table_name}: {e}")
-            return []
-
-    def _get_dbt_field_order_for_marts(self, table_name: str) -> list:
-        try:
-            tabular_model_path = self.intermediate_data.get("tabular_model_path", "")
-            reporting_path = self.view.dbt_path_input.text()
-            
-            if 'reporting' not in reporting_path:
-                return []
-            marts_path = reporting_path.replace('reporting', 'marts')
-            if not os.path.exists(marts_path):
-                return []
-
-            alias = analyzer_cli.find_snowflake_alias_for_table(table_name, tabular_model_path)
-            if not alias:
-                return []
-            
-            dbt_file = analyzer_cli.find_dbt_file_for_alias(alias, marts_path)
-            if not dbt_file:
-                dbt_file = analyzer_cli.find_dbt_file_for_alias(f"marts_{table_name.lower()}", marts_path)
-                if not dbt_file:
-                    return []
-
-            dbt_columns = analyzer_cli.analyze_dbt_columns_fixed(dbt_file)
-            return list(dbt_columns.values())
-            
-        except Exception:
-            return []
-
-    def _on_checkbox_changed(self, row: int, state: int):
-        try:
-            table_item = self.view.results_table.item(row, 1)
-            column_item = self.view.results_table.item(row, 2)
-            is_used_item = self.view.results_table.item(row, 3)
-            
-            if not all([table_item, column_item, is_used_item]):
-                return
-                
-            is_originally_unused = is_used_item.text() == "❌"
-            
-            for col in range(self.view.results_table.columnCount()):
-                item = self.view.results_table.item(row, col)
-                if item:
-                    if is_originally_unused and state == Qt.CheckState.Unchecked.value:
-                        item.setBackground(QBrush(QColor(0, 150, 0, 80)))
-                    else:
-                        item.setBackground(QBrush())
-                        
-        except Exception as e:
-            print(f"Error changing row color: {e}")
+    def _get_dbt_column_positions(self, table_name: str) -> dict:
+        # {column: position} from the table's DBT model, computed once by perform_analysis (no disk access here)
+        if not self.intermediate_data:
+            return {}
+        return self.intermediate_data.get("dbt_column_orders", {}).get(table_name, {})
 
     def _generate_analysis_summary(self) -> dict:
         summary = {
@@ -1174,54 +966,24 @@ class AppController:
             }
         }
         
-        for row in range(self.view.results_table.rowCount()):
-            widget = self.view.results_table.cellWidget(row, 0)
-            if not isinstance(widget, QWidget) or not widget.findChild(QCheckBox):
-                continue
-                
+        model = self.view.results_model
+        for record in model.records():
             summary['total_columns'] += 1
             
-            checkbox = widget.findChild(QCheckBox)
-            is_used_item = self.view.results_table.item(row, 3)
-            viz_item = self.view.results_table.item(row, 4)
-            measure_item = self.view.results_table.item(row, 5)
-            filter_item = self.view.results_table.item(row, 6)
-            indirect_item = self.view.results_table.item(row, 7)
-            relation_item = self.view.results_table.item(row, 8)
-            hierarchy_item = self.view.results_table.item(row, 9)
-            
-            if not is_used_item:
-                continue
-                
-            is_used = is_used_item.text() == "✅"
-            is_checked = checkbox.isChecked()
+            is_used = record['is_used']
+            is_checked = record['checked']
             
             if is_used:
                 summary['used_columns'] += 1
             else:
                 summary['unused_columns'] += 1
                 
-            if viz_item and viz_item.text() == "✅":
-                summary['usage_breakdown']['visualization'] += 1
-            if measure_item and measure_item.text() == "✅":
-                summary['usage_breakdown']['measure'] += 1
-            if filter_item and filter_item.text() == "✅":
-                summary['usage_breakdown']['filter'] += 1
-            if indirect_item and indirect_item.text() == "✅":
-                summary['usage_breakdown']['indirect_measure'] += 1
-            if relation_item and relation_item.text() == "✅":
-                summary['usage_breakdown']['relationship'] += 1
-            if hierarchy_item and hierarchy_item.text() == "✅":
-                summary['usage_breakdown']['hierarchy'] += 1
-                
-            row_has_green_background = False
-            for col in range(self.view.results_table.columnCount()):
-                item = self.view.results_table.item(row, col)
-                if item and item.background().color().green() > 100:
-                    row_has_green_background = True
-                    break
+            for key in summary['usage_breakdown']:
+                if record.get(key):
+                    summary['usage_breakdown'][key] += 1
                     
-            if row_has_green_background:
+            # Highlighted rows: recommended for commenting out, but unchecked by the user
+            if not is_checked and model.is_recommended(record):
                 summary['user_decisions']['manually_kept'] += 1
             elif is_used and is_checked:
                 summary['user_decisions']['manually_removed'] += 1
@@ -1321,6 +1083,89 @@ class AppController:
         
         dialog.exec()
 
+    def _show_performance_profile(self):
+        profile = (self.intermediate_data or {}).get("profile")
+        if not profile:
+            QMessageBox.warning(self.view, "Warning", "Please run an analysis first.")
+            return
+
+        dialog = QMessageBox(self.view)
+        dialog.setWindowTitle("⏱️ Performance Profile")
+        dialog.setIcon(QMessageBox.Icon.Information)
+        dialog.setText(f"<pre>{format_profile_table(profile)}</pre>")
+        dialog.setInformativeText(f"Started at {profile.get('started_at')} • Python {profile.get('python')} • {profile.get('platform')}")
+        export_btn = dialog.addButton("💾 Export JSON...", QMessageBox.ButtonRole.ActionRole)
+        dialog.addButton(QMessageBox.StandardButton.Ok)
+
+        style_sheet = """
+            QMessageBox { font-family: 'Consolas', 'Monaco', monospace; font-size: 12px; }
+            QMessageBox QLabel { color: #FFFFFF; background-color: #2E2E2E; padding: 10px; border-radius: 5px; }
+        """
+        dialog.setStyleSheet(style_sheet)
+
+        for widget in dialog.findChildren(QWidget):
+            if isinstance(widget, QLabel):
+                widget.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+                break
+
+        dialog.exec()
+
+        if dialog.clickedButton() == export_btn:
+            default_name = f"analysis_profile_{profile.get('started_at', '').replace(':', '-')}.json"
+            file_path, _ = QFileDialog.getSaveFileName(self.view, "Export Performance Profile", default_name, "JSON Files (*.json)")
+            if file_path:
+                try:
+                    export_profile_json(profile, file_path)
+                    self.view.statusBar().showMessage(f"Performance profile saved to {file_path}")
+                except OSError as e:
+                    QMessageBox.critical(self.view, "Error", f"Could not save the profile: {e}")
+
+    def _show_analysis_log(self):
+        messages = get_log_messages(logging.INFO)
+        dialog = QMessageBox(self.view)
+        dialog.setWindowTitle("📜 Analysis Log")
+        dialog.setIcon(QMessageBox.Icon.Information)
+        if messages:
+            dialog.setText(f"{len(messages)} message(s) logged since the last REPORTING analysis started.")
+            dialog.setDetailedText("\n".join(messages))
+        else:
+            dialog.setText("Nothing logged yet. Run an analysis first.")
+        dialog.addButton(QMessageBox.StandardButton.Ok)
+        dialog.exec()
+
+    def _export_results(self):
+        if not self.intermediate_data:
+            QMessageBox.warning(self.view, "Warning", "Please run an analysis first.")
+            return
+
+        from analyzer_export import EXPORT_FORMATS, export_analysis
+
+        export_format, ok = QInputDialog.getItem(self.view, "Export Results", "Format:", list(EXPORT_FORMATS), 0, False)
+        if not ok:
+            return
+        settings = QSettings("MyCompany", "PowerBIAnalyzer")
+        start_dir = settings.value("paths/export", os.path.expanduser("~"))
+        output_dir = QFileDialog.getExistingDirectory(self.view, "Select Export Folder", start_dir)
+        if not output_dir:
+            return
+        settings.setValue("paths/export", output_dir)
+
+        # Records carry the user's "comment out" checkbox next to the usage flags
+        rows = self.view.results_model.records()
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            written = export_analysis(rows, self.intermediate_data, output_dir, export_format)
+        except ImportError as e:
+            QMessageBox.warning(self.view, "Missing Dependency", f"{export_format} export is not available: {e}")
+            return
+        except OSError as e:
+            QMessageBox.critical(self.view, "Error", f"Could not export the results: {e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        self.view.statusBar().showMessage(f"Exported {len(written)} result tables to {output_dir}")
+
     def _toggle_apply_button(self):
         is_checked = self.view.enable_live_mode_checkbox.isChecked()
         self.view.apply_changes_btn.setEnabled(is_checked)
@@ -1332,18 +1177,9 @@ class AppController:
             
         summary = self._generate_analysis_summary()
         
-        columns_to_comment = []
-        for row in range(self.view.results_table.rowCount()):
-            widget = self.view.results_table.cellWidget(row, 0)
-            if isinstance(widget, QWidget) and widget.findChild(QCheckBox):
-                checkbox = widget.findChild(QCheckBox)
-                if checkbox.isChecked():
-                    table_item = self.view.results_table.item(row, 1)
-                    column_item = self.view.results_table.item(row, 2)
-                    if table_item and column_item:
-                        table = table_item.text()
-                        column = column_item.text()
-                        columns_to_comment.append(f"{table}.{column}")
+        columns_to_comment = [
+            f"{record['table']}.{record['column']}" for record in self.view.results_model.checked_records()
+        ]
                         
         if not columns_to_comment:
             summary_msg = self._format_summary_message(summary, 0, is_planning=True)
@@ -1651,12 +1487,11 @@ if __name__ == "__main__":
         QPushButton#runAnalysisButton:hover { background-color: #5A94FF; }
         QPushButton:disabled { background-color: #444444; color: #888888; }
         QHeaderView::section { background-color: #3C3C3C; padding: 4px; border: 1px solid #555555; }
-        QTableWidget { gridline-color: #444444; border: 1px solid #555555; }
-        QTableWidget::item { padding-left: 5px; }
-        QTableWidget::item:selected { background-color: #5A94FF; }
+        QTableView { gridline-color: #444444; border: 1px solid #555555; }
+        QTableView::item { padding-left: 5px; }
+        QTableView::item:selected { background-color: #5A94FF; }
         QProgressBar { border: 1px solid #555555; border-radius: 4px; text-align: center; }
         QProgressBar::chunk { background-color: #3A7BFF; border-radius: 3px; }
-        QFrame[frameShape="5"] { color: #555555; }
         QCheckBox::indicator {
             width: 16px;
             height: 16px;
@@ -0,0 +1,57 @@
+# model_text.py
+
+"""
+Text helpers shared by the model readers (TMDL, model.bim, .pbit) and the measures
+folder reader: how a file's encoding is sniffed from its first bytes, and how DAX
+/ M expressions are normalised whichever format stored them (a string, a list of
+lines, or a TMDL multi-line value).
+"""
+
+from typing import List, Optional
+
+# Files that can sit next to model sources but never hold text (zip/pbix, pdf, png, gif, jpeg, old Office)
+BINARY_MAGIC = (b"PK\x03\x04", b"%PDF", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"\xd0\xcf\x11\xe0")
+
+
+# ===========================
+# 🔤 ENCODING
+# ===========================
+
+def sniff_encoding(head: bytes, detect_binary: bool = False) -> Optional[str]:
+    """
+    Encoding of a text file from its first bytes: a BOM, else UTF-16 without BOM (Power BI
+    writes its JSON that way: every other byte of the leading ASCII is zero), else UTF-8.
+    With detect_binary, returns None for known binary formats and for any other zero bytes
+    (free-form files, where a zero byte does not mean UTF-16).
+    """
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if detect_binary:
+        return None if head.startswith(BINARY_MAGIC) or b"\x00" in head else "utf-8"
+    if len(head) >= 2 and head[1:2] == b"\x00":
+        return "utf-16-le"
+    if len(head) >= 2 and head[0:1] == b"\x00":
+        return "utf-16-be"
+    return "utf-8"
+
+
+# ===========================
+# 🧮 EXPRESSIONS
+# ===========================
+
+def expression_lines(value) -> List[str]:
+    """An expression as a list of lines (model.bim stores long ones as JSON arrays of lines)."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return [str(line) for line in value]
+    return str(value).splitlines()
+
+
+def expression_text(value) -> str:
+    """An expression as one string, without surrounding blank lines or whitespace."""
+    if isinstance(value, list):
+        return "\n".join(str(line) for line in value).strip()
+    return str(value).strip() if value is not None else ""
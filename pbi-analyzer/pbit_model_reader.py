@@ -0,0 +1,94 @@
+# pbit_model_reader.py
+
+"""
+Model source for Power BI templates: reads the model straight out of a .pbit
+(or a .pbix saved without imported data) instead of a Tabular Editor folder export.
+
+The DataModelSchema member holds the whole model as UTF-16 JSON (the same shape as
+a model.bim). It is decoded while it is inflated from the zip and streamed through
+bim_reader, so the member is never held in memory as a whole; the result is the
+snapshot shared with the TMDL and BIM readers:
+
+    {"source_path", "format", "tables": {name: table dict}, "roles": [...], "relationships": [...]}
+
+A .pbix with imported data has a binary DataModel member instead of DataModelSchema;
+load_pbit_model() raises ValueError for it, since the model cannot be read without
+Analysis Services.
+"""
+
+import io
+import json
+import os
+import threading
+import zipfile
+from typing import Dict, Optional, Tuple
+
+from analyzer_logging import get_logger
+from analyzer_profiler import record_file_read
+from bim_reader import iter_model_objects, snapshot_from_objects
+from model_text import sniff_encoding
+
+logger = get_logger("pbit_model_reader")
+
+PBIT_EXTENSIONS = (".pbit", ".pbix")
+SCHEMA_MEMBER = "DataModelSchema"
+
+_model_cache: Dict[str, Tuple[tuple, Dict]] = {}
+_model_cache_lock = threading.Lock()
+
+
+# ===========================
+# 📦 ZIP MEMBER
+# ===========================
+
+def is_pbit_model(model_path: str) -> bool:
+    return bool(model_path) and os.path.isfile(model_path) and model_path.lower().endswith(PBIT_EXTENSIONS)
+
+
+def read_model_snapshot(pbit_path: str) -> Dict:
+    """Inflates, decodes and parses the DataModelSchema member in one streaming pass."""
+    with zipfile.ZipFile(pbit_path) as archive:
+        names = set(archive.namelist())
+        if SCHEMA_MEMBER not in names:
+            if "DataModel" in names:
+                raise ValueError(f"'{os.path.basename(pbit_path)}' holds a compiled data model only; save it as a .pbit template to analyse it.")
+            raise ValueError(f"'{os.path.basename(pbit_path)}' has no {SCHEMA_MEMBER}.")
+
+        with archive.open(SCHEMA_MEMBER) as member:
+            buffered = io.BufferedReader(member)
+            encoding = sniff_encoding(buffered.peek(4)[:4])
+            snapshot = snapshot_from_objects(iter_model_objects(io.TextIOWrapper(buffered, encoding=encoding)), pbit_path, "pbit")
+        record_file_read(archive.getinfo(SCHEMA_MEMBER).file_size)
+    return snapshot
+
+
+# ===========================
+# 🚀 ENTRY POINT
+# ===========================
+
+def load_pbit_model(model_path: str) -> Optional[Dict]:
+    """
+    Model snapshot of a .pbit/.pbix file, or None when model_path is not one.
+    Cached until the file changes. Raises ValueError when the file carries no readable schema.
+    """
+    if not is_pbit_model(model_path):
+        return None
+
+    stat = os.stat(model_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(model_path)
+    with _model_cache_lock:
+        cached = _model_cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    try:
+        snapshot = read_model_snapshot(model_path)
+    except (zipfile.BadZipFile, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read the model from '{os.path.basename(model_path)}': {e}") from e
+
+    logger.debug("PBIT model %s: %d tables, %d roles, %d relationships.",
+                 model_path, len(snapshot["tables"]), len(snapshot["roles"]), len(snapshot["relationships"]))
+    with _model_cache_lock:
+        _model_cache[key] = (signature, snapshot)
+    return snapshot
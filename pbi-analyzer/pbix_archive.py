@@ -0,0 +1,155 @@
+# pbix_archive.py
+
+"""
+Read-only PBIX access tuned for reports on network shares.
+
+zipfile.ZipFile(path) seeks and reads the archive in many small pieces (central
+directory, then a local header and a few KB of compressed data at a time per member).
+Over SMB every one of those is a round trip. PbixArchive maps the file instead:
+
+    mmap    - the archive is memory-mapped; the byte ranges of the members about to be
+              read are announced to the kernel (MADV_WILLNEED) so they are fetched in
+              large requests, and each member is inflated straight from the mapping
+    buffer  - where the file cannot be mapped, a file up to BUFFER_READ_MAX_BYTES is
+              read with one sequential read and served the same way
+    file    - anything else goes through a plain ZipFile on the path
+
+Members are decompressed from a memoryview of the mapping/buffer, so the compressed
+bytes are not copied on the way to zlib. Encrypted members and compression methods
+other than stored/deflated are read through ZipFile in every mode.
+"""
+
+import io
+import mmap
+import os
+import struct
+import zipfile
+import zlib
+from typing import Iterable, List
+
+from analyzer_logging import get_logger
+
+logger = get_logger("pbix_archive")
+
+# Largest archive read into memory in one go when it cannot be memory-mapped
+BUFFER_READ_MAX_BYTES = 256 * 1024 * 1024
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+# ===========================
+# 📦 ARCHIVE
+# ===========================
+
+class PbixArchive:
+    """ZipFile-compatible listing plus thread-safe member reads served from a mapping or buffer."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mode = "file"
+        self._file = None
+        self._map = None
+        self._view = None
+
+        try:
+            self._file = open(path, "rb")
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._map)
+                self.zipfile = zipfile.ZipFile(self._map)
+                self.mode = "mmap"
+            except (OSError, ValueError):
+                # Empty files and file systems without mmap support
+                self._release_map()
+                if os.fstat(self._file.fileno()).st_size <= BUFFER_READ_MAX_BYTES:
+                    self._file.seek(0)
+                    data = self._file.read()
+                    self._view = memoryview(data)
+                    self.zipfile = zipfile.ZipFile(io.BytesIO(data))
+                    self.mode = "buffer"
+                else:
+                    self.zipfile = zipfile.ZipFile(self._file)
+        except BaseException:
+            self.close()
+            raise
+        logger.debug("PBIX %s opened (%s).", path, self.mode)
+
+    def infolist(self) -> List[zipfile.ZipInfo]:
+        return self.zipfile.infolist()
+
+    def prefetch(self, infos: Iterable[zipfile.ZipInfo]):
+        """Asks the kernel to start fetching the members' bytes, so later reads do not wait page by page."""
+        if self._map is None or not hasattr(mmap, "MADV_WILLNEED"):
+            return
+        # The local header normally repeats the central directory's name and extra field; one page of
+        # slack covers the difference. Adjacent members are announced as one range.
+        ranges = []
+        for info in sorted(infos, key=lambda i: i.header_offset):
+            start = info.header_offset - info.header_offset % mmap.PAGESIZE
+            end = min(len(self._map), info.header_offset + _LOCAL_HEADER.size + len(info.filename.encode("utf-8"))
+                      + len(info.extra) + info.compress_size + mmap.PAGESIZE)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+        for start, end in ranges:
+            try:
+                self._map.madvise(mmap.MADV_WILLNEED, start, end - start)
+            except (OSError, ValueError):
+                return
+
+    def read(self, info: zipfile.ZipInfo) -> bytes:
+        """Uncompressed bytes of a member, CRC-checked like ZipFile.read. Safe to call from several threads."""
+        if self._view is None or info.flag_bits & 0x1 or info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            with self.zipfile.open(info) as member:
+                return member.read()
+
+        header = _LOCAL_HEADER.unpack_from(self._view, info.header_offset)
+        if header[0] != _LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad magic number for file header: {info.filename}")
+        start = info.header_offset + _LOCAL_HEADER.size + header[10] + header[11]
+        compressed = self._view[start:start + info.compress_size]
+        try:
+            if info.compress_type == zipfile.ZIP_STORED:
+                data = bytes(compressed)
+            else:
+                data = zlib.decompress(compressed, -zlib.MAX_WBITS, info.file_size or zlib.DEF_BUF_SIZE)
+        finally:
+            compressed.release()
+
+        if len(data) != info.file_size or zlib.crc32(data) != info.CRC:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+        return data
+
+    def _release_map(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def close(self):
+        zip_file = getattr(self, "zipfile", None)
+        if zip_file is not None:
+            zip_file.close()
+        self._release_map()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ===========================
+# 🚀 ENTRY POINT
+# ===========================
+
+def open_pbix_archive(path: str) -> PbixArchive:
+    """Opens a PBIX/PBIT for reading: memory-mapped when possible (see module docstring)."""
+    return PbixArchive(path)
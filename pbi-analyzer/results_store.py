@@ -0,0 +1,239 @@
+# results_store.py
+
+"""
+Local history of analysis runs (SQLite).
+
+Every stored run keeps:
+    runs        - one row per run: timestamp, model path, dbt path, PBIX files, column counts
+    field_usage - one row per model column: the usage flags shown in the REPORTING tab
+    usage_hits  - one row per PBIX hit: report, usage type, page, visual
+
+Runs are compared within the same (model path, dbt path) pair, so questions like
+"which columns became unused since last month" or "which report started using X"
+are answered by newly_unused_fields(), newly_used_fields() and reports_started_using().
+
+A run is written with bulk inserts in a single transaction; the (run_id, field) and
+(field, run_id) indexes keep comparisons fast with hundreds of runs stored.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from analyzer_logging import get_logger
+from usage_records import iter_usage_dicts
+
+logger = get_logger("results_store")
+
+DEFAULT_STORE_FILENAME = "analysis_history.sqlite"
+
+USAGE_FLAG_KEYS = ("visualization", "measure", "indirect_measure", "hierarchy", "filter", "relationship", "tabular_sort", "rls")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at     TEXT NOT NULL,
+    model_path     TEXT NOT NULL,
+    dbt_path       TEXT NOT NULL,
+    pbix_files     TEXT NOT NULL,
+    total_columns  INTEGER NOT NULL,
+    unused_columns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_source ON runs (model_path, dbt_path, started_at);
+
+CREATE TABLE IF NOT EXISTS field_usage (
+    run_id       INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    field        TEXT NOT NULL,
+    table_name   TEXT NOT NULL,
+    column_name  TEXT NOT NULL,
+    {", ".join(f"{flag} INTEGER NOT NULL" for flag in USAGE_FLAG_KEYS)},
+    is_used      INTEGER NOT NULL,
+    PRIMARY KEY (run_id, field)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_field_usage_field ON field_usage (field, run_id);
+
+CREATE TABLE IF NOT EXISTS usage_hits (
+    run_id      INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    field       TEXT NOT NULL,
+    report      TEXT,
+    usage_type  TEXT,
+    page        TEXT,
+    object_name TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_usage_hits_run_field ON usage_hits (run_id, field, report);
+CREATE INDEX IF NOT EXISTS idx_usage_hits_field ON usage_hits (field, run_id);
+"""
+
+
+def default_store_path() -> str:
+    base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "PowerBIAnalyzer", DEFAULT_STORE_FILENAME)
+
+
+class ResultsStore:
+    """Thin wrapper around one SQLite connection; use as a context manager or call close()."""
+
+    def __init__(self, path: str = None):
+        self.path = path or default_store_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ===========================
+    # 💾 WRITE
+    # ===========================
+
+    def record_run(self, ui_results: List[Dict], intermediate_data: Dict, pbix_files: List[str], started_at: str = None) -> int:
+        """Stores one finished analysis; returns its run_id."""
+        started_at = started_at or (intermediate_data.get("profile") or {}).get("started_at") or datetime.now().isoformat(timespec="seconds")
+
+        usage_rows = []
+        for row in ui_results:
+            flags = [1 if row.get(flag) else 0 for flag in USAGE_FLAG_KEYS]
+            usage_rows.append((f"{row['table']}.{row['column']}", row['table'], row['column'], *flags, 1 if any(flags) else 0))
+        unused = sum(1 for usage in usage_rows if not usage[-1])
+
+        hit_rows = [
+            (hit.get("field"), hit.get("source_file"), hit.get("usage_type"), hit.get("page"), hit.get("object_name"))
+            for hit in iter_usage_dicts(intermediate_data.get("direct_usage", []))
+        ]
+
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, model_path, dbt_path, pbix_files, total_columns, unused_columns) VALUES (?, ?, ?, ?, ?, ?)",
+                (started_at, _normalize_path(intermediate_data.get("tabular_model_path")), _normalize_path(intermediate_data.get("dbt_models_path")),
+                 json.dumps([os.path.basename(p) for p in pbix_files]), len(usage_rows), unused),
+            )
+            run_id = cursor.lastrowid
+            placeholders = ", ".join("?" * (len(USAGE_FLAG_KEYS) + 5))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO field_usage (run_id, field, table_name, column_name, {', '.join(USAGE_FLAG_KEYS)}, is_used) VALUES ({placeholders})",
+                ((run_id, *usage) for usage in usage_rows),
+            )
+            self._conn.executemany(
+                "INSERT INTO usage_hits (run_id, field, report, usage_type, page, object_name) VALUES (?, ?, ?, ?, ?, ?)",
+                ((run_id, *hit) for hit in hit_rows),
+            )
+
+        logger.info(f"🗄️ Stored run #{run_id}: {len(usage_rows)} columns, {len(hit_rows)} usage hits -> {self.path}")
+        return run_id
+
+    def delete_runs_before(self, started_before: str) -> int:
+        with self._conn:
+            return self._conn.execute("DELETE FROM runs WHERE started_at < ?", (started_before,)).rowcount
+
+    # ===========================
+    # 🔍 QUERY
+    # ===========================
+
+    def list_runs(self, model_path: str = None, dbt_path: str = None, limit: int = None) -> List[Dict]:
+        sql, params = "SELECT * FROM runs", []
+        if model_path is not None:
+            sql += " WHERE model_path = ? AND dbt_path = ?"
+            params += [_normalize_path(model_path), _normalize_path(dbt_path)]
+        sql += " ORDER BY started_at DESC, run_id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def get_run(self, run_id: int) -> Optional[Dict]:
+        row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest_run(self, model_path: str, dbt_path: str) -> Optional[Dict]:
+        runs = self.list_runs(model_path, dbt_path, limit=1)
+        return runs[0] if runs else None
+
+    def run_before(self, run_id: int, started_before: str = None) -> Optional[Dict]:
+        """The previous run of the same model/dbt pair (optionally the last one started before a timestamp)."""
+        run = self.get_run(run_id)
+        if not run:
+            return None
+        row = self._conn.execute(
+            "SELECT * FROM runs WHERE model_path = ? AND dbt_path = ? AND run_id != ? AND started_at < ? "
+            "ORDER BY started_at DESC, run_id DESC LIMIT 1",
+            (run["model_path"], run["dbt_path"], run_id, started_before or run["started_at"]),
+        ).fetchone()
+        if row is None and started_before is None:
+            # Same timestamp (two runs within a second): fall back to insertion order
+            row = self._conn.execute(
+                "SELECT * FROM runs WHERE model_path = ? AND dbt_path = ? AND run_id < ? ORDER BY run_id DESC LIMIT 1",
+                (run["model_path"], run["dbt_path"], run_id),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def field_usage(self, run_id: int) -> Dict[str, Dict]:
+        return {row["field"]: dict(row) for row in self._conn.execute("SELECT * FROM field_usage WHERE run_id = ?", (run_id,))}
+
+    def newly_unused_fields(self, old_run_id: int, new_run_id: int) -> List[str]:
+        """Columns used in the old run and unused in the new one."""
+        return self._fields_changed(old_run_id, new_run_id, was_used=1)
+
+    def newly_used_fields(self, old_run_id: int, new_run_id: int) -> List[str]:
+        return self._fields_changed(old_run_id, new_run_id, was_used=0)
+
+    def _fields_changed(self, old_run_id: int, new_run_id: int, was_used: int) -> List[str]:
+        rows = self._conn.execute(
+            "SELECT new.field FROM field_usage AS new "
+            "JOIN field_usage AS old ON old.run_id = ? AND old.field = new.field "
+            "WHERE new.run_id = ? AND old.is_used = ? AND new.is_used = ? ORDER BY new.field",
+            (old_run_id, new_run_id, was_used, 1 - was_used),
+        )
+        return [row["field"] for row in rows]
+
+    def reports_started_using(self, old_run_id: int, new_run_id: int, field: str = None) -> List[Dict]:
+        """(field, report) pairs with hits in the new run but none in the old one."""
+        sql = (
+            "SELECT DISTINCT new.field, new.report FROM usage_hits AS new "
+            "WHERE new.run_id = ? {field_filter} AND NOT EXISTS ("
+            "  SELECT 1 FROM usage_hits AS old WHERE old.run_id = ? AND old.field = new.field AND old.report IS new.report"
+            ") ORDER BY new.field, new.report"
+        )
+        params = [new_run_id]
+        if field:
+            sql = sql.format(field_filter="AND new.field = ?")
+            params.append(field)
+        else:
+            sql = sql.format(field_filter="")
+        params.append(old_run_id)
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def field_history(self, field: str, model_path: str = None, dbt_path: str = None) -> List[Dict]:
+        """is_used of one column across stored runs, oldest first."""
+        sql = ("SELECT runs.run_id, runs.started_at, field_usage.is_used FROM field_usage "
+               "JOIN runs ON runs.run_id = field_usage.run_id WHERE field_usage.field = ?")
+        params = [field]
+        if model_path is not None:
+            sql += " AND runs.model_path = ? AND runs.dbt_path = ?"
+            params += [_normalize_path(model_path), _normalize_path(dbt_path)]
+        sql += " ORDER BY runs.started_at, runs.run_id"
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def compare_runs(self, old_run_id: int, new_run_id: int) -> Dict:
+        return {
+            "old_run": self.get_run(old_run_id),
+            "new_run": self.get_run(new_run_id),
+            "newly_unused": self.newly_unused_fields(old_run_id, new_run_id),
+            "newly_used": self.newly_used_fields(old_run_id, new_run_id),
+            "new_report_usage": self.reports_started_using(old_run_id, new_run_id),
+        }
+
+
+def _normalize_path(path: Optional[str]) -> str:
+    return os.path.normcase(os.path.abspath(path)) if path else ""
@@ -0,0 +1,351 @@
+# table_models.py
+
+"""
+Model/view backing for the REPORTING, MARTS and MARTS AUDIT result tables.
+
+Rows are plain dicts. Consecutive rows of different groups (tables / source models)
+are separated by a separator row that SeparatorDelegate paints as a line. The
+"Comment Out" checkbox is data (Qt.CheckStateRole), not a widget, so QTableView
+only ever paints the rows that are on screen. GroupFilterProxyModel sits between
+the model and the view and does the text filtering.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor, QPen
+from PyQt6.QtWidgets import QStyledItemDelegate
+
+SEPARATOR_ROLE = Qt.ItemDataRole.UserRole + 1
+RECORD_ROLE = Qt.ItemDataRole.UserRole + 2
+
+# Unchecked although the analysis recommends commenting it out ("manually kept")
+KEPT_BRUSH = QBrush(QColor(0, 150, 0, 80))
+OK_BRUSH = QBrush(QColor(0, 150, 0, 50))
+BLOCKED_BRUSH = QBrush(QColor(150, 0, 0, 50))
+SEPARATOR_COLOR = QColor("#555555")
+
+
+def _flag(key: str) -> Callable[[Dict], str]:
+    return lambda record: "✅" if record.get(key) else "❌"
+
+
+def _status(pending_text: str) -> Callable[[Dict], str]:
+    def value(record):
+        if record.get("can_comment") is None:
+            return pending_text
+        return "✅" if record["can_comment"] else "❌"
+    return value
+
+
+def _status_background(record: Dict):
+    if record.get("can_comment") is None:
+        return None
+    return OK_BRUSH if record["can_comment"] else BLOCKED_BRUSH
+
+
+# ===========================
+# 📋 COLUMN DEFINITIONS
+# ===========================
+# Each column: header, value(record) -> display text, optional background(record)
+# and tooltip(record). The checkbox column has no value.
+
+CHECKBOX_COLUMN = {"header": "Comment Out", "checkbox": True}
+
+REPORTING_COLUMNS = [
+    CHECKBOX_COLUMN,
+    {"header": "Table", "value": lambda r: r.get("table", "")},
+    {"header": "Column", "value": lambda r: r.get("column", "")},
+    {"header": "Is Used", "value": _flag("is_used")},
+    {"header": "Visualization", "value": _flag("visualization")},
+    {"header": "Measure", "value": _flag("measure")},
+    {"header": "Filter", "value": _flag("filter")},
+    {"header": "Indirect Meas.", "value": _flag("indirect_measure")},
+    {"header": "Relationship", "value": _flag("relationship")},
+    {"header": "Hierarchy", "value": _flag("hierarchy")},
+    {"header": "Tabular Sort", "value": _flag("tabular_sort")},
+    {"header": "RLS", "value": _flag("rls")},
+]
+
+
+def _marts_columns(pending_text: str) -> List[Dict]:
+    return [
+        CHECKBOX_COLUMN,
+        {"header": "Field", "value": lambda r: r.get("field", "")},
+        {"header": "Source Model", "value": lambda r: r.get("source_model", "")},
+        {"header": "Used", "value": _status(pending_text), "background": _status_background},
+        {"header": "Blocked By", "value": lambda r: r.get("blocked_by", ""),
+         "tooltip": lambda r: f"Full list: {r['blocked_by']}" if r.get("blocked_by") else None},
+        {"header": "Usage Example", "value": lambda r: (r.get("usage_example") or "")[:100],
+         "tooltip": lambda r: r.get("usage_example") or None},
+    ]
+
+
+MARTS_COLUMNS = _marts_columns("❓")
+MARTS_AUDIT_COLUMNS = _marts_columns("Pending...")
+
+
+# ===========================
+# 🧮 MODEL
+# ===========================
+
+class GroupedCheckableTableModel(QAbstractTableModel):
+    """
+    Table of dict records grouped by `group_key`, with a checkbox in column 0.
+
+    Record keys used by the model itself:
+      checked    - checkbox state
+      checkable  - False greys the checkbox out (e.g. blocked MARTS fields)
+    `recommended(record)` marks rows the analysis wants commented out; those rows are
+    highlighted when the user unchecks them.
+    """
+
+    checkStateChanged = pyqtSignal(int)
+
+    def __init__(self, columns: List[Dict], group_key: str, recommended: Callable[[Dict], bool] = None, parent=None):
+        super().__init__(parent)
+        self._columns = columns
+        self._group_key = group_key
+        self._recommended = recommended or (lambda record: False)
+        self._rows: List[Dict] = []
+
+    # --- content ------------------------------------------------------------
+
+    def set_records(self, records: List[Dict]):
+        """Replaces the content. Records must already be sorted by group."""
+        self.beginResetModel()
+        self._rows = []
+        last_group = None
+        for record in records:
+            group = record.get(self._group_key, "")
+            if self._rows and group != last_group:
+                self._rows.append({"_separator": True, self._group_key: group})
+            record.setdefault("checked", True)
+            record.setdefault("checkable", True)
+            self._rows.append(record)
+            last_group = group
+        self.endResetModel()
+
+    def clear(self):
+        self.set_records([])
+
+    def records(self) -> List[Dict]:
+        return [row for row in self._rows if not row.get("_separator")]
+
+    def checked_records(self) -> List[Dict]:
+        return [row for row in self._rows if not row.get("_separator") and row["checked"] and row["checkable"]]
+
+    def record(self, row: int) -> Dict:
+        return self._rows[row]
+
+    def is_separator(self, row: int) -> bool:
+        return bool(self._rows[row].get("_separator"))
+
+    def is_recommended(self, record: Dict) -> bool:
+        return bool(self._recommended(record))
+
+    def update_records(self, key: str, updates: Dict[str, Dict]) -> int:
+        """Merges updates[record[key]] into matching records; one dataChanged for the whole table."""
+        changed = 0
+        for row in self._rows:
+            if row.get("_separator"):
+                continue
+            update = updates.get(row.get(key))
+            if update:
+                row.update(update)
+                changed += 1
+        if changed and self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, len(self._columns) - 1))
+        return changed
+
+    # --- Qt model interface -------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._columns[section]["header"]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        row = self._rows[index.row()]
+        if row.get("_separator"):
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if self._columns[index.column()].get("checkbox"):
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+            if not row["checkable"]:
+                flags &= ~Qt.ItemFlag.ItemIsEnabled
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+
+        if role == SEPARATOR_ROLE:
+            return bool(row.get("_separator"))
+        if row.get("_separator"):
+            return None
+        if role == RECORD_ROLE:
+            return row
+
+        column = self._columns[index.column()]
+        if column.get("checkbox"):
+            if role == Qt.ItemDataRole.CheckStateRole:
+                return Qt.CheckState.Checked if row["checked"] else Qt.CheckState.Unchecked
+            if role == Qt.ItemDataRole.BackgroundRole and not row["checked"] and self._recommended(row):
+                return KEPT_BRUSH
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return column["value"](row)
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if not row["checked"] and self._recommended(row):
+                return KEPT_BRUSH
+            background = column.get("background")
+            return background(row) if background else None
+        if role == Qt.ItemDataRole.ToolTipRole:
+            tooltip = column.get("tooltip")
+            return tooltip(row) if tooltip else None
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return False
+        row = self._rows[index.row()]
+        if row.get("_separator") or not row["checkable"]:
+            return False
+        checked = (value.value if isinstance(value, Qt.CheckState) else int(value)) == Qt.CheckState.Checked.value
+        if row["checked"] == checked:
+            return True
+        row["checked"] = checked
+        self.dataChanged.emit(
+            self.index(index.row(), 0), self.index(index.row(), len(self._columns) - 1),
+            [Qt.ItemDataRole.CheckStateRole, Qt.ItemDataRole.BackgroundRole]
+        )
+        self.checkStateChanged.emit(index.row())
+        return True
+
+
+# ===========================
+# 🔎 FILTER PROXY
+# ===========================
+
+class GroupFilterProxyModel(QSortFilterProxyModel):
+    """
+    Case-insensitive substring filter over some columns of a GroupedCheckableTableModel.
+
+    The lowercase search keys are built once per source content (not per keystroke), and
+    the accepted rows are computed in a single pass: a separator stays visible only when
+    there are visible rows both above and below it.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Re-filtering is driven by _on_source_data_changed, after the caches are dropped
+        self.setDynamicSortFilter(False)
+        self._filter_columns: List[int] = []
+        self._filter_text = ""
+        self._search_keys: Optional[List[Optional[str]]] = None
+        self._accepted: Optional[List[bool]] = None
+
+    def setSourceModel(self, model: GroupedCheckableTableModel):
+        old_model = self.sourceModel()
+        if old_model is not None:
+            old_model.modelAboutToBeReset.disconnect(self._drop_caches)
+            old_model.dataChanged.disconnect(self._on_source_data_changed)
+        model.modelAboutToBeReset.connect(self._drop_caches)
+        model.dataChanged.connect(self._on_source_data_changed)
+        self._drop_caches()
+        super().setSourceModel(model)
+
+    def set_filter(self, column_indices: List[int], filter_text: str):
+        filter_text = filter_text.strip().lower()
+        if filter_text == self._filter_text and list(column_indices) == self._filter_columns:
+            return
+        if list(column_indices) != self._filter_columns:
+            self._filter_columns = list(column_indices)
+            self._search_keys = None
+        self._filter_text = filter_text
+        self._accepted = None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._accepted is None:
+            self._accepted = self._compute_accepted()
+        return self._accepted[source_row]
+
+    # --- internals ----------------------------------------------------------
+
+    def _drop_caches(self):
+        self._search_keys = None
+        self._accepted = None
+
+    def _on_source_data_changed(self, top_left, bottom_right, roles=()):
+        # Checkbox toggles only touch CheckState/Background; the search text is unchanged
+        if roles and Qt.ItemDataRole.DisplayRole not in roles:
+            return
+        self._drop_caches()
+        if self._filter_text:
+            self.invalidateFilter()
+
+    def _build_search_keys(self) -> List[Optional[str]]:
+        """One lowercase string per source row (None for separators); columns joined with NUL."""
+        model = self.sourceModel()
+        keys = []
+        for row in range(model.rowCount()):
+            if model.is_separator(row):
+                keys.append(None)
+                continue
+            texts = (model.index(row, column).data() for column in self._filter_columns)
+            keys.append("\0".join(text.lower() for text in texts if text))
+        return keys
+
+    def _compute_accepted(self) -> List[bool]:
+        if self._search_keys is None:
+            self._search_keys = self._build_search_keys()
+        keys = self._search_keys
+        needle = self._filter_text
+        if not needle:
+            return [True] * len(keys)
+
+        accepted = [False] * len(keys)
+        pending_separator = None
+        seen_visible_row = False
+        for row, key in enumerate(keys):
+            if key is None:
+                if seen_visible_row:
+                    pending_separator = row
+                continue
+            if needle in key:
+                accepted[row] = True
+                if pending_separator is not None:
+                    accepted[pending_separator] = True
+                    pending_separator = None
+                seen_visible_row = True
+        return accepted
+
+
+# ===========================
+# 🎨 DELEGATE
+# ===========================
+
+class SeparatorDelegate(QStyledItemDelegate):
+    """Paints separator rows as a horizontal line across every cell; other cells paint normally."""
+
+    def paint(self, painter, option, index):
+        if index.data(SEPARATOR_ROLE):
+            painter.save()
+            painter.setPen(QPen(SEPARATOR_COLOR, 1))
+            y = option.rect.center().y()
+            painter.drawLine(option.rect.left(), y, option.rect.right(), y)
+            painter.restore()
+            return
+        super().paint(painter, option, index)
@@ -0,0 +1,367 @@
+# tmdl_reader.py
+
+"""
+Reader for models saved as TMDL (PBIP checkouts: <Name>.SemanticModel/definition/**/*.tmdl).
+
+Every .tmdl file is parsed line by line, without building any JSON, into an
+indentation tree of objects (table, column, measure, hierarchy, level, partition,
+role, tablePermission, relationship ...). The tree is then mapped onto the dicts the
+analyzer already uses for the Tabular Editor folder layout (tables/<T>/<T>.json), so
+callers only switch on where a table dict comes from:
+
+    {"name", "columns": [{"name", "type"?, "sortByColumn"?, "expression"?}],
+     "measures": [{"name", "expression"}], "hierarchies": [{"name", "levels": [{"name", "column"}]}],
+     "partitions": [{"name", "mode", "source": {"type", "expression": [lines]}}]}
+
+Roles become {"name", "tablePermissions": [{"name", "filterExpression"}]} and relationships
+{"name", "fromTable", "fromColumn", "toTable", "toColumn"}.
+
+Files are parsed concurrently. The parsed model is cached per definition folder and
+reused until a .tmdl file is added, removed or modified.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from analyzer_logging import get_logger
+from analyzer_profiler import get_active_profiler, profiler_scope, record_file_read
+from model_text import expression_lines, expression_text
+
+logger = get_logger("tmdl_reader")
+
+TMDL_EXTENSION = ".tmdl"
+MAX_PARSE_WORKERS = 8
+
+_NAME = r"'(?:[^']|'')*'|[^\s=':]+"
+_DECLARATION = re.compile(rf"(\w+)\s+({_NAME})\s*(?:=\s*(.*?))?\s*$")
+_PROPERTY = re.compile(r"(\w+)\s*:\s*(.*?)\s*$")
+_EXPRESSION_PROPERTY = re.compile(r"(\w+)\s*=\s*(.*?)\s*$")
+_FLAG = re.compile(r"(\w+)\s*$")
+_OBJECT_REF_PART = re.compile(r"\s*('(?:[^']|'')*'|[^.']+)\s*(?:\.|$)")
+
+_model_cache: Dict[str, Tuple[tuple, Dict]] = {}
+_model_cache_lock = threading.Lock()
+
+
+# ===========================
+# 🔤 NAMES
+# ===========================
+
+def unquote_name(name: str) -> str:
+    name = name.strip()
+    if len(name) >= 2 and name.startswith("'") and name.endswith("'"):
+        return name[1:-1].replace("''", "'")
+    return name
+
+
+def split_object_ref(reference: str) -> Tuple[str, str]:
+    """'Sales Table'.'Customer Key' / Sales.CustomerKey -> ("Sales Table", "Customer Key")."""
+    parts = [unquote_name(match.group(1)) for match in _OBJECT_REF_PART.finditer(reference.strip()) if match.group(1).strip()]
+    if len(parts) < 2:
+        return "", parts[0] if parts else ""
+    return parts[0], ".".join(parts[1:])
+
+
+# ===========================
+# 🌳 PARSER
+# ===========================
+
+class TmdlNode:
+    """One TMDL object: `type name [= value]`, its properties and child objects."""
+
+    __slots__ = ("type", "name", "value", "properties", "children")
+
+    def __init__(self, node_type: str, name: str, value=None):
+        self.type = node_type
+        self.name = name
+        self.value = value
+        self.properties: Dict[str, object] = {}
+        self.children: List["TmdlNode"] = []
+
+    def children_of_type(self, node_type: str) -> List["TmdlNode"]:
+        return [child for child in self.children if child.type == node_type]
+
+    def __repr__(self):
+        return f"TmdlNode({self.type!r}, {self.name!r})"
+
+
+def _indent_width(line: str) -> int:
+    expanded = line.expandtabs(4)
+    return len(expanded) - len(expanded.lstrip())
+
+
+def parse_tmdl_lines(lines: Iterable[str]) -> List[TmdlNode]:
+    """
+    Parses a TMDL document from an iterable of lines (a file object streams it) into its
+    top-level objects. A value left empty after '=' is a multi-line expression: the following
+    lines indented deeper than the declaring line, or a ``` fenced block. Expressions are
+    stored as lists of lines.
+    """
+    roots: List[TmdlNode] = []
+    stack: List[Tuple[int, TmdlNode]] = []
+
+    # Multi-line expression being collected: (owner node, property name or None for the node value, declaring indent)
+    capture = None
+    capture_lines: List[str] = []
+    capture_indent = None
+    fenced = False
+
+    def finish_capture():
+        owner, key, _ = capture
+        while capture_lines and not capture_lines[-1].strip():
+            capture_lines.pop()
+        if key is None:
+            owner.value = list(capture_lines)
+        else:
+            owner.properties[key] = list(capture_lines)
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+
+        if capture is not None:
+            if fenced:
+                if line.strip() == "```":
+                    finish_capture()
+                    capture, fenced = None, False
+                else:
+                    capture_lines.append(line.strip())
+                continue
+            if not line.strip():
+                if capture_lines:
+                    capture_lines.append("")
+                continue
+            indent = _indent_width(line)
+            if capture_indent is None and indent > capture[2]:
+                capture_indent = indent
+            if capture_indent is not None and indent >= capture_indent:
+                capture_lines.append(line.expandtabs(4)[capture_indent:].rstrip())
+                continue
+            finish_capture()
+            capture = None
+
+        stripped = line.strip()
+        if not stripped or stripped.startswith("///") or stripped.startswith("//"):
+            continue
+
+        indent = _indent_width(line)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1] if stack else None
+
+        if stripped.startswith("ref "):
+            continue
+
+        property_match = _PROPERTY.match(stripped)
+        declaration_match = None if property_match else _DECLARATION.match(stripped)
+
+        if declaration_match:
+            node = TmdlNode(declaration_match.group(1), unquote_name(declaration_match.group(2)), declaration_match.group(3))
+            (parent.children if parent is not None else roots).append(node)
+            stack.append((indent, node))
+            if node.value is not None and node.value in ("", "```"):
+                capture, capture_lines, capture_indent, fenced = (node, None, indent), [], None, node.value == "```"
+            continue
+
+        if parent is None:
+            continue
+
+        if property_match:
+            parent.properties[property_match.group(1)] = property_match.group(2)
+            continue
+
+        expression_match = _EXPRESSION_PROPERTY.match(stripped)
+        if expression_match:
+            key, value = expression_match.group(1), expression_match.group(2)
+            if value in ("", "```"):
+                capture, capture_lines, capture_indent, fenced = (parent, key, indent), [], None, value == "```"
+            else:
+                parent.properties[key] = [value]
+            continue
+
+        flag_match = _FLAG.match(stripped)
+        if flag_match:
+            parent.properties[flag_match.group(1)] = True
+
+    if capture is not None:
+        finish_capture()
+    return roots
+
+
+def parse_tmdl_file(file_path: str) -> List[TmdlNode]:
+    with open(file_path, "r", encoding="utf-8-sig") as f:
+        nodes = parse_tmdl_lines(f)
+    record_file_read(os.path.getsize(file_path))
+    return nodes
+
+
+# ===========================
+# 🔁 TREE -> ANALYZER STRUCTURES
+# ===========================
+
+def table_to_dict(node: TmdlNode) -> Dict:
+    partitions = []
+    for partition in node.children_of_type("partition"):
+        partitions.append({
+            "name": partition.name,
+            "mode": partition.properties.get("mode"),
+            "source": {"type": expression_text(partition.value) or None, "expression": expression_lines(partition.properties.get("source"))},
+        })
+    is_calculated_table = any(p["source"]["type"] == "calculated" for p in partitions)
+
+    columns = []
+    for column in node.children_of_type("column"):
+        definition = {"name": column.name}
+        if column.value is not None:
+            definition["type"] = "calculated"
+            definition["expression"] = expression_text(column.value)
+        elif is_calculated_table:
+            definition["type"] = "calculatedTableColumn"
+        for key in ("dataType", "sourceColumn", "isHidden", "displayFolder"):
+            if key in column.properties:
+                definition[key] = column.properties[key]
+        if "sortByColumn" in column.properties:
+            definition["sortByColumn"] = unquote_name(str(column.properties["sortByColumn"]))
+        columns.append(definition)
+
+    hierarchies = []
+    for hierarchy in node.children_of_type("hierarchy"):
+        levels = [{"name": level.name, "column": unquote_name(str(level.properties.get("column", "")))} for level in hierarchy.children_of_type("level")]
+        hierarchies.append({"name": hierarchy.name, "levels": levels})
+
+    measures = [{"name": measure.name, "expression": expression_text(measure.value)} for measure in node.children_of_type("measure")]
+
+    return {"name": node.name, "columns": columns, "measures": measures, "hierarchies": hierarchies, "partitions": partitions}
+
+
+def role_to_dict(node: TmdlNode) -> Dict:
+    permissions = [
+        {"name": permission.name, "filterExpression": expression_text(permission.value)}
+        for permission in node.children_of_type("tablePermission")
+    ]
+    return {"name": node.name, "modelPermission": node.properties.get("modelPermission"), "tablePermissions": permissions}
+
+
+def relationship_to_dict(node: TmdlNode) -> Optional[Dict]:
+    from_table, from_column = split_object_ref(str(node.properties.get("fromColumn", "")))
+    to_table, to_column = split_object_ref(str(node.properties.get("toColumn", "")))
+    if not (from_table and from_column and to_table and to_column):
+        return None
+    return {"name": node.name, "fromTable": from_table, "fromColumn": from_column, "toTable": to_table, "toColumn": to_column,
+            "isActive": node.properties.get("isActive", "true") != "false"}
+
+
+def iter_tmdl_measures(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """(name, expression) of every measure in a TMDL document, at any depth, in document order."""
+    stack = list(reversed(parse_tmdl_lines(lines)))
+    while stack:
+        node = stack.pop()
+        if node.type == "measure":
+            yield node.name, expression_text(node.value)
+        stack.extend(reversed(node.children))
+
+
+# ===========================
+# 📂 MODEL
+# ===========================
+
+def _has_tmdl_tables(folder: str) -> bool:
+    tables_folder = os.path.join(folder, "tables")
+    try:
+        return os.path.isdir(tables_folder) and any(name.endswith(TMDL_EXTENSION) for name in os.listdir(tables_folder))
+    except OSError:
+        return False
+
+
+def find_tmdl_definition_folder(model_path: str) -> Optional[str]:
+    """
+    The TMDL 'definition' folder for a model path: the definition folder itself, the
+    <Name>.SemanticModel folder that contains it, or a PBIP folder with one semantic model.
+    None for the Tabular Editor JSON layout.
+    """
+    if not model_path or not os.path.isdir(model_path):
+        return None
+    for candidate in (model_path, os.path.join(model_path, "definition")):
+        if _has_tmdl_tables(candidate):
+            return candidate
+    try:
+        semantic_models = [entry.path for entry in os.scandir(model_path) if entry.is_dir() and entry.name.lower().endswith(".semanticmodel")]
+    except OSError:
+        return None
+    if len(semantic_models) == 1:
+        definition = os.path.join(semantic_models[0], "definition")
+        if _has_tmdl_tables(definition):
+            return definition
+    return None
+
+
+def is_tmdl_model(model_path: str) -> bool:
+    return find_tmdl_definition_folder(model_path) is not None
+
+
+def _list_tmdl_files(definition_path: str) -> List[Tuple[str, int, int]]:
+    files = []
+    for root, dirs, names in os.walk(definition_path):
+        dirs.sort()
+        for name in sorted(names):
+            if name.endswith(TMDL_EXTENSION):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files.append((path, stat.st_mtime_ns, stat.st_size))
+    return files
+
+
+def load_tmdl_model(model_path: str) -> Optional[Dict]:
+    """
+    {"source_path", "definition_path", "format", "tables": {name: table dict}, "roles": [...], "relationships": [...]}
+    for a TMDL model, or None when model_path is not one.
+    """
+    definition_path = find_tmdl_definition_folder(model_path)
+    if definition_path is None:
+        return None
+
+    files = _list_tmdl_files(definition_path)
+    signature = tuple(files)
+    with _model_cache_lock:
+        cached = _model_cache.get(definition_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    paths = [path for path, _, _ in files]
+    profiler = get_active_profiler()
+
+    def parse(path: str):
+        with profiler_scope(profiler):
+            return _parse_file_safely(path)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_PARSE_WORKERS, len(paths)))) as pool:
+        parsed = list(pool.map(parse, paths))
+
+    model = {"source_path": definition_path, "definition_path": definition_path, "format": "tmdl", "tables": OrderedDict(), "roles": [], "relationships": []}
+    for nodes in parsed:
+        for node in nodes:
+            if node.type == "table":
+                model["tables"][node.name] = table_to_dict(node)
+            elif node.type == "role":
+                model["roles"].append(role_to_dict(node))
+            elif node.type == "relationship":
+                relationship = relationship_to_dict(node)
+                if relationship:
+                    model["relationships"].append(relationship)
+
+    logger.debug("TMDL model %s: %d tables, %d roles, %d relationships from %d files.",
+                 definition_path, len(model["tables"]), len(model["roles"]), len(model["relationships"]), len(paths))
+    with _model_cache_lock:
+        _model_cache[definition_path] = (signature, model)
+    return model
+
+
+def _parse_file_safely(file_path: str) -> List[TmdlNode]:
+    try:
+        return parse_tmdl_file(file_path)
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f"   ⚠️ Cannot read TMDL file '{file_path}': {e}")
+        return []
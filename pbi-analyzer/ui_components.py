@@ -1,11 +1,19 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QLabel, QLineEdit, QPushButton, QTableWidget, QHeaderView,
+    QLabel, QLineEdit, QPushButton, QTableView, QHeaderView,
     QAbstractItemView, QCheckBox, QProgressBar, QTabWidget
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
 
+from table_models import (
+    GroupedCheckableTableModel, GroupFilterProxyModel, SeparatorDelegate,
+    REPORTING_COLUMNS, MARTS_COLUMNS, MARTS_AUDIT_COLUMNS
+)
+
+# Rows sampled when sizing ResizeToContents columns (Qt's default of 1000 is slow on big tables)
+HEADER_RESIZE_PRECISION = 200
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -49,13 +57,15 @@ class MainWindow(QMainWindow):
         self.pbix_path_input.setPlaceholderText("Path to your .zip or .pbix file...")
         self.pbix_path_input.setReadOnly(True)
         self.tabular_path_input = QLineEdit()
-        self.tabular_path_input.setPlaceholderText("Path to your Tabular model folder...")
+        self.tabular_path_input.setPlaceholderText("Path to your Tabular model folder or .pbit file...")
         self.tabular_path_input.setReadOnly(True)
         self.dbt_path_input = QLineEdit()
         self.dbt_path_input.setPlaceholderText("Path to your DBT models folder...")
         self.dbt_path_input.setReadOnly(True)
         self.pbix_browse_btn = QPushButton("Browse...")
         self.tabular_browse_btn = QPushButton("Browse...")
+        self.tabular_file_btn = QPushButton("File...")
+        self.tabular_file_btn.setToolTip("Read the model from a .pbit template or a model.bim instead of a folder")
         self.dbt_browse_btn = QPushButton("Browse...")
 
         input_layout.addWidget(QLabel("Power BI Source File:"), 0, 0)
@@ -64,6 +74,7 @@ class MainWindow(QMainWindow):
         input_layout.addWidget(QLabel("Tabular Model Path:"), 1, 0)
         input_layout.addWidget(self.tabular_path_input, 1, 1)
         input_layout.addWidget(self.tabular_browse_btn, 1, 2)
+        input_layout.addWidget(self.tabular_file_btn, 1, 3)
         input_layout.addWidget(QLabel("DBT Model Path:"), 2, 0)
         input_layout.addWidget(self.dbt_path_input, 2, 1)
         input_layout.addWidget(self.dbt_browse_btn, 2, 2)
@@ -83,8 +94,14 @@ class MainWindow(QMainWindow):
         self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(True)
         self.progress_bar.setFormat("Analyzing... %p%")
-        self.main_layout.addWidget(self.progress_bar)
-        self.main_layout.setStretchFactor(self.progress_bar, 0)
+        self.cancel_analysis_btn = QPushButton("⏹ Cancel")
+        self.cancel_analysis_btn.hide()
+
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_analysis_btn)
+        self.main_layout.addLayout(progress_layout)
+        self.main_layout.setStretchFactor(progress_layout, 0)
 
     def _create_tabs_section(self):
         self.tabs = QTabWidget()
@@ -118,20 +135,15 @@ class MainWindow(QMainWindow):
         filter_layout.addWidget(self.reporting_filter_input)
         self.reporting_layout.addLayout(filter_layout)
 
-        self.results_table = QTableWidget()
-        self.results_table.setColumnCount(12)
-        self.results_table.setHorizontalHeaderLabels([
-            "Comment Out", "Table", "Column", "Is Used",
-            "Visualization", "Measure", "Filter", 
-            "Indirect Meas.", "Relationship", "Hierarchy",
-            "Tabular Sort", "RLS"
-        ])
+        # Unused columns are recommended for commenting out
+        self.results_model = GroupedCheckableTableModel(
+            REPORTING_COLUMNS, group_key="table", recommended=lambda r: not r.get("is_used")
+        )
+        self.results_table = self._create_results_view(self.results_model)
         
         header = self.results_table.horizontalHeader()
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
-        self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.results_table.setAlternatingRowColors(True)
         
         self.reporting_layout.addWidget(self.results_table)
 
@@ -140,11 +152,20 @@ class MainWindow(QMainWindow):
         self.enable_live_mode_checkbox.setEnabled(False)
         self.show_summary_btn = QPushButton("📊 Show Analysis Summary")
         self.show_summary_btn.setEnabled(False)
+        self.show_profile_btn = QPushButton("⏱️ Performance Profile")
+        self.show_profile_btn.setEnabled(False)
+        self.show_log_btn = QPushButton("📜 Analysis Log")
+        self.show_log_btn.setToolTip("Messages logged by the last runs (most recent entries)")
+        self.export_results_btn = QPushButton("💾 Export Results...")
+        self.export_results_btn.setEnabled(False)
         self.apply_changes_btn = QPushButton("Apply Changes to REPORTING")
         self.apply_changes_btn.setEnabled(False)
         
         bottom_layout.addWidget(self.enable_live_mode_checkbox)
         bottom_layout.addWidget(self.show_summary_btn)
+        bottom_layout.addWidget(self.show_profile_btn)
+        bottom_layout.addWidget(self.show_log_btn)
+        bottom_layout.addWidget(self.export_results_btn)
         bottom_layout.addWidget(self.apply_changes_btn)
         bottom_layout.addStretch()
         
@@ -166,12 +187,10 @@ class MainWindow(QMainWindow):
         filter_layout.addWidget(self.marts_filter_input)
         self.marts_layout.addLayout(filter_layout)
 
-        self.marts_table = QTableWidget()
-        self.marts_table.setColumnCount(6)
-        self.marts_table.setHorizontalHeaderLabels([
-            "Comment Out", "Field", "Source Model", 
-            "Used", "Blocked By", "Usage Example"
-        ])
+        self.marts_model = GroupedCheckableTableModel(
+            MARTS_COLUMNS, group_key="table", recommended=lambda r: r.get("can_comment") is True
+        )
+        self.marts_table = self._create_results_view(self.marts_model)
 
         header = self.marts_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
@@ -181,9 +200,6 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
         
-        self.marts_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.marts_table.setAlternatingRowColors(True)
-        
         self.marts_layout.addWidget(self.marts_table)
 
         self.marts_progress_bar = QProgressBar()
@@ -255,12 +271,10 @@ class MainWindow(QMainWindow):
         self.marts_audit_layout.addLayout(filter_layout)
         
         # Marts Audit table
-        self.marts_audit_table = QTableWidget()
-        self.marts_audit_table.setColumnCount(6)
-        self.marts_audit_table.setHorizontalHeaderLabels([
-            "Comment Out", "Field", "Source Model", 
-            "Used", "Blocked By", "Usage Example"
-        ])
+        self.marts_audit_model = GroupedCheckableTableModel(
+            MARTS_AUDIT_COLUMNS, group_key="source_model", recommended=lambda r: r.get("can_comment") is True
+        )
+        self.marts_audit_table = self._create_results_view(self.marts_audit_model)
         
         # Column configuration
         header = self.marts_audit_table.horizontalHeader()
@@ -271,9 +285,6 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
         
-        self.marts_audit_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.marts_audit_table.setAlternatingRowColors(True)
-        
         self.marts_audit_layout.addWidget(self.marts_audit_table)
 
         # Progress bar for MARTS AUDIT analysis
@@ -317,5 +328,20 @@ class MainWindow(QMainWindow):
 
 
 
+    def _create_results_view(self, model: GroupedCheckableTableModel) -> QTableView:
+        view = QTableView()
+        proxy = GroupFilterProxyModel(view)
+        proxy.setSourceModel(model)
+        view.setModel(proxy)
+        view.setItemDelegate(SeparatorDelegate(view))
+        view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        view.setAlternatingRowColors(True)
+        view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        view.horizontalHeader().setResizeContentsPrecision(HEADER_RESIZE_PRECISION)
+        return view
+
     def _create_status_bar(self):
-        self.statusBar().showMessage("Ready. Please select all required paths.")
\ No newline at end of file
+        self.statusBar().showMessage("Ready. Please select all required paths.")
+        self.jobs_label = QLabel()
+        self.statusBar().addPermanentWidget(self.jobs_label)
\ No newline at end of file
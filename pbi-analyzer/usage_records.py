@@ -0,0 +1,107 @@
+# usage_records.py
+
+"""
+Compact storage for PBIX usage hits.
+
+A multi-report run produces hundreds of thousands of hits that share a handful of
+usage types, methods, pages, objects and file names. UsageRecord keeps them in
+__slots__ with interned strings instead of one dict per hit; the extra keys of
+detailed logging mode live in an optional `details` dict.
+
+Records still answer dict-style access (record['field'], record.get('page'),
+record['source_file'] = ...) so the existing analysis code works unchanged.
+They stay records in intermediate_data (also when the UI holds on to it); where
+hits leave the analyzer - the export tables and the history store - they are
+converted one at a time with iter_usage_dicts().
+"""
+
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+def intern_value(value: Optional[str]) -> Optional[str]:
+    """Returns the shared instance of a repeated string (usage types, methods, page/object/file names)."""
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+class UsageRecord:
+    """One field usage found in a PBIX file (or in the model's hierarchies)."""
+
+    __slots__ = ("field", "usage_type", "page", "object_name", "file", "method", "source_file", "details")
+
+    # Keys that map to slots, in the order the old result dicts used
+    FIELDS = ("field", "usage_type", "page", "object_name", "file", "method", "source_file")
+
+    def __init__(self, field: str, usage_type: str, page: str, object_name: str, file: str, method: str,
+                 source_file: str = None, details: Dict[str, Any] = None):
+        self.field = intern_value(field)
+        self.usage_type = intern_value(usage_type)
+        self.page = intern_value(page)
+        self.object_name = intern_value(object_name)
+        self.file = intern_value(file)
+        self.method = intern_value(method)
+        self.source_file = intern_value(source_file)
+        self.details = details
+
+    # --- dict-style access for existing callers -----------------------------
+
+    def __getitem__(self, key: str):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None or key != "source_file":
+                return value
+        elif self.details is not None and key in self.details:
+            return self.details[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key in self.FIELDS:
+            setattr(self, key, intern_value(value))
+        else:
+            if self.details is None:
+                self.details = {}
+            self.details[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, values: Dict[str, Any]):
+        for key, value in values.items():
+            self[key] = value
+
+    def keys(self) -> List[str]:
+        return list(self.to_dict())
+
+    def items(self):
+        return self.to_dict().items()
+
+    # --- boundary -----------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {key: getattr(self, key) for key in self.FIELDS if key != "source_file"}
+        if self.source_file is not None:
+            record["source_file"] = self.source_file
+        if self.details:
+            record.update(self.details)
+        return record
+
+    def __repr__(self):
+        return f"UsageRecord({self.field!r}, {self.usage_type!r}, page={self.page!r})"
+
+
+def iter_usage_dicts(records: Iterable) -> Iterator[Dict[str, Any]]:
+    """Plain dicts for export and the history store, one per hit; accepts records or dicts."""
+    for record in records:
+        yield record.to_dict() if isinstance(record, UsageRecord) else dict(record)
@@ -0,0 +1,208 @@
+# workspace_analysis.py
+
+"""
+Workspace mode: analyse several Tabular models that share one dbt project.
+
+The dbt project (every REPORTING SQL file, read once) is indexed in the parent
+process together with its lineage (REPORTING model -> source MARTS model), and the
+index is handed to each worker process once through the pool initializer. Every
+model is then analysed by perform_analysis() in its own process.
+
+The consolidated report lists every column of the dbt models the workspace maps to,
+with the models that have the column and the models that use it. A dbt column can
+only be removed safely when it is unused by every model (`unused_by_all`).
+
+Workspace file (JSON), paths relative to the file:
+
+    {
+      "dbt": "dbt/models/reporting",
+      "models": [
+        {"name": "Sales", "tabular": "models/Sales", "pbix": ["reports/Sales.pbix"]},
+        {"name": "Finance", "tabular": "models/Finance", "pbix": ["reports/Finance.pbix", "reports/Budget.pbix"]}
+      ]
+    }
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List
+
+import analyzer_cli
+from analyzer_cli import DbtProjectIndex, analyze_dbt_columns_from_content, is_row_used, source_marts_model_from_content
+from analyzer_logging import get_logger
+
+logger = get_logger("workspace_analysis")
+
+# Set once per worker process by the pool initializer
+_worker_dbt_index: DbtProjectIndex = None
+
+
+# ===========================
+# 📁 WORKSPACE FILE
+# ===========================
+
+def load_workspace(workspace_path: str) -> Dict:
+    """Reads a workspace file; returns {"dbt": path, "models": [{"name", "tabular", "pbix"}]} with absolute paths."""
+    with open(workspace_path, 'r', encoding='utf-8') as f:
+        workspace = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(workspace_path))
+
+    def resolve(path):
+        return path if not path or os.path.isabs(path) else os.path.join(base_dir, path)
+
+    models = []
+    for i, model in enumerate(workspace.get("models", [])):
+        if not model.get("tabular"):
+            raise ValueError(f"Workspace model #{i + 1} has no 'tabular' path.")
+        pbix = model.get("pbix", [])
+        if isinstance(pbix, str):
+            pbix = [pbix]
+        models.append({
+            "name": model.get("name") or os.path.basename(os.path.normpath(model["tabular"])),
+            "tabular": resolve(model["tabular"]),
+            "pbix": [resolve(p) for p in pbix],
+        })
+
+    names = [model["name"] for model in models]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate model names in workspace: {', '.join(duplicates)}")
+    return {"dbt": resolve(workspace.get("dbt")), "models": models}
+
+
+# ===========================
+# ⚙️ WORKERS
+# ===========================
+
+def _init_worker(dbt_index: DbtProjectIndex):
+    global _worker_dbt_index
+    _worker_dbt_index = dbt_index
+
+
+def _analyze_model(model: Dict, dbt_models_path: str, enable_detailed_logging: bool, dbt_index: DbtProjectIndex = None,
+                   scan_workers: int = 1) -> Dict:
+    """Runs one model; returns only what the consolidated report needs (keeps the result pickle small)."""
+    try:
+        ui_results, intermediate_data = analyzer_cli.perform_analysis(
+            model["pbix"], model["tabular"], dbt_models_path,
+            enable_detailed_logging=enable_detailed_logging, dbt_index=dbt_index or _worker_dbt_index,
+            scan_workers=scan_workers
+        )
+    except Exception as e:
+        logger.error(f"❌ Model '{model['name']}' failed: {e}", exc_info=True)
+        return {"name": model["name"], "error": f"{type(e).__name__}: {e}"}
+
+    rows = [dict(row, is_used=is_row_used(row)) for row in ui_results]
+    return {
+        "name": model["name"],
+        "rows": rows,
+        "dbt_files": intermediate_data.get("dbt_files", {}),
+        "profile": intermediate_data.get("profile"),
+        "error": None,
+    }
+
+
+# ===========================
+# 🚀 ENTRY POINT
+# ===========================
+
+def analyze_workspace(models: List[Dict], dbt_models_path: str, max_workers: int = None, enable_detailed_logging: bool = False,
+                      progress_callback: Callable[[int, int, str], None] = None, scan_workers: int = None) -> Dict:
+    """
+    Analyses every model (in parallel processes unless max_workers == 1) against one shared dbt index.
+    progress_callback(done, total, model_name) is called as models finish.
+    scan_workers caps the PBIX scan processes of each model; by default the cores are divided
+    between the model processes, so the two pools together do not oversubscribe the machine.
+    """
+    if not models:
+        raise ValueError("The workspace has no models.")
+
+    logger.info(f"🗂️ Indexing dbt project {dbt_models_path}...")
+    dbt_index = DbtProjectIndex(dbt_models_path)
+    lineage = {path: source_marts_model_from_content(dbt_index.content(path)) for path in dbt_index.sql_files}
+    logger.info(f"   {len(dbt_index.sql_files)} SQL files indexed.")
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(models)))
+    if scan_workers is None:
+        scan_workers = max(1, (os.cpu_count() or 1) // max_workers)
+    results = {}
+
+    def finished(result):
+        results[result["name"]] = result
+        status = "❌ failed" if result["error"] else f"✅ {sum(1 for r in result['rows'] if not r['is_used'])} unused columns"
+        logger.info(f"   [{len(results)}/{len(models)}] {result['name']}: {status}")
+        if progress_callback:
+            progress_callback(len(results), len(models), result["name"])
+
+    logger.info(f"🚀 Analysing {len(models)} model(s) with {max_workers} process(es)...")
+    if max_workers == 1:
+        for model in models:
+            finished(_analyze_model(model, dbt_models_path, enable_detailed_logging, dbt_index, scan_workers))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(dbt_index,)) as pool:
+            futures = [pool.submit(_analyze_model, model, dbt_models_path, enable_detailed_logging, None, scan_workers) for model in models]
+            for future in as_completed(futures):
+                finished(future.result())
+
+    # Keep the workspace order regardless of completion order
+    model_results = [results[model["name"]] for model in models]
+    dbt_columns = consolidate_dbt_usage(model_results, dbt_index, lineage)
+    unused_by_all = [column for column in dbt_columns if column["unused_by_all"]]
+
+    logger.info(f"✅ Workspace analysis complete: {len(unused_by_all)} of {len(dbt_columns)} dbt columns are unused by every model.")
+    return {
+        "dbt": dbt_models_path,
+        "models": model_results,
+        "dbt_columns": dbt_columns,
+        "summary": {
+            "models": len(models),
+            "failed_models": [result["name"] for result in model_results if result["error"]],
+            "dbt_columns": len(dbt_columns),
+            "unused_by_all_models": len(unused_by_all),
+        },
+    }
+
+
+def consolidate_dbt_usage(model_results: List[Dict], dbt_index: DbtProjectIndex, lineage: Dict[str, str] = None) -> List[Dict]:
+    """
+    One row per column of every dbt model that at least one Tabular model maps to:
+    which models have the column, which use it, and whether it is unused by all of them.
+    A failed model makes every column of the dbt files it could map to unsafe, so none of
+    them is reported as unused_by_all.
+    """
+    lineage = lineage or {}
+    # dbt file -> model name -> {column (lowercase): is_used}
+    usage_by_file: Dict[str, Dict[str, Dict[str, bool]]] = {}
+    for result in model_results:
+        if result["error"]:
+            continue
+        for row in result["rows"]:
+            dbt_file = result["dbt_files"].get(row["table"])
+            if not dbt_file:
+                continue
+            model_columns = usage_by_file.setdefault(dbt_file, {}).setdefault(result["name"], {})
+            column = row["column"].lower()
+            model_columns[column] = model_columns.get(column, False) or row["is_used"]
+
+    any_model_failed = any(result["error"] for result in model_results)
+    dbt_columns = []
+    for dbt_file in sorted(usage_by_file):
+        models = usage_by_file[dbt_file]
+        seen = set()
+        for alias in analyze_dbt_columns_from_content(dbt_index.content(dbt_file), dbt_file).values():
+            if alias.lower() in seen:
+                continue
+            seen.add(alias.lower())
+            with_column = sorted(name for name, columns in models.items() if alias.lower() in columns)
+            using = sorted(name for name, columns in models.items() if columns.get(alias.lower()))
+            dbt_columns.append({
+                "dbt_file": dbt_file,
+                "dbt_model": os.path.splitext(os.path.basename(dbt_file))[0],
+                "source_marts_model": lineage.get(dbt_file, ""),
+                "column": alias,
+                "models_with_column": with_column,
+                "models_using": using,
+                "unused_by_all": not using and not any_model_failed,
+            })
+    return dbt_columns